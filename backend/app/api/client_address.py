@@ -0,0 +1,71 @@
+"""
+Client address resolution for per-client limits such as CHALLENGE_MAX_PER_IP.
+
+Behind a reverse proxy every request comes from the proxy's address, so the limit would be
+shared by the whole site. TRUSTED_PROXIES lists the proxies (comma-separated addresses or
+CIDR ranges, e.g. "10.0.0.0/8,127.0.0.1") whose X-Forwarded-For header is believed. Unset,
+no header is read and the direct peer address is used.
+"""
+import ipaddress
+import os
+from typing import List, Optional, Union
+
+from dotenv import load_dotenv
+from fastapi import Request
+
+load_dotenv()
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(value: str) -> List[Network]:
+    """
+    Parse a comma-separated list of addresses and CIDR ranges.
+
+    :raises ValueError: If an entry is not an address or range
+    """
+    return [ipaddress.ip_network(entry.strip(), strict=False) for entry in value.split(",") if entry.strip()]
+
+
+TRUSTED_PROXIES = parse_networks(os.getenv("TRUSTED_PROXIES", ""))
+
+
+def _is_trusted(address: str, trusted: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_ip(request: Request, trusted: Optional[List[Network]] = None) -> Optional[str]:
+    """
+    Return the address of the client that sent the request.
+
+    X-Forwarded-For is only read when the direct peer is a trusted proxy. Its entries are
+    walked from the right, since each proxy appends the address it received the request
+    from; the first one that is not a trusted proxy is the client. Entries further left are
+    whatever the client chose to send and are never used.
+
+    :param trusted: Networks of the trusted proxies, defaults to TRUSTED_PROXIES
+    """
+    trusted = TRUSTED_PROXIES if trusted is None else trusted
+    address = request.client.host if request.client else None
+    if address is None or not _is_trusted(address, trusted):
+        return address
+
+    forwarded = [
+        entry.strip()
+        for header in request.headers.getlist("x-forwarded-for")
+        for entry in header.split(",")
+    ]
+    for entry in reversed(forwarded):
+        try:
+            entry = str(ipaddress.ip_address(entry))
+        except ValueError:
+            # A trusted proxy would only append real addresses; stop at the last reliable hop
+            break
+        if not _is_trusted(entry, trusted):
+            return entry
+        address = entry
+    return address
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Depends
 from pydantic import BaseModel
+from typing import Optional
 import logging
-from backend.app.core.auth import register_user, validate_login_challenge, get_all_users, get_current_user, request_login_challenge
+from backend.app.core.auth import register_user, validate_login_challenge, get_all_users, get_current_user, request_login_challenge, revoke_token
+from backend.app.api.client_address import client_ip
+from backend.app.core.crypto_executor import ExecutorSaturated
+from backend.app.core.challenge_auth.challenge_manager import ChallengeLimitExceeded
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 
 
@@ -20,23 +25,31 @@ class ChallengeRequest(BaseModel):
 class ChallengeValidationRequest(BaseModel):
     email: str
     encrypted_challenge: str
+    # Password hashed with the challenge's rehash_salt, encrypted like the challenge
+    encrypted_rehash: Optional[str] = None
 
 
 @router.post("/register")
 async def register_user_endpoint(request: RegisterRequest):
     try:
-        result = register_user(request.email, request.password)
+        result = await register_user(request.email, request.password)
         return result
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/challenge")
-async def get_challenge(request: ChallengeRequest):
+async def get_challenge(request: ChallengeRequest, http_request: Request):
     """Step 1 of login: Client requests a challenge by providing email"""
     try:
-        result = request_login_challenge(request.email)
+        # Behind a reverse proxy this needs TRUSTED_PROXIES, see api/client_address.py.
+        # The user lookup and a shared challenge store block, so they run on a worker thread
+        result = await run_in_threadpool(request_login_challenge, request.email, client_ip(http_request))
         return result
+    except ChallengeLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as _:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     except Exception as e:
@@ -45,12 +58,15 @@ async def get_challenge(request: ChallengeRequest):
 
 
 @router.post("/validate-challenge")
-async def validate_challenge_endpoint(request: ChallengeValidationRequest):
+async def validate_challenge_endpoint(request: ChallengeValidationRequest, background_tasks: BackgroundTasks):
     """Step 2 of login: Client sends encrypted challenge for validation"""
     try:
-        access_token = validate_login_challenge(
+        access_token = await run_in_threadpool(
+            validate_login_challenge,
             request.email,
-            request.encrypted_challenge
+            request.encrypted_challenge,
+            request.encrypted_rehash,
+            background_tasks,
         )
 
         response = JSONResponse(content={"message": "Login successful"})
@@ -75,7 +91,11 @@ async def get_all_users_endpoint():
     return get_all_users()
 
 @router.post("/logout")
-async def logout():
+async def logout(request: Request):
+    """Revoke the session token on every worker, then delete the cookie"""
+    token = request.cookies.get("access_token")
+    if token is not None:
+        await run_in_threadpool(revoke_token, token)
     response = JSONResponse(content={"message": "Logout successful"})
     response.delete_cookie(key="access_token")
     return response
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+import anyio
+from fastapi import APIRouter, HTTPException, Header, Request
+from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from typing import AsyncIterator, Literal, Optional
 from pydantic import BaseModel, conbytes
+from backend.app.api import wire
 from backend.app.core.block_cipher_module import AESCipher
 import backend.app.core.key_management as keyManagement
+from backend.app.core.crypto_executor import crypto_executor, ExecutorSaturated, STREAM_OFFLOAD_BYTES
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -11,82 +20,262 @@ router = APIRouter()
 class AESEncryptRequest(BaseModel):
     plaintext: str
     key: str  
+    mode: Literal["CBC", "GCM", "CHACHA20-POLY1305"] = "CBC"
 
 class AESDecryptRequest(BaseModel):
     encrypted_text: str
     key: str  
+    # Only used by binary requests: raw ciphertexts carry no header to read the mode from
+    mode: Optional[Literal["CBC", "GCM", "CHACHA20-POLY1305"]] = None
 
 
 class CipherManager:
     """
-    Manages AES Cipher initialization and provides a way to dynamically create ciphers
+    Provides AES ciphers for KEK-wrapped keys.
+
+    Ciphers come from a bounded, TTL-limited registry keyed by a digest of the wrapped key
+    (see `key_management.get_aes_cipher`), so concurrent requests never share mutable state
+    and the KEK unwrap only runs on a registry miss.
     """
-    _current_cipher = None
 
     @classmethod
-    def initialize_cipher(cls, key: bytes):
+    def get_cipher(cls, key: str) -> AESCipher:
         """
-        Initialize the cipher with a given key
-        
-        :param key: 32-byte encryption key
-        """
-        cls._current_cipher = AESCipher(key)
-        return cls._current_cipher
+        Get the cipher for a KEK-wrapped key
 
-    @classmethod
-    def get_cipher(cls):
+        :param key: KEK-wrapped 32-byte encryption key in hexadecimal format
         """
-        Get the current cipher instance
-        
-        :raises HTTPException: If cipher has not been initialized
-        """
-        if cls._current_cipher is None:
-            raise HTTPException(
-                status_code=400, 
-                detail="Cipher not initialized. Please provide a key first."
-            )
-        return cls._current_cipher
-    
+        return keyManagement.get_aes_cipher(key)
+
+
+class RequestStreamingResponse(Response):
+    """
+    Streaming response for body iterators that consume the request body themselves.
+
+    Written directly against ASGI rather than on top of StreamingResponse, which reads
+    `receive` while streaming to detect client disconnects and would swallow the request
+    body messages. Here `receive` is only read once `body_consumed` has been set by the
+    body iterator; a disconnect while the body is still being read surfaces from
+    `request.stream()` instead, and a disconnect afterwards stops the stream.
+    """
+
+    def __init__(
+        self,
+        content: AsyncIterator[bytes],
+        body_consumed: anyio.Event,
+        status_code: int = 200,
+        media_type: Optional[str] = None,
+        background=None,
+    ):
+        self.body_iterator = content
+        self.body_consumed = body_consumed
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = background
+        self.raw_headers = [(b"content-type", media_type.encode("latin-1"))] if media_type else []
+
+    async def stream_response(self, send):
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            async for chunk in self.body_iterator:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except OSError:
+            # ASGI 2.4 servers report a disconnect by failing `send`
+            return
+
+    async def listen_for_disconnect(self, receive):
+        await self.body_consumed.wait()
+        while (await receive())["type"] != "http.disconnect":
+            pass
 
-@router.post("/encrypt")
-async def encrypt_endpoint(request: AESEncryptRequest):
+    async def __call__(self, scope, receive, send):
+        streaming = asyncio.ensure_future(self.stream_response(send))
+        listening = asyncio.ensure_future(self.listen_for_disconnect(receive))
+        try:
+            await asyncio.wait({streaming, listening}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            listening.cancel()
+            streaming.cancel()
+        try:
+            # Re-raises an error of the body iterator; a stream stopped by a disconnect was cancelled
+            await streaming
+        except asyncio.CancelledError:
+            if not listening.done() or listening.cancelled():
+                raise
+
+        if self.background is not None:
+            await self.background()
+
+
+async def _stream_update(operation: str, update, chunk: bytes) -> bytes:
+    """
+    Feed `chunk` to a stream encryptor or decryptor, off the event loop when it is large.
+    The stream state cannot leave this process, so a process-based executor is bypassed.
+    """
+    if len(chunk) < STREAM_OFFLOAD_BYTES:
+        return update(chunk)
+    if crypto_executor.kind == "thread":
+        return await crypto_executor.run(operation, update, chunk)
+    return await run_in_threadpool(update, chunk)
+
+
+async def _stream_through(request: Request, body_consumed: anyio.Event, operation: str, processor):
+    """
+    Run the request body through `processor` and return the response body iterator.
+
+    The first output chunk is computed before the response starts, so an invalid key,
+    header or first segment is still reported with a proper status code.
+    """
+
+    async def chunks():
+        try:
+            async for chunk in request.stream():
+                if chunk:
+                    output = await _stream_update(operation, processor.update, chunk)
+                    if output:
+                        yield output
+        except ClientDisconnect:
+            return
+        finally:
+            body_consumed.set()
+        # At most one segment is left to process
+        yield processor.finalize()
+
+    iterator = chunks()
+    try:
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def with_first():
+        yield first
+        async for chunk in iterator:
+            yield chunk
+
+    return with_first()
+
+
+def _encrypt(key: str, plaintext: str, mode: str = "CBC") -> str:
+    return CipherManager.get_cipher(key).encrypt(plaintext, mode)
+
+
+def _decrypt(key: str, encrypted_text: str) -> str:
+    return CipherManager.get_cipher(key).decrypt(encrypted_text)
+
+
+def _encrypt_bytes(key: str, plaintext, mode: str = "CBC") -> bytes:
+    return CipherManager.get_cipher(key).encrypt_bytes(plaintext, mode)
+
+
+def _decrypt_bytes(key: str, data, mode: str = "CBC") -> bytes:
+    return CipherManager.get_cipher(key).decrypt_bytes(data, mode)
+
+
+@router.post("/encrypt", openapi_extra=wire.request_body_schema(AESEncryptRequest, "plaintext"))
+async def encrypt_endpoint(request: Request):
     """
     Encrypt the given plaintext using a provided key
     
-    - Takes a plaintext string and a 32-byte key
-    - Returns base64 encoded encrypted text
+    - Takes a plaintext string, a 32-byte key and an optional mode (CBC, GCM or CHACHA20-POLY1305)
+    - Returns base64 encoded encrypted text; authenticated modes prefix it with a versioned header
+    - With the binary wire format (plaintext | key | mode) and `Accept: application/octet-stream`,
+      returns the raw IV/nonce + ciphertext without header or base64
     """
+    if wire.is_binary_request(request):
+        data, plaintext = await wire.read_binary_request(request, AESEncryptRequest, "plaintext")
+    else:
+        data = await wire.read_json_request(request, AESEncryptRequest)
+        plaintext = data.plaintext
     try:
-        decrypted_key =  keyManagement.decrypt_aes_key(request.key, keyManagement.KEK)
-        # Initialize cipher with the provided key
-        cipher = CipherManager.initialize_cipher(decrypted_key)
-        # Encrypt the plaintext
-        encrypted_text = cipher.encrypt(request.plaintext)
+        if wire.wants_binary_response(request):
+            if isinstance(plaintext, str):
+                plaintext = plaintext.encode("utf-8")
+            ciphertext = await crypto_executor.run("aes_encrypt", _encrypt_bytes, data.key, plaintext, data.mode)
+            return wire.binary_response(ciphertext)
+        encrypted_text = await crypto_executor.run(
+            "aes_encrypt", _encrypt, data.key, plaintext, data.mode
+        )
         return {"AES_encrypted_text": encrypted_text}
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.post("/decrypt")
-async def decrypt_endpoint(request: AESDecryptRequest):
+@router.post("/decrypt", openapi_extra=wire.request_body_schema(AESDecryptRequest, "encrypted_text"))
+async def decrypt_endpoint(request: Request):
     """
     Decrypt the given encrypted text using a provided key
     
-    - Takes a base64 encoded encrypted text and a 32-byte key
+    - Takes a base64 encoded encrypted text and a 32-byte key; the mode is read from its header
     - Returns the original plaintext
+    - With the binary wire format (raw IV/nonce + ciphertext | key | mode, CBC if empty),
+      the mode must be given explicitly; `Accept: application/octet-stream` returns raw plaintext
     """
+    if wire.is_binary_request(request):
+        data, ciphertext = await wire.read_binary_request(request, AESDecryptRequest, "encrypted_text")
+    else:
+        data, ciphertext = await wire.read_json_request(request, AESDecryptRequest), None
     try:
-        # Decrypt the key     
-        decrypted_key =  keyManagement.decrypt_aes_key(request.key, keyManagement.KEK)
-
-        # Initialize cipher with the provided key
-        cipher = CipherManager.initialize_cipher(decrypted_key)
-        
-        # Decrypt the text
-        decrypted_text = cipher.decrypt(request.encrypted_text)
-        return {"AES_decrypted_text": decrypted_text}
+        if ciphertext is not None:
+            plaintext = await crypto_executor.run(
+                "aes_decrypt", _decrypt_bytes, data.key, ciphertext, data.mode or "CBC"
+            )
+        else:
+            decrypted_text = await crypto_executor.run("aes_decrypt", _decrypt, data.key, data.encrypted_text)
+            if not wire.wants_binary_response(request):
+                return {"AES_decrypted_text": decrypted_text}
+            plaintext = decrypted_text.encode("utf-8")
+        if wire.wants_binary_response(request):
+            return wire.binary_response(plaintext)
+        return {"AES_decrypted_text": plaintext.decode("utf-8")}
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=400, detail="Decryption failed. Invalid encrypted text.")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="Decryption failed. Invalid encrypted text.")
+
+@router.post("/encrypt-stream")
+async def encrypt_stream_endpoint(request: Request, x_aes_key: str = Header(...)):
+    """
+    Encrypt a raw request body of any size using the key given in the X-AES-Key header
+
+    - Takes an application/octet-stream body and a KEK-wrapped 32-byte key
+    - Streams back the segmented AES-256-GCM format (the layout of ParallelAESGCM, 64 KiB
+      segments), buffering at most one segment of the body
+    """
+    try:
+        encryptor = CipherManager.get_cipher(x_aes_key).stream_encryptor()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body_consumed = anyio.Event()
+    content = await _stream_through(request, body_consumed, "aes_stream_encrypt", encryptor)
+    return RequestStreamingResponse(content, body_consumed, media_type="application/octet-stream")
+
+@router.post("/decrypt-stream")
+async def decrypt_stream_endpoint(request: Request, x_aes_key: str = Header(...)):
+    """
+    Decrypt a request body produced by /encrypt-stream using the key given in the X-AES-Key header
+
+    - Takes an application/octet-stream body in the segmented AES-256-GCM format
+    - Streams back the plaintext one segment at a time, each only after its tag has been
+      verified; nothing unauthenticated is ever released
+    - A bad key, header or first segment is answered with 400; a later segment failing
+      authentication (or a truncated stream) aborts the response, since the status has been sent
+    """
+    try:
+        decryptor = CipherManager.get_cipher(x_aes_key).stream_decryptor()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body_consumed = anyio.Event()
+    content = await _stream_through(request, body_consumed, "aes_stream_decrypt", decryptor)
+    return RequestStreamingResponse(content, body_consumed, media_type="application/octet-stream")
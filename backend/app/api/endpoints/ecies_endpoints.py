@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from backend.app.core.ecies_service import ECIESCipher
+from backend.app.core.crypto_executor import crypto_executor, ExecutorSaturated
+
+router = APIRouter()
+
+class ECIESEncryptRequest(BaseModel):
+    plaintext: str
+    key: str
+
+class ECIESDecryptRequest(BaseModel):
+    ciphertext: str
+    key: str
+
+
+@router.post("/encrypt")
+async def encrypt(data: ECIESEncryptRequest):
+    """
+    Encrypt plaintext of any size for the provided X25519 public key.
+    """
+    try:
+        ecies_service = ECIESCipher(data.key)
+        ciphertext = await crypto_executor.run("ecies_encrypt", ecies_service.encrypt, data.plaintext)
+        return {"ciphertext": ciphertext}
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Encryption failed: {str(e)}")
+
+@router.post("/decrypt")
+async def decrypt(data: ECIESDecryptRequest):
+    """
+    Decrypt ciphertext using the provided AES-encrypted X25519 private key.
+    """
+    try:
+        ecies_service = ECIESCipher(data.key)
+        plaintext = await crypto_executor.run("ecies_decrypt", ecies_service.decrypt, data.ciphertext)
+        return {"plaintext": plaintext}
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
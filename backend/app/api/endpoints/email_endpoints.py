@@ -1,8 +1,10 @@
 from dotenv import load_dotenv
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Depends, Query
 from backend.app.core.auth import get_current_user
-from backend.app.core.email_service import EmailService
-from backend.app.models.email import Email
+from backend.app.core.email_service import EmailService, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.app.models.email import Email, EmailPage
 from backend.app.database.session import db_instance
 from backend.app.models.get_email_request import GetEmailRequest
 
@@ -19,19 +21,27 @@ def create_email(email: Email):
     else:
         raise HTTPException(status_code=500, detail="Failed to create email.")
 
-@router.get("/inbox", response_model=list[Email])
-async def get_emails(current_user: str = Depends(get_current_user)):
+@router.get("/inbox", response_model=EmailPage)
+async def get_emails(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+        current_user: str = Depends(get_current_user)):
     try:
-        emails = email_service.get_emails(current_user)
-        return emails
+        return await email_service.get_inbox_page_async(current_user, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/sent", response_model=list[Email])
-async def get_sent_emails(current_user: str = Depends(get_current_user)):
+@router.get("/sent", response_model=EmailPage)
+async def get_sent_emails(
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = Query(None),
+        current_user: str = Depends(get_current_user)):
     try:
-        emails = email_service.get_sent_emails(current_user)
-        return emails
+        return await email_service.get_sent_page_async(current_user, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -41,7 +51,7 @@ async def get_email(
         email_id: int = Query(...),
         current_user: str = Depends(get_current_user)):
     try:
-        email = email_service.get_email_by_id(email_id, current_user)
+        email = await email_service.get_email_by_id_async(email_id, current_user)
         return email
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
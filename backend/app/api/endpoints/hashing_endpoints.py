@@ -1,9 +1,22 @@
-from fastapi import APIRouter, HTTPException, status
+import base64
+import binascii
+import os
+from typing import Dict, List
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from backend.app.core.hashing import hash_password, verify_password, hash_text, verify_hash
+from backend.app.api import wire
+from backend.app.core.hashing import (
+    hash_password, verify_password, hash_bytes, verify_hash, verify_digest, MultiHasher, STREAM_HASH_ALGORITHMS,
+    MerkleTree, MerkleLeafHasher, MERKLE_CHUNK_SIZE, verify_merkle_proof, hash_texts, verify_hashes,
+)
+from backend.app.core.crypto_executor import bcrypt_executor, ExecutorSaturated, STREAM_OFFLOAD_BYTES
 
 router = APIRouter()
 
+# Largest number of items accepted by the batch endpoints in one request
+HASH_BATCH_MAX_ITEMS = int(os.getenv("HASH_BATCH_MAX_ITEMS", "10000"))
+
 class HashPasswordRequest(BaseModel):
     password: str
 
@@ -30,39 +43,256 @@ class VerifyHashRequest(BaseModel):
 class VerifyHashResponse(BaseModel):
     is_valid: bool
 
+class HashBatchRequest(BaseModel):
+    texts: List[str]
+
+class HashBatchResponse(BaseModel):
+    hash_values: List[str]
+
+class VerifyBatchRequest(BaseModel):
+    items: List[VerifyHashRequest]
+
+class VerifyBatchResponse(BaseModel):
+    results: List[bool]
+    valid_count: int
+
+class StreamHashResponse(BaseModel):
+    size: int
+    digests: Dict[str, str]
+
+class MerkleResponse(BaseModel):
+    root: str
+    chunk_size: int
+    size: int
+    leaves: List[str]
+    proofs: Dict[int, List[str]] = {}
+
+class MerkleVerifyChunkRequest(BaseModel):
+    chunk: str  # base64
+    index: int
+    leaf_count: int
+    proof: List[str]
+    root: str
+
+class MerkleChunkUpdate(BaseModel):
+    index: int
+    chunk: str  # base64
+
+class MerkleUpdateRequest(BaseModel):
+    leaves: List[str]
+    changes: List[MerkleChunkUpdate]
+
+class MerkleUpdateResponse(BaseModel):
+    root: str
+    leaves: Dict[int, str]
+    proofs: Dict[int, List[str]]
+
 # Endpoints
 @router.post("/hash-password", response_model=HashPasswordResponse, status_code=status.HTTP_200_OK)
-def hash_password_endpoint(request: HashPasswordRequest):
+async def hash_password_endpoint(request: HashPasswordRequest):
     try:
-        hashed_password = hash_password(request.password)
+        hashed_password = await bcrypt_executor.run("bcrypt_hash", hash_password, request.password)
         return HashPasswordResponse(hashed_password=hashed_password)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.post("/verify-password", response_model=VerifyPasswordResponse, status_code=status.HTTP_200_OK)
-def verify_password_endpoint(request: VerifyPasswordRequest):
+async def verify_password_endpoint(request: VerifyPasswordRequest):
     try:
-        is_valid = verify_password(request.plain_password, request.hashed_password)
+        is_valid = await bcrypt_executor.run(
+            "bcrypt_verify", verify_password, request.plain_password, request.hashed_password
+        )
         return VerifyPasswordResponse(is_valid=is_valid)
+    except ExecutorSaturated as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@router.post("/hash-text", response_model=HashTextResponse, status_code=status.HTTP_200_OK)
-def hash_text_endpoint(request: HashTextRequest):
+@router.post(
+    "/hash-text",
+    response_model=HashTextResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra=wire.request_body_schema(HashTextRequest, "text"),
+)
+async def hash_text_endpoint(request: Request):
+    """
+    Hash text with SHA-256.
+
+    Accepts JSON or the binary wire format (raw text bytes); returns the hex digest,
+    or the raw 32-byte digest with `Accept: application/octet-stream`.
+    """
+    if wire.is_binary_request(request):
+        _, text = await wire.read_binary_request(request, HashTextRequest, "text")
+    else:
+        text = (await wire.read_json_request(request, HashTextRequest)).text.encode("utf-8")
     try:
-        hash_value = hash_text(request.text)
-        return HashTextResponse(hash_value=hash_value)
+        digest = await run_in_threadpool(hash_bytes, text)
+        if wire.wants_binary_response(request):
+            return wire.binary_response(digest)
+        return HashTextResponse(hash_value=digest.hex())
     except TypeError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
-@router.post("/verify-hash", response_model=VerifyHashResponse, status_code=status.HTTP_200_OK)
-def verify_hash_endpoint(request: VerifyHashRequest):
+@router.post(
+    "/verify-hash",
+    response_model=VerifyHashResponse,
+    status_code=status.HTTP_200_OK,
+    openapi_extra=wire.request_body_schema(VerifyHashRequest, "text"),
+)
+async def verify_hash_endpoint(request: Request):
+    """
+    Verify text against a hex SHA-256 digest.
+
+    Accepts JSON or the binary wire format (raw text bytes | hex digest); always answers in JSON.
+    """
+    if wire.is_binary_request(request):
+        data, text = await wire.read_binary_request(request, VerifyHashRequest, "text")
+    else:
+        data, text = await wire.read_json_request(request, VerifyHashRequest), None
     try:
-        is_valid = verify_hash(request.text, request.hash_value)
+        if text is not None:
+            is_valid = await run_in_threadpool(verify_digest, text, data.hash_value)
+        else:
+            is_valid = await run_in_threadpool(verify_hash, data.text, data.hash_value)
         return VerifyHashResponse(is_valid=is_valid)
     except TypeError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+def _check_batch_size(count: int):
+    if count > HASH_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,  # the name of this constant differs between Starlette versions
+            detail=f"Batch of {count} items exceeds the limit of {HASH_BATCH_MAX_ITEMS}",
+        )
+
+@router.post("/hash-batch", response_model=HashBatchResponse, status_code=status.HTTP_200_OK)
+async def hash_batch_endpoint(request: HashBatchRequest):
+    """
+    Hash many texts with SHA-256 in one request; hash values are returned in input order.
+    """
+    _check_batch_size(len(request.texts))
+    hash_values = await run_in_threadpool(hash_texts, request.texts)
+    return HashBatchResponse(hash_values=hash_values)
+
+@router.post("/verify-batch", response_model=VerifyBatchResponse, status_code=status.HTTP_200_OK)
+async def verify_batch_endpoint(request: VerifyBatchRequest):
+    """
+    Verify many (text, SHA-256 hash) pairs in one request with constant-time comparison.
+
+    - Returns one result per item, in input order, and the number of valid items
+    """
+    _check_batch_size(len(request.items))
+    results = await run_in_threadpool(verify_hashes, [(item.text, item.hash_value) for item in request.items])
+    return VerifyBatchResponse(results=results, valid_count=sum(results))
+
+@router.post("/stream", response_model=StreamHashResponse, status_code=status.HTTP_200_OK)
+async def hash_stream_endpoint(
+    request: Request,
+    algorithms: List[str] = Query(list(STREAM_HASH_ALGORITHMS)),
+):
+    """
+    Hash a raw request body of any size with several algorithms in one pass.
+
+    - Takes an application/octet-stream body and optional `algorithms` query parameters
+      (sha256, sha512, blake2b, sha3_256; all by default)
+    - Returns the body size and the hex digest for each algorithm, without buffering the body
+    """
+    try:
+        hasher = MultiHasher(algorithms)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    async for chunk in request.stream():
+        # hashlib releases the GIL on large buffers, so big chunks are hashed on a worker thread
+        if len(chunk) < STREAM_OFFLOAD_BYTES:
+            hasher.update(chunk)
+        else:
+            await run_in_threadpool(hasher.update, chunk)
+    return StreamHashResponse(size=hasher.size, digests=hasher.hexdigests())
+
+@router.post("/merkle", response_model=MerkleResponse, status_code=status.HTTP_200_OK)
+async def merkle_endpoint(
+    request: Request,
+    chunk_size: int = Query(MERKLE_CHUNK_SIZE, gt=0),
+    proof: List[int] = Query([]),
+):
+    """
+    Build a Merkle tree over a raw request body split into `chunk_size` chunks.
+
+    - Returns the root, the leaf hashes (keep them to update the tree later) and an
+      inclusion proof for each leaf index given as a `proof` query parameter
+    - Leaves are hashed as the body arrives; only the leaf hashes are kept, not the body
+    """
+    hasher = MerkleLeafHasher(chunk_size)
+    async for chunk in request.stream():
+        if len(chunk) < STREAM_OFFLOAD_BYTES:
+            hasher.update(chunk)
+        else:
+            await run_in_threadpool(hasher.update, chunk)
+    tree = await run_in_threadpool(hasher.tree)
+    try:
+        proofs = {index: [node.hex() for node in tree.proof(index)] for index in proof}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return MerkleResponse(
+        root=tree.root.hex(),
+        chunk_size=chunk_size,
+        size=hasher.size,
+        leaves=[leaf.hex() for leaf in tree.leaves],
+        proofs=proofs,
+    )
+
+@router.post("/merkle/verify-chunk", response_model=VerifyHashResponse, status_code=status.HTTP_200_OK)
+def merkle_verify_chunk_endpoint(request: MerkleVerifyChunkRequest):
+    """
+    Verify one chunk against a Merkle root using its inclusion proof, without the rest of the payload.
+    """
+    try:
+        is_valid = verify_merkle_proof(
+            base64.b64decode(request.chunk, validate=True),
+            request.index,
+            request.leaf_count,
+            [bytes.fromhex(node) for node in request.proof],
+            bytes.fromhex(request.root),
+        )
+        return VerifyHashResponse(is_valid=is_valid)
+    except (ValueError, binascii.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.post("/merkle/update", response_model=MerkleUpdateResponse, status_code=status.HTTP_200_OK)
+def merkle_update_endpoint(request: MerkleUpdateRequest):
+    """
+    Recompute a Merkle root after some chunks changed, from the stored leaf hashes.
+
+    - Only the changed chunks are sent and hashed; inner nodes are rebuilt from the leaves
+    - Returns the new root, the new leaf hashes and proofs for the changed indexes
+    """
+    for change in request.changes:
+        # Checked against the leaves sent: an empty list would otherwise become a one-leaf tree
+        if not 0 <= change.index < len(request.leaves):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Leaf index {change.index} out of range for {len(request.leaves)} leaves",
+            )
+    try:
+        tree = MerkleTree([bytes.fromhex(leaf) for leaf in request.leaves])
+        for change in request.changes:
+            tree.update_leaf(change.index, base64.b64decode(change.chunk, validate=True))
+    except (ValueError, binascii.Error) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    changed = sorted({change.index for change in request.changes})
+    return MerkleUpdateResponse(
+        root=tree.root.hex(),
+        leaves={index: tree.leaves[index].hex() for index in changed},
+        proofs={index: [node.hex() for node in tree.proof(index)] for index in changed},
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
-from backend.app.core.key_management import generate_rsa_key, generate_aes_key, fetch_keys, delete_key, fetch_public_key
+from backend.app.core.key_management import generate_rsa_key, generate_x25519_key, generate_aes_key, fetch_keys, delete_key, fetch_public_key
 from backend.app.core.auth import get_current_user
 from backend.app.models.key_generation_request import KeyGenerationRequest
 from backend.app.models.key_deletion_request import KeyDeleteRequest
@@ -11,6 +11,8 @@ def generate_key(body: KeyGenerationRequest, user_email: str = Depends(get_curre
     try:
         if body.key_type == "RSA":
             return generate_rsa_key(user_email)
+        elif body.key_type == "X25519":
+            return generate_x25519_key(user_email)
         elif body.key_type == "AES":
             return generate_aes_key(user_email)
         else:
@@ -35,8 +37,10 @@ def remove_key(body: KeyDeleteRequest, user_email: str = Depends(get_current_use
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/fetch-public-key")
-def fetch_pub_key(email: str = Query(...)):
+def fetch_pub_key(email: str = Query(...), key_type: str = Query("RSA")):
     try:
-        return fetch_public_key(email)
+        if key_type not in ("RSA", "X25519"):
+            raise ValueError("Invalid key type")
+        return fetch_public_key(email, key_type)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
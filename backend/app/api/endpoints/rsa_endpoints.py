@@ -1,30 +1,65 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from backend.app.api import wire
 from backend.app.models.encrypt_request import EncryptRequest
 from backend.app.models.decrypt_request import DecryptRequest
 from backend.app.core.rsa_service import RSACipher
+from backend.app.core.crypto_executor import crypto_executor, ExecutorSaturated
 
 router = APIRouter()
 
-@router.post("/encrypt")
-async def encrypt(data: EncryptRequest):
+@router.post("/encrypt", openapi_extra=wire.request_body_schema(EncryptRequest, "plaintext"))
+async def encrypt(request: Request):
     """
     Encrypt plaintext using the provided public key.
+
+    - mode "oaep": RSA-OAEP over the whole plaintext (limited to ~190 bytes with a 2048-bit key)
+    - mode "envelope": AES-256-GCM over the plaintext with an RSA-OAEP wrapped data key, for any size
+
+    Accepts JSON or the binary wire format (plaintext | key | mode); returns the ciphertext in hex,
+    or as raw bytes with `Accept: application/octet-stream`.
     """
+    if wire.is_binary_request(request):
+        data, plaintext = await wire.read_binary_request(request, EncryptRequest, "plaintext")
+    else:
+        data = await wire.read_json_request(request, EncryptRequest)
+        plaintext = data.plaintext.encode("utf-8")
     try:
         rsa_service = RSACipher(data.key)
-        ciphertext = rsa_service.encrypt(data.plaintext)
-        return {"ciphertext": ciphertext}
+        operation = "rsa_encrypt_envelope" if data.mode == "envelope" else "rsa_encrypt"
+        ciphertext = await crypto_executor.run(operation, rsa_service.encrypt_bytes, plaintext, data.mode)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Encryption failed: {str(e)}")
+    if wire.wants_binary_response(request):
+        return wire.binary_response(ciphertext)
+    return {"ciphertext": ciphertext.hex()}
 
-@router.post("/decrypt")
-async def decrypt(data: DecryptRequest):
+@router.post("/decrypt", openapi_extra=wire.request_body_schema(DecryptRequest, "ciphertext"))
+async def decrypt(request: Request):
     """
     Decrypt ciphertext using the provided AES-encrypted private key.
+
+    The mode must match the one used for encryption.
+
+    Accepts JSON (hex ciphertext) or the binary wire format (raw ciphertext | key | mode);
+    returns the plaintext as text, or as raw bytes with `Accept: application/octet-stream`.
     """
+    if wire.is_binary_request(request):
+        data, ciphertext = await wire.read_binary_request(request, DecryptRequest, "ciphertext")
+    else:
+        data = await wire.read_json_request(request, DecryptRequest)
+        ciphertext = data.ciphertext
     try:
+        if isinstance(ciphertext, str):
+            ciphertext = bytes.fromhex(ciphertext)
         rsa_service = RSACipher(data.key)
-        plaintext = rsa_service.decrypt(data.ciphertext)
-        return {"plaintext": plaintext}
+        operation = "rsa_decrypt_envelope" if data.mode == "envelope" else "rsa_decrypt"
+        plaintext = await crypto_executor.run(operation, rsa_service.decrypt_bytes, ciphertext, data.mode)
+        if wire.wants_binary_response(request):
+            return wire.binary_response(plaintext)
+        return {"plaintext": plaintext.decode("utf-8")}
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
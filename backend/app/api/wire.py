@@ -0,0 +1,144 @@
+"""
+Binary wire format shared by the /rsa, /aes and /hash routers.
+
+JSON stays the default. Clients opt into the binary format per request:
+
+- `Content-Type: application/octet-stream` sends the request body as a sequence of
+  length-prefixed fields: a 4-byte big-endian length followed by that many bytes, one
+  field per request model field, in the model's declaration order. The payload field
+  (plaintext, ciphertext, text) carries raw bytes instead of text/hex/base64; every other
+  field is UTF-8 text, and an empty field means "use the default".
+- `Accept: application/octet-stream` returns the raw result bytes instead of a JSON object.
+
+Fields are returned as memoryview slices of the request body, so the payload reaches the
+cryptographic primitives without an intermediate copy or decoding step.
+"""
+import struct
+from typing import List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+FIELD_LENGTH = struct.Struct(">I")
+
+
+def is_binary_request(request: Request) -> bool:
+    """
+    Return True if the request body uses the binary framing.
+    """
+    content_type = request.headers.get("content-type", "")
+    return content_type.split(";", 1)[0].strip().lower() == BINARY_MEDIA_TYPE
+
+
+def wants_binary_response(request: Request) -> bool:
+    """
+    Return True if the client asked for a raw binary response.
+    """
+    accept = request.headers.get("accept", "")
+    return any(
+        part.split(";", 1)[0].strip().lower() == BINARY_MEDIA_TYPE for part in accept.split(",")
+    )
+
+
+def pack_fields(*fields) -> bytes:
+    """
+    Frame bytes-like fields with their 4-byte big-endian lengths.
+    """
+    return b"".join(FIELD_LENGTH.pack(len(field)) + bytes(field) for field in fields)
+
+
+def split_fields(body, count: int) -> List[memoryview]:
+    """
+    Split a framed body into at most `count` fields without copying them.
+
+    Missing trailing fields are returned as empty views.
+
+    :raises ValueError: If a length prefix is truncated or exceeds the body
+    """
+    view = memoryview(body)
+    fields = []
+    offset = 0
+    while offset < len(view):
+        if len(fields) == count:
+            raise ValueError(f"Binary body has more than {count} fields")
+        if offset + FIELD_LENGTH.size > len(view):
+            raise ValueError("Truncated field length in binary body")
+        (length,) = FIELD_LENGTH.unpack_from(view, offset)
+        offset += FIELD_LENGTH.size
+        if offset + length > len(view):
+            raise ValueError("Field length exceeds binary body")
+        fields.append(view[offset:offset + length])
+        offset += length
+    fields.extend(memoryview(b"") for _ in range(count - len(fields)))
+    return fields
+
+
+async def read_json_request(request: Request, model: Type[BaseModel]) -> BaseModel:
+    """
+    Parse and validate a JSON body, raising the usual 422 error on invalid input.
+    """
+    try:
+        return model.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+
+async def read_binary_request(
+    request: Request, model: Type[BaseModel], payload_field: str
+) -> Tuple[BaseModel, memoryview]:
+    """
+    Parse a framed binary body into the request model and the raw payload.
+
+    The payload is returned separately as a memoryview; the model holds an empty
+    string in its place, so only the small text fields are decoded and validated.
+    """
+    names = list(model.model_fields)
+    try:
+        fields = split_fields(await request.body(), len(names))
+        values = {}
+        payload: Optional[memoryview] = None
+        for name, field in zip(names, fields):
+            if name == payload_field:
+                payload = field
+                values[name] = ""
+            elif len(field):
+                values[name] = str(field, "utf-8")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid binary body: {str(e)}")
+    try:
+        return model.model_validate(values), payload
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+
+
+def binary_response(data) -> Response:
+    """
+    Return raw bytes as an application/octet-stream response.
+    """
+    return Response(content=bytes(data), media_type=BINARY_MEDIA_TYPE)
+
+
+def request_body_schema(model: Type[BaseModel], payload_field: str) -> dict:
+    """
+    OpenAPI `requestBody` for handlers that read the request themselves, documenting both formats.
+    """
+    fields = ", ".join(
+        f"{name} (raw bytes)" if name == payload_field else name for name in model.model_fields
+    )
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                BINARY_MEDIA_TYPE: {
+                    "schema": {
+                        "type": "string",
+                        "format": "binary",
+                        "description": f"Length-prefixed fields: {fields}",
+                    }
+                },
+            },
+        }
+    }
@@ -1,31 +1,104 @@
 from datetime import datetime, timedelta, timezone
-from fastapi import Request, HTTPException, status
+from typing import Callable, List, Optional
+from fastapi import BackgroundTasks, Request, HTTPException, status
 from jose import jwt, JWTError
-from .hashing import hash_password, verify_password
+from .hashing import (
+    hash_password, verify_and_update_password, password_hash_needs_update, new_bcrypt_salt, invalidate_derived_keys
+)
+from .crypto_executor import bcrypt_executor
+from .cache import TTLCache
+from . import metrics
+import base64
+import logging
+import secrets
+import time
 from ..database.session import db_instance
 import os
 from dotenv import load_dotenv
 import hashlib
 from backend.app.core.challenge_auth.challenge_manager import challenge_manager
 from backend.app.core.challenge_auth.encryption_manager import encryption_manager
+from backend.app.core.token_revocation import token_denylist
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
+
+logger = logging.getLogger(__name__)
+
+LOGIN_USER_PROJECTION = {"hashed_password": 1, "_id": 0}
+
+# Verified token payloads keyed by SHA-256 of the token; each entry lives until the token's exp
+token_cache = TTLCache(
+    "decoded_tokens",
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "4096")),
+    ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+metrics.register("decoded_tokens", token_cache.stats)
+
+# Callables taking a decoded payload and returning True if the token has been revoked
+_revocation_checks: List[Callable[[dict], bool]] = []
+
+def register_revocation_check(check: Callable[[dict], bool]):
+    """
+    Register a check run on every authenticated request, cached or not.
+
+    Checks must be cheap and must not block on I/O.
+    """
+    _revocation_checks.append(check)
+
+register_revocation_check(lambda payload: token_denylist.is_revoked(payload.get("jti")))
+
+def revoke_token(token: str) -> bool:
+    """
+    Revoke a token until it expires, on every worker. Returns False if the token was not valid.
+    """
+    try:
+        payload = _decode_token(token)
+    except JWTError:
+        return False
+    evict_token(token)
+    if "jti" not in payload:
+        return False
+    token_denylist.revoke(payload["jti"], payload["exp"])
+    return True
+
+def evict_token(token: str):
+    """
+    Remove a token from the decoded-token cache.
+    """
+    token_cache.invalidate(hashlib.sha256(token.encode()).digest())
+
+def _decode_token(token: str) -> dict:
+    """
+    Verify a token and return its payload, using the cache when possible.
+
+    :raises JWTError: If the token is invalid or expired
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
+        remaining = payload.get("exp", 0) - time.time()
+        if remaining > 0:
+            token_cache.set(digest, payload, ttl_seconds=remaining)
+    return payload
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(16)})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def register_user(email: str, password: str):
+async def register_user(email: str, password: str):
     users = db_instance.get_collection("users")
     if users.find_one({"email": email}):
         raise ValueError("User already exists")
 
-    hashed_pwd = hash_password(password)
+    # bcrypt runs on its bounded pool; raises ExecutorSaturated when the queue is full
+    hashed_pwd = await bcrypt_executor.run("bcrypt_hash", hash_password, password)
     user_data = {"email": email, "hashed_password": hashed_pwd}
     result = users.insert_one(user_data)
     print(f"Inserted ID: {result.inserted_id}")
@@ -34,10 +107,34 @@ def register_user(email: str, password: str):
 def authenticate_user(email: str, password: str):
     users = db_instance.get_collection("users")
     user = users.find_one({"email": email})
-    if not user or not verify_password(password, user["hashed_password"]):
+    if not user:
         return None
+    is_valid, new_hash = bcrypt_executor.call(
+        "bcrypt_verify", verify_and_update_password, password, user["hashed_password"]
+    )
+    if not is_valid:
+        return None
+    if new_hash:
+        migrate_password_hash(email, user["hashed_password"], new_hash)
+        user["hashed_password"] = new_hash
     return user
 
+def migrate_password_hash(email: str, old_hash: str, new_hash: str) -> bool:
+    """
+    Replace a user's password hash, only if it still is `old_hash`.
+
+    Returns True if the stored hash was updated.
+    """
+    users = db_instance.get_collection("users")
+    result = users.update_one(
+        {"email": email, "hashed_password": old_hash},
+        {"$set": {"hashed_password": new_hash}},
+    )
+    if result.modified_count:
+        invalidate_derived_keys(old_hash)
+        logger.info(f"Migrated password hash for {email} to cost {new_hash[4:6]}")
+    return bool(result.modified_count)
+
 def get_all_users():
     users = db_instance.get_collection("users")
     all_users = list(users.find({}))
@@ -54,9 +151,9 @@ def get_current_user(request: Request):
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token not found in cookies"
             )
-        payload = jwt.decode(token, SECRET_KEY, algorithms=ALGORITHM)
+        payload = _decode_token(token)
         email: str = payload.get("sub")
-        if email is None:
+        if email is None or any(check(payload) for check in _revocation_checks):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
@@ -68,44 +165,108 @@ def get_current_user(request: Request):
             detail="Could not validate credentials"
         )
 
-def request_login_challenge(email: str):
-    """Handle login challenge request business logic"""
+def request_login_challenge(email: str, client_ip: Optional[str] = None):
+    """
+    Handle login challenge request business logic
+
+    :raises ChallengeLimitExceeded: If too many challenges are outstanding overall or for `client_ip`
+    """
     users = db_instance.get_collection("users")
-    user = users.find_one({"email": email})
+    user = users.find_one({"email": email}, LOGIN_USER_PROJECTION)
 
     if not user:
         raise ValueError("User not found")
 
+    # Kept with the challenge in its store, so the validation step does not read the user
+    # again and works on any worker: the hash the challenge is bound to, and the rehash salt
+    context = {"hashed_password": user["hashed_password"]}
+
+    # The server never sees the password here, so a stale hash is rehashed by the client:
+    # it hashes the password with this salt too and returns it encrypted under the login key
+    if password_hash_needs_update(user["hashed_password"]):
+        context["rehash_salt"] = new_bcrypt_salt()
+
     # Extract salt from stored bcrypt hash (first 29 chars)
     bcrypt_salt = user["hashed_password"][:29]
-    challenge = challenge_manager.generate_challenge(email)
+    challenge = challenge_manager.generate_challenge(email, client_ip, context)
 
-    return {
+    result = {
         "challenge": challenge,
         "salt": bcrypt_salt
     }
+    if "rehash_salt" in context:
+        result["rehash_salt"] = context["rehash_salt"]
 
+    return result
 
-def validate_login_challenge(email: str, encrypted_challenge: str):
-    """Handle challenge validation business logic"""
-    users = db_instance.get_collection("users")
-    user = users.find_one({"email": email})
 
-    if not user:
-        raise ValueError("User not found")
+def validate_login_challenge(
+    email: str,
+    encrypted_challenge: str,
+    encrypted_rehash: Optional[str] = None,
+    background_tasks: Optional[BackgroundTasks] = None,
+):
+    """
+    Handle challenge validation business logic
 
-    # Get stored bcrypt hash and derive key
-    hashed_password = user["hashed_password"]
-    key = hashlib.sha256(hashed_password.encode()).digest()
+    If the challenge response offered a rehash_salt, `encrypted_rehash` carries the password
+    hashed with it, encrypted like the challenge; the stored hash is then migrated in the
+    background (or inline when no `background_tasks` is given).
+
+    The challenge is consumed first, whatever the outcome; its context holds the hash it was
+    issued for, so the user is not read again.
+    """
+    taken = challenge_manager.take_challenge(email)
+    if taken is None:
+        challenge_manager.verify_response(email, None, "")
+        raise ValueError("Invalid challenge response")
+    stored_challenge, context = taken
 
-    # Decrypt and validate challenge
+    hashed_password = context.get("hashed_password")
+    if hashed_password is None:
+        users = db_instance.get_collection("users")
+        user = users.find_one({"email": email}, LOGIN_USER_PROJECTION)
+
+        if not user:
+            raise ValueError("User not found")
+        hashed_password = user["hashed_password"]
+
+    # Derive key from the bcrypt hash, then decrypt and validate challenge
+    key = _challenge_key(hashed_password)
     decrypted_challenge = encryption_manager.decrypt(
         key,
         encrypted_challenge
     )
 
-    if not challenge_manager.validate_challenge(email, decrypted_challenge):
+    if not challenge_manager.verify_response(email, stored_challenge, decrypted_challenge):
         raise ValueError("Invalid challenge response")
 
+    rehash_salt = context.get("rehash_salt")
+    if encrypted_rehash and rehash_salt:
+        new_hash = _decrypt_rehash(key, encrypted_rehash, rehash_salt)
+        if new_hash is None:
+            logger.warning(f"Ignoring malformed password rehash for {email}")
+        elif background_tasks is not None:
+            background_tasks.add_task(migrate_password_hash, email, hashed_password, new_hash)
+        else:
+            migrate_password_hash(email, hashed_password, new_hash)
+
     # Create and return access token
-    return create_access_token(data={"sub": email})
\ No newline at end of file
+    return create_access_token(data={"sub": email})
+
+
+def _challenge_key(hashed_password: str) -> bytes:
+    return hashlib.sha256(hashed_password.encode()).digest()
+
+
+def _decrypt_rehash(key: bytes, encrypted_rehash: str, rehash_salt: str) -> Optional[str]:
+    """
+    Decrypt a client-computed rehash and check it was made with the salt we issued.
+    """
+    try:
+        new_hash = base64.b64decode(encryption_manager.decrypt(key, encrypted_rehash)).decode("ascii")
+    except Exception:
+        return None
+    if len(new_hash) != 60 or not new_hash.startswith(rehash_salt):
+        return None
+    return new_hash
@@ -0,0 +1,87 @@
+"""
+Pick the bcrypt cost that fits a latency budget on the current host.
+
+Run at startup by setting BCRYPT_TARGET_MS, or from the command line to get a
+value for BCRYPT_ROUNDS:
+
+    python -m backend.app.core.bcrypt_calibration --target-ms 250
+"""
+import argparse
+import logging
+import os
+import statistics
+import time
+
+import bcrypt
+from dotenv import load_dotenv
+
+from .hashing import configure_bcrypt_rounds
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# bcrypt costs below 10 are too weak for stored passwords, above 16 too slow for logins
+MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+MAX_ROUNDS = int(os.getenv("BCRYPT_MAX_ROUNDS", "16"))
+
+
+def measure_bcrypt_ms(rounds: int, samples: int = 3) -> float:
+    """
+    Return the median time in milliseconds of one bcrypt hash at the given cost.
+    """
+    timings = []
+    for _ in range(samples):
+        salt = bcrypt.gensalt(rounds)
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt_rounds(target_ms: float, min_rounds: int = MIN_ROUNDS, max_rounds: int = MAX_ROUNDS) -> int:
+    """
+    Return the highest bcrypt cost whose hashing time stays within `target_ms`.
+
+    Each extra round doubles the work, so only the cheapest cost is measured and the
+    others are extrapolated from it. The result is clamped to [min_rounds, max_rounds].
+    """
+    if not 4 <= min_rounds <= max_rounds <= 31:
+        raise ValueError("Rounds must satisfy 4 <= min_rounds <= max_rounds <= 31")
+    base_ms = measure_bcrypt_ms(min_rounds)
+    rounds = min_rounds
+    while rounds < max_rounds and base_ms * 2 ** (rounds + 1 - min_rounds) <= target_ms:
+        rounds += 1
+    logger.info(
+        f"bcrypt cost {min_rounds} takes {base_ms:.1f} ms; "
+        f"cost {rounds} fits the {target_ms:.0f} ms target (~{base_ms * 2 ** (rounds - min_rounds):.0f} ms)"
+    )
+    return rounds
+
+
+def configure_from_env():
+    """
+    Apply BCRYPT_ROUNDS if set, otherwise calibrate against BCRYPT_TARGET_MS if set.
+
+    With neither variable set, passlib's default cost is kept.
+    """
+    rounds = os.getenv("BCRYPT_ROUNDS")
+    target_ms = os.getenv("BCRYPT_TARGET_MS")
+    if rounds:
+        configure_bcrypt_rounds(int(rounds))
+    elif target_ms:
+        configure_bcrypt_rounds(calibrate_bcrypt_rounds(float(target_ms)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the bcrypt cost matching a latency budget on this host.")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Latency budget for one hash in milliseconds")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_ROUNDS)
+    args = parser.parse_args()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms, args.min_rounds, args.max_rounds)
+    print(f"BCRYPT_ROUNDS={rounds}  # measured {measure_bcrypt_ms(rounds):.0f} ms per hash")
+
+
+if __name__ == "__main__":
+    main()
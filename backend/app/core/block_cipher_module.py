@@ -1,18 +1,37 @@
 import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidTag
 import base64
 
+# Authenticated modes and the versioned header prefixed to their ciphertexts.
+# '$' is not in the base64 alphabet, so header-less text is always a legacy CBC blob.
+AEAD_MODES = {
+    "GCM": ("aes-256-gcm", 1, AESGCM),
+    "CHACHA20-POLY1305": ("chacha20-poly1305", 1, ChaCha20Poly1305),
+}
+AEAD_NONCE_LENGTH = 12
+
+
+def _aead_header(mode):
+    scheme, version, _ = AEAD_MODES[mode]
+    return f"${scheme}${version}$".encode('ascii')
+
+
 class AESCipher:
     """
-    A utility class for AES encryption and decryption using CBC mode.
+    A utility class for AES encryption and decryption using CBC or an authenticated mode.
     
     This implementation uses:
     - AES-256 encryption
-    - Cipher Block Chaining (CBC) mode
-    - PKCS7 padding
-    - Random IV generation for each encryption
+    - Cipher Block Chaining (CBC) mode with PKCS7 padding (default, header-less base64 output)
+    - AES-256-GCM or ChaCha20-Poly1305 (single pass, no padding, output prefixed with a
+      versioned header such as `$aes-256-gcm$1$`)
+    - Random IV/nonce generation for each encryption
     """
 
     """
@@ -30,12 +49,34 @@ class AESCipher:
     Encrypt the given plaintext.
     
     :param plaintext: String or bytes to encrypt
-    :return: Base64 encoded string containing IV and encrypted text
+    :param mode: "CBC", "GCM" or "CHACHA20-POLY1305"
+    :return: Base64 encoded string containing IV and encrypted text, prefixed with a header for authenticated modes
     """
-    def encrypt(self, plaintext):
+    def encrypt(self, plaintext, mode="CBC"):
         # Ensure plaintext is bytes
         if isinstance(plaintext, str):
             plaintext = plaintext.encode('utf-8')
+
+        data = self.encrypt_bytes(plaintext, mode)
+        encoded = base64.b64encode(data).decode('utf-8')
+        if mode in AEAD_MODES:
+            return _aead_header(mode).decode('ascii') + encoded
+        return encoded
+
+    """
+        Encrypt a bytes-like plaintext (e.g. a memoryview) without any text encoding.
+
+        :param plaintext: Bytes-like object to encrypt
+        :param mode: "CBC", "GCM" or "CHACHA20-POLY1305"
+        :return: IV (or nonce) followed by the ciphertext; authenticated modes still bind their header as associated data
+    """
+    def encrypt_bytes(self, plaintext, mode="CBC"):
+        if mode in AEAD_MODES:
+            aead = AEAD_MODES[mode][2]
+            nonce = os.urandom(AEAD_NONCE_LENGTH)
+            return nonce + aead(self.key).encrypt(nonce, plaintext, _aead_header(mode))
+        if mode != "CBC":
+            raise ValueError(f"Unsupported cipher mode: {mode}")
         
         # Generate a random 16-byte IV (Initialization Vector)
         iv = os.urandom(16)
@@ -52,26 +93,49 @@ class AESCipher:
         )
         encryptor = cipher.encryptor()
         
-        # Encrypt
-        ciphertext = encryptor.update(padded_data) + encryptor.finalize()
-        
-        # Combine IV and ciphertext and base64 encode
-        return base64.b64encode(iv + ciphertext).decode('utf-8')
+        # Encrypt and prefix the IV
+        return iv + encryptor.update(padded_data) + encryptor.finalize()
     
     """
         Decrypt the given encrypted text.
         
-        :param encrypted_text: Base64 encoded string containing IV and ciphertext
+        :param encrypted_text: Base64 encoded string containing IV and ciphertext, optionally with a mode header
         :return: Decrypted plaintext as string
     """
     def decrypt(self, encrypted_text):
+        if encrypted_text.startswith("$"):
+            mode, payload = self._parse_header(encrypted_text)
+        else:
+            mode, payload = "CBC", encrypted_text
         
         # Decode base64
-        encrypted_data = base64.b64decode(encrypted_text)
-        
+        encrypted_data = base64.b64decode(payload)
+        return self.decrypt_bytes(encrypted_data, mode).decode('utf-8')
+
+    """
+        Decrypt a bytes-like IV (or nonce) + ciphertext produced by `encrypt_bytes`.
+
+        :param data: Bytes-like object to decrypt; memoryviews are sliced without copying
+        :param mode: The mode used for encryption, raw bytes carry no header to detect it from
+        :return: Decrypted plaintext as bytes
+        :raises ValueError: If the mode is unknown or authentication fails
+    """
+    def decrypt_bytes(self, data, mode="CBC"):
+        data = memoryview(data)
+        if mode in AEAD_MODES:
+            aead = AEAD_MODES[mode][2]
+            try:
+                return aead(self.key).decrypt(
+                    bytes(data[:AEAD_NONCE_LENGTH]), data[AEAD_NONCE_LENGTH:], _aead_header(mode)
+                )
+            except InvalidTag:
+                raise ValueError("Ciphertext authentication failed")
+        if mode != "CBC":
+            raise ValueError(f"Unsupported cipher mode: {mode}")
+
         # Extract IV (first 16 bytes)
-        iv = encrypted_data[:16]
-        ciphertext = encrypted_data[16:]
+        iv = bytes(data[:16])
+        ciphertext = data[16:]
         
         # Create cipher
         cipher = Cipher(
@@ -86,6 +150,277 @@ class AESCipher:
         
         # Remove padding
         unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
-        plaintext = unpadder.update(padded_data) + unpadder.finalize()
-        
-        return plaintext.decode('utf-8')
\ No newline at end of file
+        return unpadder.update(padded_data) + unpadder.finalize()
+
+    """
+        Split a versioned header off an authenticated ciphertext.
+
+        :return: The mode named by the header and the base64 payload
+        :raises ValueError: If the header is malformed or unknown
+    """
+    @staticmethod
+    def _parse_header(encrypted_text):
+        try:
+            _, scheme, version, payload = encrypted_text.split("$", 3)
+        except ValueError:
+            raise ValueError("Malformed ciphertext header")
+        for mode, (candidate_scheme, candidate_version, _) in AEAD_MODES.items():
+            if scheme == candidate_scheme and version == str(candidate_version):
+                return mode, payload
+        raise ValueError(f"Unsupported ciphertext scheme: {scheme} v{version}")
+
+    """
+        Create an incremental encryptor for streamed input.
+
+        :param segment_size: Plaintext bytes sealed per segment
+        :return: AESStreamEncryptor producing the segmented AES-256-GCM format of `ParallelAESGCM`
+    """
+    def stream_encryptor(self, segment_size=None):
+        return AESStreamEncryptor(self.key, segment_size or STREAM_SEGMENT_SIZE)
+
+    """
+        Create an incremental decryptor for a stream produced by `stream_encryptor` or `ParallelAESGCM`.
+
+        :return: AESStreamDecryptor releasing plaintext one authenticated segment at a time
+    """
+    def stream_decryptor(self):
+        return AESStreamDecryptor(self.key)
+
+
+# Plaintext bytes per segment of streamed encryption, and the largest segment accepted when decrypting
+STREAM_SEGMENT_SIZE = 64 * 1024
+MAX_STREAM_SEGMENT_SIZE = 16 * 1024 * 1024
+
+
+class AESStreamEncryptor:
+    """
+    Incremental authenticated encryption, in the segmented AES-256-GCM layout of `ParallelAESGCM`.
+
+    The last segment is authenticated with a final flag, so a segment is only sealed once
+    input beyond it has arrived; at most one segment plus the latest chunk is buffered.
+    """
+
+    def __init__(self, key, segment_size=STREAM_SEGMENT_SIZE):
+        if len(key) != 32:
+            raise ValueError("Key must be 32 bytes long for AES-256")
+        if not 0 < segment_size <= MAX_STREAM_SEGMENT_SIZE:
+            raise ValueError("Invalid segment size")
+        self._aead = AESGCM(key)
+        self.segment_size = segment_size
+        self._header = ParallelAESGCM.HEADER.pack(ParallelAESGCM.VERSION, segment_size, os.urandom(8))
+        self._buffer = bytearray()
+        self._index = 0
+        self._header_sent = False
+
+    def update(self, data) -> bytes:
+        self._buffer += data
+        output = bytearray(self._take_header())
+        while len(self._buffer) > self.segment_size:
+            output += self._seal(self._buffer[:self.segment_size], final=False)
+            del self._buffer[:self.segment_size]
+        return bytes(output)
+
+    def finalize(self) -> bytes:
+        output = self._take_header() + self._seal(self._buffer, final=True)
+        self._buffer = bytearray()
+        return output
+
+    def _take_header(self) -> bytes:
+        if self._header_sent:
+            return b""
+        self._header_sent = True
+        return self._header
+
+    def _seal(self, segment, final) -> bytes:
+        if self._index >= ParallelAESGCM.MAX_SEGMENTS:
+            raise ValueError("Input too large for the segment size")
+        sealed = self._aead.encrypt(
+            ParallelAESGCM._nonce(self._header, self._index),
+            bytes(segment),
+            ParallelAESGCM._associated_data(self._header, final),
+        )
+        self._index += 1
+        return sealed
+
+
+class AESStreamDecryptor:
+    """
+    Incremental decryption of the segmented AES-256-GCM layout of `ParallelAESGCM`.
+
+    Plaintext is only returned for segments that passed authentication. A segment is
+    opened once input beyond it has arrived, or by `finalize` as the last one, so
+    truncating the stream at a segment boundary is detected as well.
+
+    :raises ValueError: If the header is invalid, a segment fails authentication or the stream is truncated
+    """
+
+    def __init__(self, key, max_segment_size=MAX_STREAM_SEGMENT_SIZE):
+        if len(key) != 32:
+            raise ValueError("Key must be 32 bytes long for AES-256")
+        self._aead = AESGCM(key)
+        self._max_segment_size = max_segment_size
+        self._header = None
+        self._stride = 0
+        self._buffer = bytearray()
+        self._index = 0
+
+    def update(self, data) -> bytes:
+        self._buffer += data
+        if self._header is None:
+            if len(self._buffer) < ParallelAESGCM.HEADER.size:
+                return b""
+            self._read_header()
+        output = bytearray()
+        while len(self._buffer) > self._stride:
+            output += self._open(self._buffer[:self._stride], final=False)
+            del self._buffer[:self._stride]
+        return bytes(output)
+
+    def finalize(self) -> bytes:
+        if self._header is None or len(self._buffer) < ParallelAESGCM.TAG_LENGTH:
+            raise ValueError("Encrypted stream is truncated")
+        plaintext = self._open(self._buffer, final=True)
+        self._buffer = bytearray()
+        return plaintext
+
+    def _read_header(self):
+        header = bytes(self._buffer[:ParallelAESGCM.HEADER.size])
+        version, segment_size, _ = ParallelAESGCM.HEADER.unpack(header)
+        if version != ParallelAESGCM.VERSION:
+            raise ValueError(f"Unsupported ciphertext version: {version}")
+        if not 0 < segment_size <= self._max_segment_size:
+            raise ValueError("Invalid segment size")
+        del self._buffer[:len(header)]
+        self._header = header
+        self._stride = segment_size + ParallelAESGCM.TAG_LENGTH
+
+    def _open(self, sealed, final) -> bytes:
+        try:
+            plaintext = self._aead.decrypt(
+                ParallelAESGCM._nonce(self._header, self._index),
+                bytes(sealed),
+                ParallelAESGCM._associated_data(self._header, final),
+            )
+        except InvalidTag:
+            raise ValueError(f"Segment {self._index} failed authentication")
+        self._index += 1
+        return plaintext
+
+
+class ParallelAESGCM:
+    """
+    Chunked AES-256-GCM for multi-gigabyte inputs, encrypting independent segments on a thread pool.
+
+    The input is split into fixed-size segments, each sealed with its own tag. `cryptography`
+    releases the GIL inside the AEAD calls, so throughput scales with the number of threads.
+
+    Layout:
+    version (1 byte) | segment size (4 bytes) | nonce prefix (8 bytes) | segment 0 | segment 1 | ...
+
+    Segment i is its ciphertext followed by a 16-byte tag, sealed with nonce = prefix || i (4 bytes).
+    The header and a final-segment flag are authenticated as associated data, so reordering,
+    truncating or extending the segment sequence makes decryption fail.
+    """
+
+    VERSION = 1
+    HEADER = struct.Struct(">BI8s")
+    TAG_LENGTH = 16
+    MAX_SEGMENTS = 2 ** 32
+
+    def __init__(self, key, segment_size=1024 * 1024, max_workers=None):
+        """
+        :param key: A 32-byte (256-bit) encryption key
+        :param segment_size: Plaintext bytes per segment
+        :param max_workers: Threads used per call, defaults to the CPU count
+        """
+        if len(key) != 32:
+            raise ValueError("Key must be 32 bytes long for AES-256")
+        if segment_size <= 0:
+            raise ValueError("Segment size must be positive")
+        self._aead = AESGCM(key)
+        self.segment_size = segment_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def encrypt(self, data):
+        """
+        Encrypt bytes-like `data` and return the segmented ciphertext as a bytearray.
+        """
+        view = memoryview(data).cast("B")
+        segment_count = max(1, -(-len(view) // self.segment_size))
+        if segment_count > self.MAX_SEGMENTS:
+            raise ValueError("Input too large for the segment size")
+
+        header = self.HEADER.pack(self.VERSION, self.segment_size, os.urandom(8))
+        output = bytearray(len(header) + len(view) + segment_count * self.TAG_LENGTH)
+        output[:len(header)] = header
+        stride = self.segment_size + self.TAG_LENGTH
+
+        def seal(index):
+            start = index * self.segment_size
+            segment = view[start:start + self.segment_size]
+            sealed = self._aead.encrypt(
+                self._nonce(header, index), segment, self._associated_data(header, index == segment_count - 1)
+            )
+            offset = len(header) + index * stride
+            output[offset:offset + len(sealed)] = sealed
+
+        self._run(seal, segment_count)
+        # Returned as-is: copying to bytes would add a full pass over multi-gigabyte outputs
+        return output
+
+    def decrypt(self, data):
+        """
+        Authenticate and decrypt a segmented ciphertext produced by `encrypt`, returning a bytearray.
+
+        :raises ValueError: If the header is invalid or any segment fails authentication
+        """
+        view = memoryview(data).cast("B")
+        if len(view) < self.HEADER.size + self.TAG_LENGTH:
+            raise ValueError("Ciphertext is too short")
+        header = bytes(view[:self.HEADER.size])
+        version, segment_size, _ = self.HEADER.unpack(header)
+        if version != self.VERSION:
+            raise ValueError(f"Unsupported ciphertext version: {version}")
+
+        body = view[self.HEADER.size:]
+        stride = segment_size + self.TAG_LENGTH
+        segment_count = -(-len(body) // stride)
+        last_length = len(body) - (segment_count - 1) * stride
+        if last_length < self.TAG_LENGTH:
+            raise ValueError("Ciphertext is truncated")
+
+        output = bytearray(len(body) - segment_count * self.TAG_LENGTH)
+
+        def open_segment(index):
+            start = index * stride
+            try:
+                plaintext = self._aead.decrypt(
+                    self._nonce(header, index),
+                    body[start:start + stride],
+                    self._associated_data(header, index == segment_count - 1),
+                )
+            except InvalidTag:
+                raise ValueError(f"Segment {index} failed authentication")
+            offset = index * segment_size
+            output[offset:offset + len(plaintext)] = plaintext
+
+        self._run(open_segment, segment_count)
+        return output
+
+    @staticmethod
+    def _nonce(header, index):
+        return header[5:13] + struct.pack(">I", index)
+
+    @staticmethod
+    def _associated_data(header, final):
+        return header + (b"\x01" if final else b"\x00")
+
+    def _run(self, fn, segment_count):
+        workers = min(self.max_workers, segment_count)
+        if workers == 1:
+            for index in range(segment_count):
+                fn(index)
+            return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() re-raises the first failure
+            list(executor.map(fn, range(segment_count)))
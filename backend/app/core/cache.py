@@ -0,0 +1,219 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after a time-to-live.
+
+    This implementation provides:
+    - A maximum number of entries, evicting the least recently used one when full
+    - A default TTL per entry, optionally overridden when the entry is stored
+    - Hit, miss, eviction and expiry counters for monitoring
+    - An optional `on_evict(key, value)` callback invoked whenever an entry leaves the cache
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int = 128,
+        ttl_seconds: float = 300.0,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param name: Name reported in the cache statistics
+        :param maxsize: Maximum number of entries kept in the cache
+        :param ttl_seconds: Default lifetime of an entry in seconds
+        :param on_evict: Callback invoked with (key, value) for every removed entry
+        :param clock: Monotonic time source, injectable for tests
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._on_evict = on_evict
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+        self._loads = 0
+        self._load_seconds = 0.0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for `key`, or `default` if it is missing or expired.
+        """
+        removed = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                removed = (key, value)
+            else:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+        self._notify([removed])
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """
+        Store `value` under `key`, evicting the least recently used entry if the cache is full.
+
+        :param ttl_seconds: Lifetime of this entry; defaults to the cache-wide TTL
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        removed = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None and previous[0] is not value:
+                removed.append((key, previous[0]))
+            self._entries[key] = (value, self._clock() + ttl)
+            while len(self._entries) > self.maxsize:
+                evicted_key, (evicted_value, _) = self._entries.popitem(last=False)
+                removed.append((evicted_key, evicted_value))
+                self._evictions += 1
+        self._notify(removed)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, calling `loader()` and caching its result on a miss.
+
+        The loader runs outside the cache lock, so two concurrent misses on the same key
+        may both load; the last result stored wins.
+        """
+        sentinel = _MISSING
+        value = self.get(key, sentinel)
+        if value is not sentinel:
+            return value
+
+        started = time.perf_counter()
+        value = loader()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._loads += 1
+            self._load_seconds += elapsed
+        self.set(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove `key` and return its value if present and not expired, without calling `on_evict`.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self._misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                self._expirations += 1
+                self._misses += 1
+                expired = True
+            else:
+                self._hits += 1
+                expired = False
+        if expired:
+            self._notify([(key, value)])
+            return default
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Remove `key` from the cache. Returns True if an entry was removed.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._invalidations += 1
+        self._notify([(key, entry[0])])
+        return True
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        Remove every entry whose key satisfies `predicate`. Returns the number removed.
+        """
+        removed = []
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                removed.append((key, self._entries.pop(key)[0]))
+            self._invalidations += len(removed)
+        self._notify(removed)
+        return len(removed)
+
+    def purge_expired(self) -> int:
+        """
+        Drop all expired entries. Returns the number removed.
+        """
+        removed = []
+        with self._lock:
+            now = self._clock()
+            for key in [k for k, (_, expires_at) in self._entries.items() if expires_at <= now]:
+                removed.append((key, self._entries.pop(key)[0]))
+            self._expirations += len(removed)
+        self._notify(removed)
+        return len(removed)
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            removed = [(key, value) for key, (value, _) in self._entries.items()]
+            self._entries.clear()
+        self._notify(removed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the cache counters.
+
+        `saved_seconds` estimates the time saved by hits, based on the average cost
+        of the loads performed through `get_or_load`.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            avg_load = self._load_seconds / self._loads if self._loads else 0.0
+            return {
+                "name": self.name,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+                "avg_load_seconds": avg_load,
+                "saved_seconds": self._hits * avg_load,
+            }
+
+    def _notify(self, removed):
+        if self._on_evict is None:
+            return
+        for item in removed:
+            if item is not None:
+                self._on_evict(item[0], item[1])
+
+
+_MISSING = object()
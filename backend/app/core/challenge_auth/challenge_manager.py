@@ -1,9 +1,17 @@
-from datetime import datetime, timedelta
-import secrets
-import threading
-from typing import Dict, Optional, Tuple
 import base64
+import binascii
+import hmac
 import logging
+import os
+import secrets
+import threading
+from typing import Optional, Tuple
+
+from dotenv import load_dotenv
+from backend.app.core import metrics
+from .challenge_store import ChallengeStore, ChallengeLimitExceeded, InMemoryChallengeStore, create_challenge_store
+
+load_dotenv()
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -11,70 +19,121 @@ logger = logging.getLogger(__name__)
 
 
 class ChallengeManager:
-    def __init__(self, challenge_timeout_seconds: int = 300):
-        self._challenges: Dict[str, Tuple[str, datetime]] = {}
+    """
+    Issues and validates single-use login challenges.
+
+    This implementation provides:
+    - One outstanding challenge per email; a new request replaces the previous one
+    - Pluggable storage (see `challenge_store`), so both login steps may be served by
+      different workers when a shared store is used
+    - Constant-time comparison of challenge responses
+    """
+
+    def __init__(
+        self,
+        challenge_timeout_seconds: int = 300,
+        store: Optional[ChallengeStore] = None,
+        cleanup_interval_seconds: float = 1.0,
+        start_cleanup: bool = True,
+    ):
+        """
+        :param challenge_timeout_seconds: Lifetime of a challenge
+        :param store: Where challenges are kept, defaults to an in-memory store
+        :param cleanup_interval_seconds: Delay between two expiry ticks of the cleanup thread
+        :param start_cleanup: Start the background cleanup thread, unless the store expires challenges itself
+        """
+        self.challenge_timeout_seconds = challenge_timeout_seconds
+        self.store = store if store is not None else InMemoryChallengeStore()
+        self.cleanup_interval_seconds = cleanup_interval_seconds
         self._lock = threading.Lock()
-        self._challenge_timeout = timedelta(seconds=challenge_timeout_seconds)
-        logger.info(f"ChallengeManager initialized with timeout: {challenge_timeout_seconds} seconds")
-
-        # Start cleanup thread
-        self._cleanup_thread = threading.Thread(target=self._cleanup_expired_challenges, daemon=True)
-        self._cleanup_thread.start()
-        logger.info("Cleanup thread started")
-
-    def generate_challenge(self, email: str) -> str:
+        self._generated = 0
+        self._validated = 0
+        self._failed = 0
+        logger.info(
+            f"ChallengeManager initialized with timeout: {challenge_timeout_seconds} seconds, "
+            f"store: {type(self.store).__name__}"
+        )
+
+        if start_cleanup and not self.store.self_expiring:
+            # Start cleanup thread
+            self._cleanup_thread = threading.Thread(target=self._cleanup_expired_challenges, daemon=True)
+            self._cleanup_thread.start()
+            logger.info("Cleanup thread started")
+
+    def generate_challenge(self, email: str, client_ip: Optional[str] = None, context: Optional[dict] = None) -> str:
         """
-        Generates a new challenge for the given email.
+        Generates a new challenge for the given email, replacing any outstanding one.
         Returns base64 encoded challenge string.
+
+        :param context: Kept with the challenge and returned by `take_challenge`, from any worker
+        :raises ChallengeLimitExceeded: If the global or per-IP cap is reached
         """
         logger.info(f"Generating challenge for email: {email}")
 
         # Generate 32 bytes (256 bits) of random data
-        challenge = secrets.token_bytes(32)
-        challenge_b64 = base64.b64encode(challenge).decode('utf-8')
-        logger.debug(f"Generated challenge: {challenge_b64}")
-
+        value = secrets.token_bytes(32)
+        self.store.put(email, value, self.challenge_timeout_seconds, client_ip, context)
         with self._lock:
-            self._challenges[email] = (challenge_b64, datetime.utcnow())
-            logger.debug(f"Stored challenge for {email}")
-
-        return challenge_b64
+            self._generated += 1
+        return base64.b64encode(value).decode('utf-8')
 
     def validate_challenge(self, email: str, response: str) -> bool:
         """
-        Validates the challenge response for the given email.
+        Validates the base64 challenge response for the given email.
+        The challenge is consumed whatever the outcome.
         Returns True if valid, False otherwise.
         """
-        logger.info(f"Validating challenge for email: {email}")
-
-        with self._lock:
-            if email not in self._challenges:
-                logger.error(f"No challenge found for email: {email}")
-                return False
+        taken = self.take_challenge(email)
+        return self.verify_response(email, taken[0] if taken else None, response)
 
-            stored_challenge, timestamp = self._challenges[email]
-            logger.debug(f"Retrieved stored challenge: {stored_challenge}")
-            logger.debug(f"Challenge timestamp: {timestamp}")
+    def take_challenge(self, email: str) -> Optional[Tuple[bytes, dict]]:
+        """
+        Consume the outstanding challenge for the given email.
+        Returns its value and the context given to `generate_challenge`, or None if missing or expired.
+        """
+        return self.store.take(email)
 
-            # Check if challenge has expired
-            time_elapsed = datetime.utcnow() - timestamp
-            logger.debug(f"Time elapsed: {time_elapsed}")
+    def verify_response(self, email: str, stored: Optional[bytes], response: str) -> bool:
+        """
+        Compares a base64 challenge response with a challenge taken by `take_challenge`, in constant time.
+        Returns True if valid, False otherwise (always when `stored` is None).
+        """
+        logger.info(f"Validating challenge for email: {email}")
 
-            if time_elapsed > self._challenge_timeout:
-                logger.error(f"Challenge expired for {email}. Elapsed time: {time_elapsed}")
-                del self._challenges[email]
-                return False
+        if stored is None:
+            logger.error(f"No valid challenge found for email: {email}")
+            result = False
+        else:
+            try:
+                response_bytes = base64.b64decode(response, validate=True)
+            except (binascii.Error, ValueError, TypeError):
+                response_bytes = b""
+            result = hmac.compare_digest(response_bytes, stored)
 
-            # Clean up after validation attempt
-            del self._challenges[email]
+        with self._lock:
+            if result:
+                self._validated += 1
+            else:
+                self._failed += 1
+        logger.info(f"Challenge validation result for {email}: {result}")
+        return result
+
+    def purge_expired(self) -> int:
+        """
+        Remove expired challenges from the store. Returns the number removed.
+        """
+        return self.store.purge_expired()
 
-            # Compare challenges
-            result = response == stored_challenge
-            logger.info(f"Challenge validation result for {email}: {result}")
-            logger.debug(f"Received response: {response}")
-            logger.debug(f"Expected challenge: {stored_challenge}")
+    def __len__(self) -> int:
+        return len(self.store)
 
-            return result
+    def stats(self) -> dict:
+        """
+        Return the store statistics and the validation counters.
+        """
+        with self._lock:
+            counters = {"generated": self._generated, "validated": self._validated, "failed": self._failed}
+        return {"store": type(self.store).__name__, **self.store.stats(), **counters}
 
     def _cleanup_expired_challenges(self):
         """
@@ -82,24 +141,26 @@ class ChallengeManager:
         Runs in a separate thread.
         """
         logger.info("Starting cleanup thread")
+        wait = threading.Event().wait
         while True:
-            with self._lock:
-                current_time = datetime.utcnow()
-                expired = [
-                    email for email, (_, timestamp) in self._challenges.items()
-                    if current_time - timestamp > self._challenge_timeout
-                ]
-
-                for email in expired:
-                    logger.info(f"Cleaning up expired challenge for {email}")
-                    del self._challenges[email]
-
-                if expired:
-                    logger.debug(f"Cleaned up {len(expired)} expired challenges")
-
-            # Sleep for 60 seconds before next cleanup
-            threading.Event().wait(60)
+            try:
+                removed = self.purge_expired()
+                if removed:
+                    logger.debug(f"Cleaned up {removed} expired challenges")
+            except Exception as e:
+                logger.error(f"Challenge cleanup failed: {str(e)}")
+            wait(self.cleanup_interval_seconds)
 
 
 # Global instance
-challenge_manager = ChallengeManager()
\ No newline at end of file
+challenge_manager = ChallengeManager(
+    challenge_timeout_seconds=int(os.getenv("CHALLENGE_TIMEOUT_SECONDS", "300")),
+    store=create_challenge_store(
+        os.getenv("CHALLENGE_STORE", "memory"),
+        max_outstanding=int(os.getenv("CHALLENGE_MAX_OUTSTANDING", "100000")),
+        # Per client address as resolved by api/client_address.py: behind a reverse proxy,
+        # set TRUSTED_PROXIES or every client shares the proxy's allowance
+        max_per_ip=int(os.getenv("CHALLENGE_MAX_PER_IP", "20")),
+    ),
+)
+metrics.register("challenges", challenge_manager.stats)
@@ -0,0 +1,426 @@
+import heapq
+import logging
+from abc import ABC, abstractmethod
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+
+class ChallengeLimitExceeded(Exception):
+    """
+    Raised when a new challenge would exceed the global or per-client cap.
+    """
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ChallengeStore(ABC):
+    """
+    Where outstanding challenges live between /auth/challenge and /auth/validate-challenge.
+
+    A store keeps one challenge per email; `put` replaces any previous one and `take`
+    removes and returns it atomically, so a challenge can be used at most once even
+    when both requests land on different workers. Whatever the validation step needs
+    from the challenge step travels in the challenge's `context`, for the same reason.
+    """
+
+    # True if the store drops expired challenges on its own, so no cleanup thread is needed
+    self_expiring = False
+
+    @abstractmethod
+    def put(
+        self,
+        email: str,
+        value: bytes,
+        ttl_seconds: float,
+        client_ip: Optional[str] = None,
+        context: Optional[dict] = None,
+    ):
+        """
+        Store a challenge for `email` for `ttl_seconds`.
+
+        :param context: Small dict of strings returned with the challenge by `take`
+        :raises ChallengeLimitExceeded: If the store is full or `client_ip` has too many challenges
+        """
+
+    @abstractmethod
+    def take(self, email: str) -> Optional[Tuple[bytes, dict]]:
+        """
+        Remove the challenge for `email` and return its value and context, or None if missing or expired.
+        """
+
+    def purge_expired(self) -> int:
+        """
+        Remove expired challenges. Returns the number removed.
+        """
+        return 0
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Return the number of outstanding challenges.
+        """
+
+    def stats(self) -> dict:
+        return {"outstanding": len(self)}
+
+
+class _Challenge:
+    """
+    One outstanding challenge: raw bytes, a monotonic expiry time and the caller's context.
+    """
+    __slots__ = ("email", "value", "expires_at", "client_ip", "context")
+
+    def __init__(self, email: str, value: bytes, expires_at: float, client_ip: Optional[str], context: dict):
+        self.email = email
+        self.value = value
+        self.expires_at = expires_at
+        self.client_ip = client_ip
+        self.context = context
+
+
+class InMemoryChallengeStore(ChallengeStore):
+    """
+    Process-local store, for a single worker.
+
+    This implementation provides:
+    - Expiry through a min-heap ordered by deadline, so a purge only touches
+      expired entries instead of scanning them all
+    - A cap on outstanding challenges overall and per client IP
+    """
+
+    def __init__(
+        self,
+        max_outstanding: int = 100000,
+        max_per_ip: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param max_outstanding: Maximum number of live challenges
+        :param max_per_ip: Maximum number of live challenges requested from one client IP
+        :param clock: Monotonic time source, injectable for tests
+        """
+        self.max_outstanding = max_outstanding
+        self.max_per_ip = max_per_ip
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._challenges: Dict[str, _Challenge] = {}
+        # (expires_at, sequence, record); records no longer in _challenges are skipped when popped
+        self._expiry_heap: List[Tuple[float, int, _Challenge]] = []
+        self._sequence = 0
+        self._per_ip: Dict[str, int] = {}
+
+        self._expired = 0
+        self._replaced = 0
+        self._rejected_capacity = 0
+        self._rejected_ip = 0
+
+    def put(
+        self,
+        email: str,
+        value: bytes,
+        ttl_seconds: float,
+        client_ip: Optional[str] = None,
+        context: Optional[dict] = None,
+    ):
+        with self._lock:
+            now = self._clock()
+            previous = self._challenges.get(email)
+            if previous is None and len(self._challenges) >= self.max_outstanding:
+                self._purge_expired_locked(now)
+                if len(self._challenges) >= self.max_outstanding:
+                    self._rejected_capacity += 1
+                    raise ChallengeLimitExceeded("Too many outstanding login challenges")
+            if client_ip is not None and (previous is None or previous.client_ip != client_ip):
+                if self._per_ip.get(client_ip, 0) >= self.max_per_ip:
+                    self._rejected_ip += 1
+                    raise ChallengeLimitExceeded(
+                        "Too many outstanding login challenges for this client",
+                        retry_after=int(ttl_seconds),
+                    )
+
+            if previous is not None:
+                self._remove_locked(previous)
+                self._replaced += 1
+            record = _Challenge(email, value, now + ttl_seconds, client_ip, dict(context or {}))
+            self._challenges[email] = record
+            if client_ip is not None:
+                self._per_ip[client_ip] = self._per_ip.get(client_ip, 0) + 1
+            self._sequence += 1
+            heapq.heappush(self._expiry_heap, (record.expires_at, self._sequence, record))
+            self._compact_locked()
+
+    def take(self, email: str) -> Optional[Tuple[bytes, dict]]:
+        with self._lock:
+            record = self._challenges.get(email)
+            if record is None:
+                return None
+            self._remove_locked(record)
+            if record.expires_at <= self._clock():
+                self._expired += 1
+                return None
+            return record.value, record.context
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._purge_expired_locked(self._clock())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._challenges)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "outstanding": len(self._challenges),
+                "max_outstanding": self.max_outstanding,
+                "clients": len(self._per_ip),
+                "heap_size": len(self._expiry_heap),
+                "expired": self._expired,
+                "replaced": self._replaced,
+                "rejected_capacity": self._rejected_capacity,
+                "rejected_per_ip": self._rejected_ip,
+            }
+
+    def _remove_locked(self, record: _Challenge):
+        if self._challenges.get(record.email) is record:
+            del self._challenges[record.email]
+        if record.client_ip is not None:
+            remaining = self._per_ip.get(record.client_ip, 0) - 1
+            if remaining > 0:
+                self._per_ip[record.client_ip] = remaining
+            else:
+                self._per_ip.pop(record.client_ip, None)
+
+    def _purge_expired_locked(self, now: float) -> int:
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, record = heapq.heappop(heap)
+            if self._challenges.get(record.email) is record:
+                self._remove_locked(record)
+                removed += 1
+        self._expired += removed
+        return removed
+
+    def _compact_locked(self):
+        # Replaced and validated records stay in the heap until their deadline; rebuild
+        # it when they outnumber the live ones so memory stays proportional to the live set
+        if len(self._expiry_heap) > 2 * len(self._challenges) + 64:
+            live = {id(record) for record in self._challenges.values()}
+            self._expiry_heap = [entry for entry in self._expiry_heap if id(entry[2]) in live]
+            heapq.heapify(self._expiry_heap)
+
+
+class MongoChallengeStore(ChallengeStore):
+    """
+    Store shared by every worker and node, in a Mongo collection keyed by email.
+
+    `take` uses `find_one_and_delete`, so exactly one worker can consume a challenge.
+    A TTL index on `expires_at` lets Mongo delete expired documents; since that runs
+    about once a minute, `take` also checks the deadline itself.
+
+    The per-IP cap is enforced atomically with one counter document per client IP: a
+    conditional `$inc` upsert only matches while the count is below `max_per_ip`, and
+    at the cap it fails on the unique `_id` instead. `take` and replacing a challenge
+    decrement it. A counter whose challenges have all expired is reset by the next
+    request and deleted by its TTL index, so a count can never drift past a challenge
+    lifetime. The global cap is best-effort: it is checked with a count before the
+    write, so concurrent workers may overshoot it by the number of requests in flight.
+
+    Every call blocks on the server, so callers on an event loop must use a worker thread.
+    """
+
+    self_expiring = True
+
+    def __init__(
+        self,
+        collection_provider: Callable[[], object],
+        counter_collection_provider: Callable[[], object],
+        max_outstanding: int = 100000,
+        max_per_ip: int = 20,
+    ):
+        """
+        :param collection_provider: Returns the Mongo collection holding the challenges
+        :param counter_collection_provider: Returns the Mongo collection holding the per-IP counters
+        :param max_outstanding: Maximum number of live challenges (best-effort)
+        :param max_per_ip: Maximum number of live challenges requested from one client IP
+        """
+        self._collection_provider = collection_provider
+        self._counter_collection_provider = counter_collection_provider
+        self.max_outstanding = max_outstanding
+        self.max_per_ip = max_per_ip
+        self._index_ready = False
+        self._rejected_capacity = 0
+        self._rejected_ip = 0
+
+    def put(
+        self,
+        email: str,
+        value: bytes,
+        ttl_seconds: float,
+        client_ip: Optional[str] = None,
+        context: Optional[dict] = None,
+    ):
+        collection = self._collection()
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds)
+        if collection.estimated_document_count() >= self.max_outstanding:
+            live = collection.count_documents({"expires_at": {"$gt": now}})
+            if live >= self.max_outstanding:
+                self._rejected_capacity += 1
+                raise ChallengeLimitExceeded("Too many outstanding login challenges")
+
+        # A client replacing its own live challenge keeps that challenge's count
+        previous = collection.find_one({"_id": email}, {"client_ip": 1, "expires_at": 1})
+        inherited = client_ip is not None and _holds_count(previous, now) and previous["client_ip"] == client_ip
+        if client_ip is not None and not inherited and not self._acquire(client_ip, now, expires_at):
+            self._rejected_ip += 1
+            raise ChallengeLimitExceeded(
+                "Too many outstanding login challenges for this client",
+                retry_after=int(ttl_seconds),
+            )
+
+        document = {"value": value, "expires_at": expires_at, "client_ip": client_ip, "context": dict(context or {})}
+        projection = {"client_ip": 1, "expires_at": 1}
+        try:
+            replaced = collection.find_one_and_replace({"_id": email}, document, projection, upsert=True)
+        except DuplicateKeyError:
+            # Two concurrent upserts for the same email; the other one won
+            replaced = collection.find_one_and_replace({"_id": email}, document, projection)
+        if inherited:
+            self._counters().update_one({"_id": client_ip}, {"$max": {"expires_at": expires_at}})
+        if _holds_count(replaced, now) and not (inherited and replaced["client_ip"] == client_ip):
+            self._release(replaced["client_ip"])
+
+    def take(self, email: str) -> Optional[Tuple[bytes, dict]]:
+        document = self._collection().find_one_and_delete({"_id": email})
+        if document is None:
+            return None
+        # An expired challenge no longer holds a count: its counter may have been reset since
+        if not _is_live(document, datetime.now(timezone.utc)):
+            return None
+        if document.get("client_ip"):
+            self._release(document["client_ip"])
+        return bytes(document["value"]), dict(document.get("context") or {})
+
+    def __len__(self) -> int:
+        return self._collection().count_documents({"expires_at": {"$gt": datetime.now(timezone.utc)}})
+
+    def stats(self) -> dict:
+        return {
+            "max_outstanding": self.max_outstanding,
+            "rejected_capacity": self._rejected_capacity,
+            "rejected_per_ip": self._rejected_ip,
+        }
+
+    def _acquire(self, client_ip: str, now: datetime, expires_at: datetime) -> bool:
+        """
+        Count one more live challenge for `client_ip`. Returns False if it is at the cap.
+        """
+        counters = self._counters()
+        # Every challenge counted has expired: start over rather than wait for the TTL monitor.
+        # A counter that was just incremented has a future deadline and is never reset here
+        counters.update_one({"_id": client_ip, "expires_at": {"$lte": now}}, {"$set": {"count": 0}})
+        try:
+            counters.update_one(
+                {"_id": client_ip, "count": {"$lt": self.max_per_ip}},
+                {"$inc": {"count": 1}, "$max": {"expires_at": expires_at}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # The counter exists but is at the cap, so the upsert tried to insert a second one
+            return False
+        return True
+
+    def _release(self, client_ip: str):
+        self._counters().update_one({"_id": client_ip, "count": {"$gt": 0}}, {"$inc": {"count": -1}})
+
+    def _collection(self):
+        collection = self._collection_provider()
+        if not self._index_ready:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            self._counter_collection_provider().create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    def _counters(self):
+        return self._counter_collection_provider()
+
+
+def _is_live(document: dict, now: datetime) -> bool:
+    expires_at = document["expires_at"]
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at > now
+
+
+def _holds_count(document: Optional[dict], now: datetime) -> bool:
+    return bool(document and document.get("client_ip") and _is_live(document, now))
+
+
+class LocalChallengeStore(ChallengeStore):
+    """
+    Minimal unbounded dict store without limits or background work, for tests and scripts.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._challenges: Dict[str, Tuple[bytes, float, dict]] = {}
+
+    def put(
+        self,
+        email: str,
+        value: bytes,
+        ttl_seconds: float,
+        client_ip: Optional[str] = None,
+        context: Optional[dict] = None,
+    ):
+        with self._lock:
+            self._challenges[email] = (value, self._clock() + ttl_seconds, dict(context or {}))
+
+    def take(self, email: str) -> Optional[Tuple[bytes, dict]]:
+        with self._lock:
+            entry = self._challenges.pop(email, None)
+        if entry is None or entry[1] <= self._clock():
+            return None
+        return entry[0], entry[2]
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            now = self._clock()
+            expired = [email for email, (_, expires_at, _) in self._challenges.items() if expires_at <= now]
+            for email in expired:
+                del self._challenges[email]
+        return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._challenges)
+
+
+def create_challenge_store(kind: str, max_outstanding: int = 100000, max_per_ip: int = 20) -> ChallengeStore:
+    """
+    Build the store selected by CHALLENGE_STORE: "memory", "mongo" or "local".
+    """
+    if kind == "memory":
+        return InMemoryChallengeStore(max_outstanding=max_outstanding, max_per_ip=max_per_ip)
+    if kind == "mongo":
+        from backend.app.database.session import db_instance
+        return MongoChallengeStore(
+            lambda: db_instance.get_collection("challenges"),
+            lambda: db_instance.get_collection("challenge_counters"),
+            max_outstanding=max_outstanding,
+            max_per_ip=max_per_ip,
+        )
+    if kind == "local":
+        return LocalChallengeStore()
+    raise ValueError(f"Unknown challenge store: {kind}")
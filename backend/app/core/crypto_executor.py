@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from . import metrics
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Streamed request chunks at least this large are processed off the event loop; smaller
+# ones cost less than the hand-off
+STREAM_OFFLOAD_BYTES = 64 * 1024
+
+
+class ExecutorSaturated(Exception):
+    """
+    Raised when an executor's bounded queue is full and new work is shed.
+    """
+
+    def __init__(self, name: str, retry_after: int = 1):
+        super().__init__(f"{name} executor is saturated, retry later")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict, portable_errors: bool = False):
+    """
+    Run `fn` in a worker and report when it started and finished.
+
+    Defined at module level so it can be pickled for process pools. With
+    `portable_errors`, exceptions that cannot cross a process boundary
+    (e.g. HTTPException) are re-raised as RuntimeError with the same message.
+    """
+    started = time.monotonic()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        if not portable_errors:
+            raise
+        try:
+            pickle.loads(pickle.dumps(e))
+        except Exception:
+            raise RuntimeError(str(e)) from None
+        raise
+    return result, started, time.monotonic()
+
+
+def _noop():
+    return None
+
+
+class CryptoExecutor:
+    """
+    Runs CPU-bound cryptographic work off the event loop.
+
+    This implementation provides:
+    - A thread pool (the default), or a process pool for work that holds the GIL. RSA key
+      generation, OAEP, AES-GCM and bcrypt release it, but parsing an RSA private key does not:
+      `load_pem_private_key` validates the key while holding the GIL for tens of milliseconds,
+      which is why that check runs on `key_validation_executor`. In a process pool, module-level
+      caches such as `private_key_cache` and `aes_cipher_cache` are per worker process: the
+      parent's `/metrics` does not see them and `delete_key` cannot evict from them
+    - A bounded queue: at most `max_workers + max_queue` operations are admitted at once,
+      further submissions raise `ExecutorSaturated`
+    - Per-operation counters for execution time and queue wait time
+    """
+
+    def __init__(self, name: str, max_workers: Optional[int] = None, max_queue: int = 64, kind: str = "thread"):
+        """
+        :param name: Name reported in the executor statistics
+        :param max_workers: Number of worker threads or processes, defaults to the CPU count
+        :param max_queue: Number of operations allowed to wait for a free worker
+        :param kind: Either "thread" or "process"
+        """
+        if kind not in ("thread", "process"):
+            raise ValueError("Executor kind must be 'thread' or 'process'")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._operations: Dict[str, Dict[str, float]] = {}
+
+    async def run(self, operation: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run `fn(*args, **kwargs)` on the executor and await its result.
+
+        :param operation: Name under which the timing is recorded
+        :raises ExecutorSaturated: If the bounded queue is full
+        """
+        args = self._prepare_args(args)
+        self._admit()
+        submitted = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, args, kwargs, self.kind == "process"
+            )
+        except Exception:
+            self._record(operation, submitted, None, None)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        self._record(operation, submitted, started, finished)
+        return result
+
+    def call(self, operation: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Blocking counterpart of `run` for synchronous callers, with the same admission control and timings.
+
+        :param operation: Name under which the timing is recorded
+        :raises ExecutorSaturated: If the bounded queue is full
+        """
+        args = self._prepare_args(args)
+        self._admit()
+        submitted = time.monotonic()
+        try:
+            future = self._get_executor().submit(_timed_call, fn, args, kwargs, self.kind == "process")
+            result, started, finished = future.result()
+        except Exception:
+            self._record(operation, submitted, None, None)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        self._record(operation, submitted, started, finished)
+        return result
+
+    def start(self):
+        """
+        Create the pool and start every worker, so the first requests do not pay for process start-up.
+        """
+        executor = self._get_executor()
+        for future in [executor.submit(_noop) for _ in range(self.max_workers)]:
+            future.result()
+
+    def stats(self) -> dict:
+        """
+        Return the admission counters and per-operation timings.
+        """
+        with self._lock:
+            operations = {}
+            for name, op in self._operations.items():
+                completed = op["count"] - op["errors"]
+                operations[name] = {
+                    **op,
+                    "avg_seconds": op["total_seconds"] / completed if completed else 0.0,
+                    "avg_wait_seconds": op["total_wait_seconds"] / completed if completed else 0.0,
+                }
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "queued": max(0, self._in_flight - self.max_workers),
+                "rejected": self._rejected,
+                "operations": operations,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """
+        Shut down the underlying pool; it is recreated on the next submission.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def _prepare_args(self, args: tuple) -> tuple:
+        if self.kind == "process":
+            # Memoryviews cannot be pickled; they are copied once when crossing the process boundary
+            return tuple(bytes(arg) if isinstance(arg, memoryview) else arg for arg in args)
+        return args
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise ExecutorSaturated(self.name)
+            self._in_flight += 1
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    # Spawn rather than fork: the parent runs Mongo and cleanup threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=self.name
+                    )
+                logger.info(f"Started {self.name} {self.kind} executor with {self.max_workers} workers")
+            return self._executor
+
+    def _record(self, operation: str, submitted: float, started: Optional[float], finished: Optional[float]):
+        with self._lock:
+            op = self._operations.setdefault(operation, {
+                "count": 0,
+                "errors": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "total_wait_seconds": 0.0,
+                "max_wait_seconds": 0.0,
+            })
+            op["count"] += 1
+            if started is None:
+                op["errors"] += 1
+                return
+            elapsed = finished - started
+            wait = max(0.0, started - submitted)
+            op["total_seconds"] += elapsed
+            op["max_seconds"] = max(op["max_seconds"], elapsed)
+            op["total_wait_seconds"] += wait
+            op["max_wait_seconds"] = max(op["max_wait_seconds"], wait)
+
+
+# Global instance shared by the async crypto endpoints. Threads keep the work in this process,
+# so the key and cipher caches it fills are the ones reported in /metrics and evicted by delete_key;
+# the one primitive that holds the GIL, RSA private key validation, goes to key_validation_executor
+crypto_executor = CryptoExecutor(
+    "crypto",
+    max_workers=int(os.getenv("CRYPTO_EXECUTOR_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("CRYPTO_EXECUTOR_QUEUE_SIZE", "64")),
+    kind=os.getenv("CRYPTO_EXECUTOR_KIND", "thread"),
+)
+metrics.register("crypto_executor", crypto_executor.stats)
+
+# RSA private key validation holds the GIL for the whole check, so it runs in worker processes.
+# It only receives the PEM and returns nothing: the key object itself is built and cached in this process
+key_validation_executor = CryptoExecutor(
+    "key_validation",
+    max_workers=int(os.getenv("KEY_VALIDATION_EXECUTOR_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("KEY_VALIDATION_EXECUTOR_QUEUE_SIZE", "64")),
+    kind="process",
+)
+metrics.register("key_validation_executor", key_validation_executor.stats)
+
+# bcrypt releases the GIL, so threads are enough; its own pool keeps password hashing
+# from starving the crypto executor and Starlette's shared threadpool
+bcrypt_executor = CryptoExecutor(
+    "bcrypt",
+    max_workers=int(os.getenv("BCRYPT_EXECUTOR_WORKERS", "0")) or None,
+    max_queue=int(os.getenv("BCRYPT_EXECUTOR_QUEUE_SIZE", "32")),
+    kind="thread",
+)
+metrics.register("bcrypt_executor", bcrypt_executor.stats)
@@ -0,0 +1,116 @@
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import x25519
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from fastapi import HTTPException
+from .key_management import decrypt_x25519_private_key
+import os
+
+ECIES_VERSION = 1
+ECIES_PUBLIC_KEY_LENGTH = 32
+ECIES_NONCE_LENGTH = 12
+ECIES_INFO = b"SecurityProject ECIES X25519 HKDF-SHA256 AES-256-GCM v1"
+
+
+def _derive_key(shared_secret: bytes, ephemeral_public: bytes, recipient_public: bytes) -> bytes:
+    """
+    Derive the AES-256 key from the X25519 shared secret, binding both public keys.
+    """
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=ECIES_INFO + ephemeral_public + recipient_public,
+        backend=default_backend(),
+    ).derive(shared_secret)
+
+
+class ECIESCipher:
+    """
+    Hybrid encryption with ephemeral-static X25519, HKDF-SHA256 and AES-256-GCM.
+
+    Ciphertext layout (returned in hex format):
+    version (1 byte) | ephemeral X25519 public key (32 bytes) | nonce (12 bytes) | AES-GCM ciphertext and tag
+
+    The version byte and ephemeral public key are authenticated as associated data.
+    """
+
+    def __init__(self, key: str):
+        """
+        Initialize the ECIESCipher with the provided key.
+        If the operation is encryption, the key is expected to be an X25519 public key in PEM format.
+        If the operation is decryption, the key is expected to be an AES-encrypted private key in PEM format.
+        """
+        self.key = key
+
+    def load_public_key(self, public_key_pem: str) -> x25519.X25519PublicKey:
+        """
+        Load the X25519 public key from a PEM-formatted string.
+        """
+        try:
+            public_key = serialization.load_pem_public_key(public_key_pem.encode(), backend=default_backend())
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error loading public key: {str(e)}")
+        if not isinstance(public_key, x25519.X25519PublicKey):
+            raise HTTPException(status_code=400, detail="Key is not an X25519 public key")
+        return public_key
+
+    def load_private_key(self, encrypted_private_key: str) -> x25519.X25519PrivateKey:
+        """
+        Decrypt the AES-encrypted private key using the `decrypt_x25519_private_key` function.
+        """
+        try:
+            return decrypt_x25519_private_key(encrypted_private_key)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error loading private key: {str(e)}")
+
+    def encrypt(self, plaintext: str) -> str:
+        """
+        Encrypt the given plaintext for the recipient public key and return the ciphertext in hex format.
+        """
+        recipient_public = self.load_public_key(self.key)
+        try:
+            ephemeral_private = x25519.X25519PrivateKey.generate()
+            ephemeral_public = ephemeral_private.public_key().public_bytes(
+                encoding=serialization.Encoding.Raw,
+                format=serialization.PublicFormat.Raw,
+            )
+            recipient_raw = recipient_public.public_bytes(
+                encoding=serialization.Encoding.Raw,
+                format=serialization.PublicFormat.Raw,
+            )
+            key = _derive_key(ephemeral_private.exchange(recipient_public), ephemeral_public, recipient_raw)
+
+            header = bytes([ECIES_VERSION]) + ephemeral_public
+            nonce = os.urandom(ECIES_NONCE_LENGTH)
+            ciphertext = AESGCM(key).encrypt(nonce, plaintext.encode("utf-8"), header)
+            return (header + nonce + ciphertext).hex()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Encryption failed: {str(e)}")
+
+    def decrypt(self, ciphertext_hex: str) -> str:
+        """
+        Decrypt the given ciphertext (in hex format) using the private key and return the plaintext.
+        """
+        private_key = self.load_private_key(self.key)
+        try:
+            data = bytes.fromhex(ciphertext_hex)
+            if data[0] != ECIES_VERSION:
+                raise ValueError(f"Unsupported ciphertext version: {data[0]}")
+            header_length = 1 + ECIES_PUBLIC_KEY_LENGTH
+            header = data[:header_length]
+            ephemeral_public = header[1:]
+            nonce = data[header_length:header_length + ECIES_NONCE_LENGTH]
+            ciphertext = data[header_length + ECIES_NONCE_LENGTH:]
+
+            recipient_raw = private_key.public_key().public_bytes(
+                encoding=serialization.Encoding.Raw,
+                format=serialization.PublicFormat.Raw,
+            )
+            shared_secret = private_key.exchange(x25519.X25519PublicKey.from_public_bytes(ephemeral_public))
+            key = _derive_key(shared_secret, ephemeral_public, recipient_raw)
+            return AESGCM(key).decrypt(nonce, ciphertext, header).decode("utf-8")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
@@ -1,6 +1,51 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Optional
+
+import bson
+from bson.codec_options import CodecOptions
+from bson.errors import BSONError
+from pymongo import DESCENDING
+from pymongo.asynchronous.collection import AsyncCollection
 from pymongo.collection import Collection
 from pymongo.errors import PyMongoError
-from ..models.email import Email
+from ..models.email import Email, EmailPage, EmailSummary
+
+# Fields needed by the inbox and sent lists; _id is kept as the pagination tie-breaker
+SUMMARY_PROJECTION = {"email_id": 1, "sender_email": 1, "recipient_email": 1, "subject": 1, "timestamp": 1}
+# Newest first; _id breaks ties between emails sent in the same instant
+LIST_SORT = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# Timestamps come back as aware UTC datetimes; Mongo compares them like the naive ones it returns
+CURSOR_CODEC_OPTIONS = CodecOptions(tz_aware=True)
+
+
+def encode_cursor(timestamp: datetime, document_id) -> str:
+    """
+    Build the opaque continuation token for the page that ends at this document.
+    The position is BSON-encoded so `_id` keeps its type (ObjectId, int, string...).
+    """
+    return base64.urlsafe_b64encode(bson.encode({"t": timestamp, "i": document_id})).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, object]:
+    """
+    Parse a continuation token back into the (timestamp, _id) position it stands for.
+
+    :raises ValueError: If the token was not produced by `encode_cursor`
+    """
+    try:
+        position = bson.decode(base64.urlsafe_b64decode(cursor.encode()), codec_options=CURSOR_CODEC_OPTIONS)
+        timestamp, document_id = position["t"], position["i"]
+    except (binascii.Error, ValueError, TypeError, KeyError, BSONError):
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(timestamp, datetime):
+        raise ValueError("Invalid pagination cursor")
+    return timestamp, document_id
 
 
 class EmailService:
@@ -11,6 +56,10 @@ class EmailService:
         """Retrieve the 'emails' collection."""
         return self.db_instance.get_collection("emails")
 
+    def _get_async_collection(self) -> AsyncCollection:
+        """Retrieve the 'emails' collection from the asyncio client."""
+        return self.db_instance.get_async_collection("emails")
+
     def create_email(self, email: Email) -> bool:
         """Insert a new email document into the database."""
         try:
@@ -45,18 +94,69 @@ class EmailService:
         """Retrieve a specific email by ID if the user is authorized."""
         try:
             collection = self._get_collection()
-            email_data = collection.find_one(
-                {
-                    "email_id": email_id,
-                    "$or": [
-                        {"sender_email": user_email},
-                        {"recipient_email": user_email},
-                    ],
-                }
-            )
+            email_data = collection.find_one(self._email_by_id_query(email_id, user_email))
             if not email_data:
                 raise ValueError("Email not found or access denied")
             email_data.pop("_id", None)
             return Email(**email_data)
         except PyMongoError as e:
             raise RuntimeError(f"Database error while fetching email: {str(e)}")
+
+    async def get_email_by_id_async(self, email_id: int, user_email: str) -> Email:
+        """Retrieve a specific email by ID if the user is authorized, without blocking the event loop."""
+        try:
+            collection = self._get_async_collection()
+            email_data = await collection.find_one(self._email_by_id_query(email_id, user_email))
+        except PyMongoError as e:
+            raise RuntimeError(f"Database error while fetching email: {str(e)}")
+        if not email_data:
+            raise ValueError("Email not found or access denied")
+        email_data.pop("_id", None)
+        return Email(**email_data)
+
+    async def get_inbox_page_async(
+            self, recipient_email: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> EmailPage:
+        """Retrieve one page of email headers for a recipient, newest first."""
+        return await self._find_page_async({"recipient_email": recipient_email}, limit, cursor)
+
+    async def get_sent_page_async(
+            self, sender_email: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> EmailPage:
+        """Retrieve one page of email headers for a sender, newest first."""
+        return await self._find_page_async({"sender_email": sender_email}, limit, cursor)
+
+    async def _find_page_async(self, query: dict, limit: int, cursor: Optional[str]) -> EmailPage:
+        """
+        Keyset pagination on (timestamp, _id): each page starts strictly after the last
+        document of the previous one, so the cost of a page does not grow with its depth.
+
+        :raises ValueError: If the cursor is invalid
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        if cursor is not None:
+            timestamp, document_id = decode_cursor(cursor)
+            query = {**query, "$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": document_id}},
+            ]}
+        try:
+            collection = self._get_async_collection()
+            # One extra document tells whether another page follows
+            documents = await collection.find(query, SUMMARY_PROJECTION).sort(LIST_SORT).limit(limit + 1).to_list(None)
+        except PyMongoError as e:
+            raise RuntimeError(f"Database error while fetching emails: {str(e)}")
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1]["timestamp"], documents[-1]["_id"])
+        return EmailPage(items=[EmailSummary(**document) for document in documents], next_cursor=next_cursor)
+
+    @staticmethod
+    def _email_by_id_query(email_id: int, user_email: str) -> dict:
+        return {
+            "email_id": email_id,
+            "$or": [
+                {"sender_email": user_email},
+                {"recipient_email": user_email},
+            ],
+        }
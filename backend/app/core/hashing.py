@@ -1,4 +1,5 @@
 from passlib.context import CryptContext
+import bcrypt
 import hashlib
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.hashes import SHA256
@@ -6,7 +7,16 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.padding import PKCS7
 from cryptography.hazmat.backends import default_backend
 import base64
+import hmac
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from dotenv import load_dotenv
+from .cache import TTLCache
+from . import metrics
+
+load_dotenv()
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 BACKEND = default_backend()
@@ -20,6 +30,38 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """
+    Verify a password and, if its hash uses a stale cost, rehash it with the current one.
+
+    Returns (is_valid, new_hash) where new_hash is None unless a rehash was needed.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def password_hash_needs_update(hashed_password: str) -> bool:
+    """
+    Return True if the hash was made with a cost below the configured bcrypt cost.
+    """
+    return pwd_context.needs_update(hashed_password)
+
+def configure_bcrypt_rounds(rounds: int):
+    """
+    Use `rounds` as the bcrypt cost for new hashes and flag hashes with a lower cost as stale.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+def bcrypt_rounds() -> int:
+    """
+    Return the bcrypt cost currently used for new hashes.
+    """
+    return pwd_context.handler("bcrypt").default_rounds
+
+def new_bcrypt_salt() -> str:
+    """
+    Return a fresh bcrypt salt string (e.g. `$2b$12$...`) at the configured cost.
+    """
+    return bcrypt.gensalt(bcrypt_rounds()).decode("ascii")
+
 """
     Hash a given plaintext using SHA-256 algorithm.
     
@@ -37,8 +79,236 @@ def hash_text(plaintext):
         raise TypeError("Input must be a string")
     
     text_bytes = plaintext.encode('utf-8')
-    hash_object = hashlib.sha256(text_bytes)
-    return hash_object.hexdigest()
+    return hash_bytes(text_bytes).hex()
+
+
+"""
+    Hash raw bytes using SHA-256 algorithm.
+    
+    Args:
+        data (bytes-like): The data to be hashed, memoryviews are hashed without copying
+        
+    Returns:
+        bytes: The 32-byte digest
+"""
+def hash_bytes(data):
+    return hashlib.sha256(data).digest()
+
+
+# Digests /hash/stream can compute in a single pass over the input
+STREAM_HASH_ALGORITHMS = ("sha256", "sha512", "blake2b", "sha3_256")
+
+
+class MultiHasher:
+    """
+    Feeds each chunk of a stream to several hash objects at once.
+
+    Every chunk is read once and then discarded, so memory use does not depend
+    on the input size however many digests are requested.
+    """
+
+    def __init__(self, algorithms=STREAM_HASH_ALGORITHMS):
+        """
+        :param algorithms: Names from STREAM_HASH_ALGORITHMS
+        :raises ValueError: If an algorithm is not supported or none is given
+        """
+        unsupported = [name for name in algorithms if name not in STREAM_HASH_ALGORITHMS]
+        if unsupported:
+            raise ValueError(f"Unsupported hash algorithms: {', '.join(unsupported)}")
+        if not algorithms:
+            raise ValueError("At least one hash algorithm is required")
+        self._hashes = {name: hashlib.new(name) for name in dict.fromkeys(algorithms)}
+        self.size = 0
+
+    def update(self, chunk):
+        self.size += len(chunk)
+        for hash_object in self._hashes.values():
+            hash_object.update(chunk)
+
+    def hexdigests(self) -> dict:
+        return {name: hash_object.hexdigest() for name, hash_object in self._hashes.items()}
+
+
+# Leaf chunk size used when a Merkle request does not specify one
+MERKLE_CHUNK_SIZE = 64 * 1024
+# Domain separation prefixes, so a leaf can never be passed off as an inner node
+MERKLE_LEAF_PREFIX = b"\x00"
+MERKLE_NODE_PREFIX = b"\x01"
+
+
+def merkle_leaf_hash(chunk) -> bytes:
+    """
+    Hash one leaf chunk: SHA-256(0x00 || chunk).
+    """
+    hash_object = hashlib.sha256(MERKLE_LEAF_PREFIX)
+    hash_object.update(chunk)
+    return hash_object.digest()
+
+
+def merkle_node_hash(left: bytes, right: bytes) -> bytes:
+    """
+    Hash two child nodes: SHA-256(0x01 || left || right).
+    """
+    return hashlib.sha256(MERKLE_NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """
+    A binary SHA-256 Merkle tree over fixed-size chunks of a payload.
+
+    This implementation provides:
+    - Leaf hashing spread over a thread pool (hashlib releases the GIL on large buffers)
+    - Inclusion proofs for single chunks, checked with `verify_merkle_proof`
+    - In-place leaf updates that rehash only the path to the root, O(log n)
+
+    Pairs of nodes are hashed left to right; an odd node at the end of a level is
+    promoted unchanged. An empty payload is a single empty leaf.
+    """
+
+    def __init__(self, leaves: List[bytes]):
+        """
+        :param leaves: Leaf hashes as produced by `merkle_leaf_hash`
+        """
+        self.levels = [list(leaves) or [merkle_leaf_hash(b"")]]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            self.levels.append([
+                merkle_node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ])
+
+    @classmethod
+    def from_data(cls, data, chunk_size: int = MERKLE_CHUNK_SIZE, max_workers: int = None) -> "MerkleTree":
+        """
+        Split `data` into `chunk_size` chunks and build the tree, hashing leaves in parallel.
+
+        :param max_workers: Threads used for leaf hashing, defaults to the CPU count
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        view = memoryview(data)
+        chunks = [view[offset:offset + chunk_size] for offset in range(0, len(view), chunk_size)]
+        workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+        if workers <= 1:
+            return cls([merkle_leaf_hash(chunk) for chunk in chunks])
+
+        # One contiguous range of chunks per thread keeps task overhead independent of the chunk count
+        step = -(-len(chunks) // workers)
+        ranges = [chunks[start:start + step] for start in range(0, len(chunks), step)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            leaves = [
+                leaf
+                for hashed in executor.map(lambda part: [merkle_leaf_hash(chunk) for chunk in part], ranges)
+                for leaf in hashed
+            ]
+        return cls(leaves)
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0]
+
+    @property
+    def leaves(self) -> List[bytes]:
+        return self.levels[0]
+
+    def proof(self, index: int) -> List[bytes]:
+        """
+        Return the sibling hashes from leaf `index` up to the root.
+        """
+        if not 0 <= index < len(self.leaves):
+            raise ValueError(f"Leaf index {index} out of range")
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                proof.append(level[sibling])
+            index //= 2
+        return proof
+
+    def update_leaf(self, index: int, chunk) -> bytes:
+        """
+        Replace the chunk at `index` and rehash its path. Returns the new root.
+        """
+        if not 0 <= index < len(self.leaves):
+            raise ValueError(f"Leaf index {index} out of range")
+        self.levels[0][index] = merkle_leaf_hash(chunk)
+        for depth in range(1, len(self.levels)):
+            below = self.levels[depth - 1]
+            left = index & ~1
+            index //= 2
+            self.levels[depth][index] = (
+                merkle_node_hash(below[left], below[left + 1]) if left + 1 < len(below) else below[left]
+            )
+        return self.root
+
+
+
+class MerkleLeafHasher:
+    """
+    Computes the leaf hashes of a payload received in pieces of any size.
+
+    Leaves match those of `MerkleTree.from_data` over the whole payload. Only the hash
+    state of the current chunk is kept, so memory does not grow with the payload or the
+    chunk size, only with the number of 32-byte leaves.
+    """
+
+    def __init__(self, chunk_size: int = MERKLE_CHUNK_SIZE):
+        """
+        :param chunk_size: Size of each leaf chunk in bytes
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        self.chunk_size = chunk_size
+        self.size = 0
+        self.leaves: List[bytes] = []
+        self._current = None
+        self._filled = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        while len(view):
+            if self._current is None:
+                self._current = hashlib.sha256(MERKLE_LEAF_PREFIX)
+                self._filled = 0
+            taken = min(self.chunk_size - self._filled, len(view))
+            self._current.update(view[:taken])
+            self._filled += taken
+            self.size += taken
+            view = view[taken:]
+            if self._filled == self.chunk_size:
+                self.leaves.append(self._current.digest())
+                self._current = None
+
+    def tree(self) -> MerkleTree:
+        """
+        Build the tree over the leaves so far, the last one possibly shorter than `chunk_size`.
+        """
+        leaves = list(self.leaves)
+        if self._current is not None:
+            leaves.append(self._current.digest())
+        return MerkleTree(leaves)
+
+
+def verify_merkle_proof(chunk, index: int, leaf_count: int, proof: List[bytes], root: bytes) -> bool:
+    """
+    Check that `chunk` is leaf `index` of a tree with `leaf_count` leaves and the given root.
+
+    Only the chunk and log2(leaf_count) sibling hashes are hashed, not the whole payload.
+    """
+    if not 0 <= index < leaf_count:
+        return False
+    node = merkle_leaf_hash(chunk)
+    siblings = iter(proof)
+    width = leaf_count
+    while width > 1:
+        if index ^ 1 < width:
+            sibling = next(siblings, None)
+            if sibling is None:
+                return False
+            node = merkle_node_hash(sibling, node) if index & 1 else merkle_node_hash(node, sibling)
+        index //= 2
+        width = (width + 1) // 2
+    return next(siblings, None) is None and hmac.compare_digest(node, root)
 
 
 """
@@ -58,13 +328,92 @@ def verify_hash(plaintext, hash_value):
     if not all(isinstance(x, str) for x in [plaintext, hash_value]):
         raise TypeError("Both inputs must be strings")
     
-    computed_hash = hash_text(plaintext)
-    return computed_hash == hash_value
+    return verify_digest(plaintext.encode('utf-8'), hash_value)
 
-def derive_key(hashed_password: str, salt: bytes) -> bytes:
+
+"""
+    Verify if raw bytes match a given hex SHA-256 hash, in constant time.
+    
+    Args:
+        data (bytes-like): The data to verify
+        hash_value (str): The expected SHA-256 hash, in hexadecimal (either case)
+        
+    Returns:
+        bool: True if the hash matches, False otherwise (including malformed hex)
+"""
+def verify_digest(data, hash_value):
+    return _digest_matches(hashlib.sha256(data).digest(), hash_value)
+
+
+def _digest_matches(digest, hash_value):
+    try:
+        expected = bytes.fromhex(hash_value)
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest, expected)
+
+
+"""
+    Hash many plaintexts with SHA-256 in one call.
+    
+    Args:
+        plaintexts (list of str): The texts to be hashed
+        
+    Returns:
+        list of str: The hexadecimal hashes, in input order
+"""
+def hash_texts(plaintexts):
+    sha256 = hashlib.sha256
+    return [sha256(text.encode('utf-8')).hexdigest() for text in plaintexts]
+
+
+"""
+    Verify many (plaintext, SHA-256 hash) pairs in one call, in constant time per pair.
+    
+    Args:
+        items (list of tuple): (plaintext, hash_value) pairs
+        
+    Returns:
+        list of bool: One result per pair, in input order
+"""
+def verify_hashes(items):
+    sha256 = hashlib.sha256
+    return [_digest_matches(sha256(text.encode('utf-8')).digest(), hash_value) for text, hash_value in items]
+
+class _DerivedKey:
     """
-    Derive a symmetric encryption key from the hashed password using PBKDF2.
+    Cached key material, zeroed in place when it leaves the cache.
     """
+    __slots__ = ("key", "wiped")
+
+    def __init__(self, key: bytes):
+        self.key = bytearray(key)
+        self.wiped = False
+
+
+def _wipe_derived_key(_, entry: _DerivedKey):
+    with _derived_key_lock:
+        entry.key[:] = bytes(len(entry.key))
+        entry.wiped = True
+
+
+# Cache keys are HMACs under a per-process secret, so the cache never holds the raw inputs
+_derived_key_secret = os.urandom(32)
+_derived_key_lock = threading.Lock()
+derived_key_cache = TTLCache(
+    "derived_keys",
+    maxsize=int(os.getenv("DERIVED_KEY_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.getenv("DERIVED_KEY_CACHE_TTL_SECONDS", "60")),
+    on_evict=_wipe_derived_key,
+)
+metrics.register("derived_key_cache", derived_key_cache.stats)
+
+
+def _derived_key_tag(value: bytes) -> bytes:
+    return hmac.new(_derived_key_secret, value, hashlib.sha256).digest()
+
+
+def _pbkdf2(hashed_password: str, salt: bytes) -> bytes:
     kdf = PBKDF2HMAC(
         algorithm=SHA256(),
         length=KEY_LENGTH,
@@ -74,3 +423,29 @@ def derive_key(hashed_password: str, salt: bytes) -> bytes:
     )
     # The key derivation works on bytes, so we encode the hashed password
     return kdf.derive(hashed_password.encode('utf-8'))
+
+
+def derive_key(hashed_password: str, salt: bytes) -> bytes:
+    """
+    Derive a symmetric encryption key from the hashed password using PBKDF2.
+
+    Results are memoized for a short time in `derived_key_cache`, keyed by HMACs of the
+    hashed password and salt; callers receive their own copy of the key.
+    """
+    cache_key = (_derived_key_tag(hashed_password.encode('utf-8')), _derived_key_tag(bytes(salt)))
+    entry = derived_key_cache.get_or_load(cache_key, lambda: _DerivedKey(_pbkdf2(hashed_password, salt)))
+    with _derived_key_lock:
+        if not entry.wiped:
+            return bytes(entry.key)
+    # Evicted and zeroed between the lookup and the copy
+    return _pbkdf2(hashed_password, salt)
+
+
+def invalidate_derived_keys(hashed_password: str) -> int:
+    """
+    Drop (and zero) every cached key derived from `hashed_password`, e.g. after a password change.
+
+    Returns the number of entries removed.
+    """
+    tag = _derived_key_tag(hashed_password.encode('utf-8'))
+    return derived_key_cache.invalidate_where(lambda cache_key: hmac.compare_digest(cache_key[0], tag))
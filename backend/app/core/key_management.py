@@ -1,22 +1,58 @@
 from datetime import datetime
+import hashlib
+import multiprocessing
 from secrets import token_bytes
-from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.asymmetric import rsa, x25519
 from cryptography.hazmat.primitives import serialization
-from ..database.session import db_instance
+from ..database.session import LazyCollection
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 import os
 from bson import ObjectId
 from cryptography.hazmat.primitives import padding
+from .cache import TTLCache
+from .key_pool import RSAKeyPool
+from .block_cipher_module import AESCipher
+from .crypto_executor import key_validation_executor
+from . import metrics
 
 
-keys_collection = db_instance.get_collection("keys")
+keys_collection = LazyCollection("keys")
 KEK = bytes.fromhex(os.getenv("KEK_HEX", "secure-kek-hex"))
 
+# Unwrapped private key objects, keyed by a digest of their KEK-wrapped blob
+PRIVATE_KEY_CACHE_SIZE = int(os.getenv("PRIVATE_KEY_CACHE_SIZE", "1024"))
+PRIVATE_KEY_CACHE_TTL_SECONDS = float(os.getenv("PRIVATE_KEY_CACHE_TTL_SECONDS", "300"))
+private_key_cache = TTLCache(
+    "private_key_cache",
+    maxsize=PRIVATE_KEY_CACHE_SIZE,
+    ttl_seconds=PRIVATE_KEY_CACHE_TTL_SECONDS,
+)
+metrics.register(private_key_cache.name, private_key_cache.stats)
+
+# AESCipher instances for KEK-wrapped AES keys, keyed by a digest of the wrapped key
+AES_CIPHER_CACHE_SIZE = int(os.getenv("AES_CIPHER_CACHE_SIZE", "4096"))
+AES_CIPHER_CACHE_TTL_SECONDS = float(os.getenv("AES_CIPHER_CACHE_TTL_SECONDS", "300"))
+aes_cipher_cache = TTLCache(
+    "aes_cipher_cache",
+    maxsize=AES_CIPHER_CACHE_SIZE,
+    ttl_seconds=AES_CIPHER_CACHE_TTL_SECONDS,
+)
+metrics.register(aes_cipher_cache.name, aes_cipher_cache.stats)
+
+# Pre-generated RSA key pairs, refilled in the background between the watermarks
+rsa_key_pool = RSAKeyPool(
+    low_watermark=int(os.getenv("RSA_KEY_POOL_LOW_WATERMARK", "2")),
+    high_watermark=int(os.getenv("RSA_KEY_POOL_HIGH_WATERMARK", "8")),
+    key_size=2048,
+    enabled=os.getenv("RSA_KEY_POOL_ENABLED", "true").lower() == "true",
+)
+metrics.register("rsa_key_pool", rsa_key_pool.stats)
+
 
 """
 This module implements secure methods for key management, including:
-1. Key generation (both RSA and AES).
+1. Key generation (RSA, X25519 and AES).
 2. Secure storage of keys in a MongoDB database.
 3. Retrieval of keys by user.
 4. Deletion of keys.
@@ -24,7 +60,7 @@ This module implements secure methods for key management, including:
 Secure methods for key management are achieved by:
 - Using industry-standard cryptographic libraries like `cryptography` for secure RSA and AES key generation.
 - Ensuring data integrity and security by storing RSA keys in PEM format (encrypted using AES) and AES keys as securely generated random bytes.
-- Enforcing constraints to prevent misuse, such as allowing only one RSA key pair per user while supporting multiple AES keys.
+- Enforcing constraints to prevent misuse, such as allowing only one RSA and one X25519 key pair per user while supporting multiple AES keys.
 - Using MongoDB for efficient and secure storage of keys, indexed by user email for fast retrieval.
 
 PEM Format:
@@ -39,7 +75,7 @@ Key Encryption Key (KEK):
 - A KEK is a cryptographic key used to encrypt other keys.
 - It ensures that sensitive keys (e.g., RSA private keys and AES keys) are not stored in plaintext, even in secure databases.
 - The KEK itself is securely stored, typically in an HSM, a cloud-based KMS, or as an environment variable.
-- The KEK is used to encrypt RSA private keys in PEM format and AES keys before they are stored in the database.
+- The KEK is used to encrypt RSA and X25519 private keys in PEM format and AES keys before they are stored in the database.
 """
 
 
@@ -49,7 +85,7 @@ def generate_rsa_key(user_email: str):
 
     Steps:
     1. Check if the user already has an RSA key pair. Raise an error if one exists.
-    2. Generate a 2048-bit RSA private key.
+    2. Take a pre-generated 2048-bit RSA private key from the key pool, generating one inline if the pool is empty.
     3. Extract and serialize the public key in PEM format.
     4. Serialize the private key in PEM format with no encryption (temporarily).
     5. Encrypt the private key PEM using AES encryption with a Key Encryption Key (KEK).
@@ -69,7 +105,9 @@ def generate_rsa_key(user_email: str):
     if existing_key:
         raise ValueError("User already has an RSA key pair")
 
-    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key = rsa_key_pool.take()
+    if private_key is None:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
     public_key = private_key.public_key()
 
     private_key_pem = private_key.private_bytes(
@@ -101,8 +139,9 @@ def decrypt_rsa_private_key(encrypted_private_key_hex: str):
     Decrypt an encrypted RSA private key.
 
     Steps:
-    1. Decrypt the private key using AES encryption with the Key Encryption Key (KEK).
-    2. Load the decrypted PEM-encoded private key into an RSA key object.
+    1. Look up the loaded key object in the private key cache, keyed by a digest of the wrapped blob.
+    2. On a miss, decrypt the private key using AES encryption with the Key Encryption Key (KEK).
+    3. Load the decrypted PEM-encoded private key into an RSA key object and cache it.
 
     Parameters:
         encrypted_private_key_hex (str): The encrypted private key as a hex string.
@@ -113,18 +152,153 @@ def decrypt_rsa_private_key(encrypted_private_key_hex: str):
     Raises:
         ValueError: If the decryption fails or the private key is invalid.
     """
-    # Decrypt the encrypted private key using the KEK
-    decrypted_key_pem = decrypt_aes_key(encrypted_private_key_hex, KEK)
-
-    # Load the RSA private key from the decrypted PEM
-    private_key = serialization.load_pem_private_key(
-        decrypted_key_pem,
-        password=None,
-        backend=default_backend()
+    return _load_wrapped_private_key(encrypted_private_key_hex)
+
+
+def _load_wrapped_private_key(encrypted_private_key_hex: str):
+    """
+    Unwrap and parse a KEK-wrapped PEM private key of any type, going through the private key cache.
+    """
+    def load():
+        # Decrypt the encrypted private key using the KEK
+        decrypted_key_pem = decrypt_aes_key(encrypted_private_key_hex, KEK)
+
+        # Load the private key from the decrypted PEM. For RSA keys the consistency check
+        # holds the GIL for tens of milliseconds, so it is skipped here and done separately
+        private_key = serialization.load_pem_private_key(
+            decrypted_key_pem,
+            password=None,
+            backend=default_backend(),
+            unsafe_skip_rsa_key_validation=True,
+        )
+        if isinstance(private_key, rsa.RSAPrivateKey):
+            if multiprocessing.parent_process() is None:
+                key_validation_executor.call("rsa_key_validation", validate_private_key_pem, decrypted_key_pem)
+            else:
+                # Already in a crypto worker process, whose GIL blocks nothing else
+                validate_private_key_pem(decrypted_key_pem)
+        return private_key
+
+    return private_key_cache.get_or_load(_wrapped_key_digest(encrypted_private_key_hex), load)
+
+
+def validate_private_key_pem(private_key_pem: bytes) -> None:
+    """
+    Parse a PEM private key with full validation, discarding the result.
+
+    Runs on `key_validation_executor` so the RSA consistency check does not hold this process's GIL.
+
+    Raises:
+        ValueError: If the key is malformed or inconsistent.
+    """
+    serialization.load_pem_private_key(private_key_pem, password=None, backend=default_backend())
+
+
+def generate_x25519_key(user_email: str):
+    """
+    Generate and securely store an X25519 key pair for a given user email.
+
+    X25519 keys are used for ECIES hybrid encryption (see `ecies_service`). Generation takes
+    microseconds, so unlike RSA no pre-generated pool is needed.
+
+    Steps:
+    1. Check if the user already has an X25519 key pair. Raise an error if one exists.
+    2. Generate an X25519 private key and serialize both keys in PEM format.
+    3. Encrypt the private key PEM using AES encryption with the Key Encryption Key (KEK).
+    4. Store both keys in the MongoDB `keys` collection, with the private key encrypted.
+    5. Return the public key and database ID.
+
+    Parameters:
+        user_email (str): Email address of the user.
+
+    Returns:
+        dict: A dictionary containing the public key in PEM format and the database ID.
+
+    Raises:
+        ValueError: If the user already has an X25519 key pair.
+    """
+    existing_key = keys_collection.find_one({"user_email": user_email, "key_type": "X25519"})
+    if existing_key:
+        raise ValueError("User already has an X25519 key pair")
+
+    private_key = x25519.X25519PrivateKey.generate()
+    private_key_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
     )
+    public_key_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+    key_data = {
+        "user_email": user_email,
+        "key_type": "X25519",
+        "key_data": {
+            "public_key": public_key_pem.decode(),
+            "private_key": encrypt_aes_key(private_key_pem, KEK),
+        },
+    }
+    result = keys_collection.insert_one(key_data)
+    return {"id": str(result.inserted_id), "public_key": public_key_pem.decode()}
+
+
+def decrypt_x25519_private_key(encrypted_private_key_hex: str):
+    """
+    Decrypt an encrypted X25519 private key, using the same private key cache as RSA keys.
+
+    Parameters:
+        encrypted_private_key_hex (str): The encrypted private key as a hex string.
+
+    Returns:
+        x25519.X25519PrivateKey: The decrypted X25519 private key object.
+
+    Raises:
+        ValueError: If the decryption fails or the blob is not an X25519 private key.
+    """
+    private_key = _load_wrapped_private_key(encrypted_private_key_hex)
+    if not isinstance(private_key, x25519.X25519PrivateKey):
+        raise ValueError("Key is not an X25519 private key")
     return private_key
 
 
+def _wrapped_key_digest(encrypted_key_hex: str) -> bytes:
+    """
+    Compute the cache key of a KEK-wrapped key blob.
+    """
+    return hashlib.sha256(encrypted_key_hex.encode()).digest()
+
+
+def evict_private_key(encrypted_private_key_hex: str) -> bool:
+    """
+    Drop the loaded private key object for the given wrapped blob from the cache.
+
+    Returns:
+        bool: True if a cached key object was removed.
+    """
+    return private_key_cache.invalidate(_wrapped_key_digest(encrypted_private_key_hex))
+
+
+def get_aes_cipher(encrypted_key_hex: str) -> AESCipher:
+    """
+    Return the AESCipher for a KEK-wrapped AES key, unwrapping the key only on a cache miss.
+
+    AESCipher instances hold no per-message state, so a cached instance is safely shared
+    between concurrent requests.
+
+    Parameters:
+        encrypted_key_hex (str): The KEK-wrapped AES key in hexadecimal format.
+
+    Returns:
+        AESCipher: A cipher initialized with the unwrapped key.
+    """
+    return aes_cipher_cache.get_or_load(
+        _wrapped_key_digest(encrypted_key_hex),
+        lambda: AESCipher(decrypt_aes_key(encrypted_key_hex, KEK)),
+    )
+
+
 def encrypt_aes_key(aes_key: bytes, kek: bytes) -> str:
     """
     Encrypt an AES key or data using the Key Encryption Key (KEK).
@@ -220,17 +394,18 @@ def fetch_keys(user_email: str):
 
     return transformed_keys
 
-def fetch_public_key(user_email: str):
+def fetch_public_key(user_email: str, key_type: str = "RSA"):
     """
-    Retrieve the public RSA key associated with a given user email.
+    Retrieve the public key of the given type associated with a given user email.
 
     Parameters:
         user_email (str): The email address of the user.
+        key_type (str): Either "RSA" or "X25519".
 
     Returns:
-        str: The public RSA key in PEM format.
+        str: The public key in PEM format.
     """
-    key = keys_collection.find_one({"user_email": user_email, "key_type": "RSA"})
+    key = keys_collection.find_one({"user_email": user_email, "key_type": key_type})
     if key:
         return key["key_data"]["public_key"]
     return None
@@ -244,7 +419,8 @@ def delete_key(key_id: str, user_email: str):
     Steps:
     1. Validate the `key_id` and ensure it corresponds to an existing key owned by the user.
     2. Delete the key from the MongoDB `keys` collection if it matches the user.
-    3. Return a success message if the operation is successful.
+    3. Evict the key's unwrapped private key object or AES cipher from the in-process caches.
+    4. Return a success message if the operation is successful.
 
     Parameters:
         key_id (str): The database ID of the key to delete.
@@ -256,7 +432,13 @@ def delete_key(key_id: str, user_email: str):
     Raises:
         ValueError: If the key does not exist or does not belong to the user.
     """
-    result = keys_collection.delete_one({"_id": ObjectId(key_id), "user_email": user_email})
-    if result.deleted_count == 0:
+    deleted = keys_collection.find_one_and_delete({"_id": ObjectId(key_id), "user_email": user_email})
+    if deleted is None:
         raise ValueError("Key not found or does not belong to the user")
+
+    key_data = deleted.get("key_data", {})
+    if key_data.get("private_key"):
+        evict_private_key(key_data["private_key"])
+    if key_data.get("key_value"):
+        aes_cipher_cache.invalidate(_wrapped_key_digest(key_data["key_value"]))
     return {"msg": "Key deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+logger = logging.getLogger(__name__)
+
+
+class RSAKeyPool:
+    """
+    A pool of pre-generated RSA private keys filled by a background producer thread.
+
+    The producer sleeps while the pool holds at least `low_watermark` keys. Once the
+    depth drops below it, keys are generated until `high_watermark` keys are ready.
+    Consumers call `take()`, which returns a key in O(1) or None when the pool is empty.
+    """
+
+    def __init__(
+        self,
+        low_watermark: int = 2,
+        high_watermark: int = 8,
+        key_size: int = 2048,
+        public_exponent: int = 65537,
+        enabled: bool = True,
+    ):
+        """
+        :param low_watermark: Depth below which the producer starts refilling
+        :param high_watermark: Depth at which the producer stops refilling
+        :param key_size: RSA modulus size in bits
+        :param public_exponent: RSA public exponent
+        :param enabled: When False, `take()` always returns None and no thread is started
+        """
+        if not 0 <= low_watermark <= high_watermark:
+            raise ValueError("Watermarks must satisfy 0 <= low_watermark <= high_watermark")
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.key_size = key_size
+        self.public_exponent = public_exponent
+        self.enabled = enabled and high_watermark > 0
+
+        self._keys = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._generated = 0
+        self._generation_seconds = 0.0
+        self._taken = 0
+        self._empty_takes = 0
+
+    def start(self):
+        """
+        Start the background producer thread if it is not running yet.
+        """
+        if not self.enabled:
+            return
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._produce, name="rsa-key-pool", daemon=True)
+            self._thread.start()
+        logger.info(
+            f"RSA key pool started (low={self.low_watermark}, high={self.high_watermark}, size={self.key_size})"
+        )
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the producer thread. Keys already in the pool remain available.
+        """
+        with self._condition:
+            self._stopped = True
+            thread = self._thread
+            self._condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def take(self) -> Optional[rsa.RSAPrivateKey]:
+        """
+        Take a pre-generated private key from the pool.
+
+        Returns None when the pool is disabled or empty; callers then generate inline.
+        """
+        if not self.enabled:
+            return None
+        if self._thread is None:
+            self.start()
+        with self._condition:
+            if not self._keys:
+                self._empty_takes += 1
+                self._condition.notify()
+                return None
+            key = self._keys.popleft()
+            self._taken += 1
+            if len(self._keys) < self.low_watermark:
+                self._condition.notify()
+            return key
+
+    @property
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._keys)
+
+    def stats(self) -> dict:
+        """
+        Return the pool depth, consumption counters and refill rate.
+        """
+        with self._condition:
+            return {
+                "enabled": self.enabled,
+                "depth": len(self._keys),
+                "low_watermark": self.low_watermark,
+                "high_watermark": self.high_watermark,
+                "generated": self._generated,
+                "taken": self._taken,
+                "empty_takes": self._empty_takes,
+                "avg_generation_seconds": (
+                    self._generation_seconds / self._generated if self._generated else 0.0
+                ),
+                "refill_rate_per_second": (
+                    self._generated / self._generation_seconds if self._generation_seconds else 0.0
+                ),
+            }
+
+    def _produce(self):
+        while True:
+            with self._condition:
+                while not self._stopped and len(self._keys) >= self.low_watermark and self._keys:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+
+            # Refill up to the high watermark, generating outside the lock
+            while True:
+                with self._condition:
+                    if self._stopped or len(self._keys) >= self.high_watermark:
+                        break
+                started = time.perf_counter()
+                key = rsa.generate_private_key(public_exponent=self.public_exponent, key_size=self.key_size)
+                elapsed = time.perf_counter() - started
+                with self._condition:
+                    self._keys.append(key)
+                    self._generated += 1
+                    self._generation_seconds += elapsed
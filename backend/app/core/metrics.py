@@ -0,0 +1,36 @@
+"""
+A minimal in-process registry of runtime statistics.
+
+Components such as caches, pools and executors register a provider returning a
+dictionary of counters; `snapshot()` collects them all for the `/metrics` endpoint.
+"""
+import threading
+from typing import Callable, Dict
+
+_providers: Dict[str, Callable[[], dict]] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, provider: Callable[[], dict]):
+    """
+    Register (or replace) a statistics provider under the given name.
+    """
+    with _lock:
+        _providers[name] = provider
+
+
+def unregister(name: str):
+    """
+    Remove a previously registered statistics provider.
+    """
+    with _lock:
+        _providers.pop(name, None)
+
+
+def snapshot() -> dict:
+    """
+    Return the current statistics of every registered provider.
+    """
+    with _lock:
+        providers = dict(_providers)
+    return {name: provider() for name, provider in providers.items()}
@@ -2,8 +2,16 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from fastapi import HTTPException
 from .key_management import decrypt_rsa_private_key
+import os
+import struct
+
+ENVELOPE_VERSION = 1
+# version (1 byte) | wrapped data key length (2 bytes, big-endian)
+ENVELOPE_HEADER = struct.Struct(">BH")
+ENVELOPE_NONCE_LENGTH = 12
 
 class RSACipher:
     def __init__(self, key: str):
@@ -42,10 +50,20 @@ class RSACipher:
         """
         Encrypt the given plaintext using the public key and return the ciphertext in hex format.
         """
+        return self.encrypt_bytes(plaintext.encode("utf-8")).hex()
+
+    def encrypt_bytes(self, plaintext, mode: str = "oaep") -> bytes:
+        """
+        Encrypt a bytes-like plaintext (e.g. a memoryview) and return the raw ciphertext.
+
+        :param mode: "oaep" for a single RSA-OAEP block, "envelope" for an AES-GCM envelope
+        """
+        if mode == "envelope":
+            return self._encrypt_envelope(plaintext)
         try:
             public_key = self.load_public_key(self.key)
             ciphertext = public_key.encrypt(
-                plaintext.encode("utf-8"),
+                bytes(plaintext),
                 padding.OAEP(
                     mgf=padding.MGF1(algorithm=hashes.SHA256()),
                     algorithm=hashes.SHA256(),
@@ -53,19 +71,105 @@ class RSACipher:
                 ),
             )
             print("Data encrypted.")
-            return ciphertext.hex()
+            return ciphertext
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Encryption failed: {str(e)}")
+
+    def encrypt_envelope(self, plaintext: str) -> str:
+        """
+        Encrypt plaintext of any size with a fresh AES-256-GCM data key and wrap only that key with RSA-OAEP.
+
+        Envelope layout (returned in hex format):
+        version (1 byte) | wrapped key length (2 bytes) | RSA-OAEP wrapped data key | nonce (12 bytes) | AES-GCM ciphertext and tag
+
+        The header and wrapped key are authenticated as associated data.
+        """
+        return self._encrypt_envelope(plaintext.encode("utf-8")).hex()
+
+    def _encrypt_envelope(self, plaintext) -> bytes:
+        try:
+            public_key = self.load_public_key(self.key)
+            data_key = AESGCM.generate_key(bit_length=256)
+            wrapped_key = public_key.encrypt(
+                data_key,
+                padding.OAEP(
+                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                    algorithm=hashes.SHA256(),
+                    label=None,
+                ),
+            )
+            header = ENVELOPE_HEADER.pack(ENVELOPE_VERSION, len(wrapped_key)) + wrapped_key
+            nonce = os.urandom(ENVELOPE_NONCE_LENGTH)
+            ciphertext = AESGCM(data_key).encrypt(nonce, plaintext, header)
+            return header + nonce + ciphertext
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Encryption failed: {str(e)}")
 
+    def decrypt_envelope(self, envelope_hex: str) -> str:
+        """
+        Decrypt an envelope produced by `encrypt_envelope` using the private key and return the plaintext.
+        """
+        try:
+            envelope = bytes.fromhex(envelope_hex)
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
+        return self._decrypt_envelope(envelope).decode("utf-8")
+
+    def _decrypt_envelope(self, envelope) -> bytes:
+        try:
+            envelope = memoryview(envelope)
+            version, wrapped_key_length = ENVELOPE_HEADER.unpack_from(envelope)
+            if version != ENVELOPE_VERSION:
+                raise ValueError(f"Unsupported envelope version: {version}")
+            header_length = ENVELOPE_HEADER.size + wrapped_key_length
+            header = bytes(envelope[:header_length])
+            wrapped_key = header[ENVELOPE_HEADER.size:]
+            nonce = bytes(envelope[header_length:header_length + ENVELOPE_NONCE_LENGTH])
+            ciphertext = envelope[header_length + ENVELOPE_NONCE_LENGTH:]
+
+            private_key = self.load_private_key(self.key)
+            data_key = private_key.decrypt(
+                wrapped_key,
+                padding.OAEP(
+                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                    algorithm=hashes.SHA256(),
+                    label=None,
+                ),
+            )
+            return AESGCM(data_key).decrypt(nonce, ciphertext, header)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
+
     def decrypt(self, ciphertext_hex: str) -> str:
         """
         Decrypt the given ciphertext (in hex format) using the private key and return the plaintext.
         """
         try:
-            private_key = self.load_private_key(self.key)
             ciphertext_bytes = bytes.fromhex(ciphertext_hex)
+            return self.decrypt_bytes(ciphertext_bytes).decode("utf-8")
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
+
+    def decrypt_bytes(self, ciphertext, mode: str = "oaep") -> bytes:
+        """
+        Decrypt a raw bytes-like ciphertext (e.g. a memoryview) and return the raw plaintext.
+
+        :param mode: "oaep" for a single RSA-OAEP block, "envelope" for an AES-GCM envelope
+        """
+        if mode == "envelope":
+            return self._decrypt_envelope(ciphertext)
+        try:
+            private_key = self.load_private_key(self.key)
             plaintext = private_key.decrypt(
-                ciphertext_bytes,
+                bytes(ciphertext),
                 padding.OAEP(
                     mgf=padding.MGF1(algorithm=hashes.SHA256()),
                     algorithm=hashes.SHA256(),
@@ -73,6 +177,8 @@ class RSACipher:
                 ),
             )
             print("Data decrypted.")
-            return plaintext.decode("utf-8")
+            return plaintext
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Decryption failed: {str(e)}")
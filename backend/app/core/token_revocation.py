@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from ..database.session import db_instance
+from . import metrics
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+class TokenDenylist:
+    """
+    Revoked token IDs (`jti`), checked on every authenticated request.
+
+    This implementation provides:
+    - An in-process dict of jti -> expiry, so `is_revoked` is a single O(1) lookup that never does I/O
+    - Entries that disappear once the token would have expired anyway
+    - Cross-worker sharing through a Mongo collection with a TTL index on `expires_at`:
+      revocations are written through, and a background thread pulls the ones
+      made by other workers since its last sync
+    """
+
+    # Re-read this much history on every pull, so clock skew between workers cannot hide an entry
+    SYNC_OVERLAP = timedelta(seconds=30)
+
+    def __init__(self, collection_name: str = "revoked_tokens", sync_interval_seconds: float = 5.0):
+        """
+        :param collection_name: Mongo collection holding the shared denylist
+        :param sync_interval_seconds: Delay between two pulls from Mongo
+        """
+        self.collection_name = collection_name
+        self.sync_interval_seconds = sync_interval_seconds
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_sync: Optional[datetime] = None
+
+        self._checks = 0
+        self._hits = 0
+        self._syncs = 0
+        self._sync_errors = 0
+        self._pulled = 0
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """
+        Return True if the token ID has been revoked and has not expired yet.
+        """
+        self._checks += 1
+        if jti is None:
+            return False
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            self._revoked.pop(jti, None)
+            return False
+        self._hits += 1
+        return True
+
+    def revoke(self, jti: str, expires_at: float):
+        """
+        Revoke a token ID until `expires_at` (seconds since the epoch).
+
+        The local denylist is updated first, so this worker rejects the token even if
+        the write to Mongo fails; other workers then only learn of it once it succeeds.
+        """
+        with self._lock:
+            self._revoked[jti] = expires_at
+        try:
+            self._collection().update_one(
+                {"_id": jti},
+                {"$set": {
+                    "expires_at": datetime.fromtimestamp(expires_at, timezone.utc),
+                    "revoked_at": datetime.now(timezone.utc),
+                }},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.error(f"Failed to share revocation of token {jti}: {str(e)}")
+
+    def sync(self):
+        """
+        Pull revocations made since the last sync and drop expired entries.
+        """
+        query = {}
+        if self._last_sync is not None:
+            query["revoked_at"] = {"$gte": self._last_sync - self.SYNC_OVERLAP}
+        started = datetime.now(timezone.utc)
+        documents = list(self._collection().find(query, {"_id": 1, "expires_at": 1}))
+
+        now = time.time()
+        with self._lock:
+            for document in documents:
+                expires_at = document["expires_at"]
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                self._revoked[document["_id"]] = expires_at.timestamp()
+            # is_revoked pops entries without the lock; list() snapshots the dict atomically
+            for jti, expires_at in list(self._revoked.items()):
+                if expires_at <= now:
+                    self._revoked.pop(jti, None)
+            self._last_sync = started
+            self._syncs += 1
+            self._pulled += len(documents)
+
+    def start(self):
+        """
+        Start the background sync thread if it is not running yet.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="token-denylist-sync", daemon=True)
+            self._thread.start()
+        logger.info(f"Token denylist sync started (every {self.sync_interval_seconds}s)")
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background sync thread.
+        """
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        Return the denylist size and check/sync counters.
+        """
+        with self._lock:
+            return {
+                "size": len(self._revoked),
+                "checks": self._checks,
+                "revoked_hits": self._hits,
+                "syncs": self._syncs,
+                "sync_errors": self._sync_errors,
+                "pulled": self._pulled,
+                "last_sync": self._last_sync.isoformat() if self._last_sync else None,
+            }
+
+    def _collection(self):
+        return db_instance.get_collection(self.collection_name)
+
+    def _run(self):
+        try:
+            # Mongo deletes each entry once its token has expired
+            self._collection().create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            logger.error(f"Failed to create the {self.collection_name} TTL index: {str(e)}")
+        while not self._stopped.is_set():
+            try:
+                self.sync()
+            except Exception as e:
+                with self._lock:
+                    self._sync_errors += 1
+                logger.error(f"Token denylist sync failed: {str(e)}")
+            self._stopped.wait(self.sync_interval_seconds)
+
+
+# Global instance
+token_denylist = TokenDenylist(
+    sync_interval_seconds=float(os.getenv("TOKEN_DENYLIST_SYNC_SECONDS", "5")),
+)
+metrics.register("token_denylist", token_denylist.stats)
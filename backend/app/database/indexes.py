@@ -0,0 +1,119 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Every index the application relies on, per collection. Names are left to Mongo
+# (derived from the keys) so indexes created lazily elsewhere match these exactly.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Login, registration and rehash look users up by email
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "keys": [
+        # Key lookups by owner, and by owner and type
+        IndexModel([("user_email", ASCENDING), ("key_type", ASCENDING)]),
+    ],
+    "emails": [
+        # Inbox and sent listings: equality on the mailbox, then the keyset order of EmailService
+        IndexModel([("recipient_email", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("sender_email", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+        # view-email; the sender/recipient $or is checked on the few documents it matches
+        IndexModel([("email_id", ASCENDING)]),
+    ],
+    "challenges": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "challenge_counters": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "revoked_tokens": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        IndexModel([("revoked_at", ASCENDING)]),
+    ],
+}
+
+# (collection, filter, sort) of the queries served on every request; each must be answered by an index
+HOT_QUERIES: List[Tuple[str, dict, Optional[list]]] = [
+    ("users", {"email": "audit@example.com"}, None),
+    ("keys", {"user_email": "audit@example.com", "key_type": "RSA"}, None),
+    ("keys", {"user_email": "audit@example.com"}, None),
+    ("emails", {"recipient_email": "audit@example.com"}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("emails", {"sender_email": "audit@example.com"}, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("emails", {
+        "recipient_email": "audit@example.com",
+        "$or": [
+            {"timestamp": {"$lt": datetime(2024, 1, 1, tzinfo=timezone.utc)}},
+            {"timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc), "_id": {"$lt": "audit"}},
+        ],
+    }, [("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ("emails", {
+        "email_id": 1,
+        "$or": [{"sender_email": "audit@example.com"}, {"recipient_email": "audit@example.com"}],
+    }, None),
+    ("revoked_tokens", {"revoked_at": {"$gte": datetime(2024, 1, 1, tzinfo=timezone.utc)}}, None),
+]
+
+
+def ensure_indexes(database) -> Dict[str, List[str]]:
+    """
+    Create the declared indexes. Safe to run on every start: creating an index that
+    already exists with the same keys and options is a no-op on the server.
+
+    A failure on one collection (e.g. duplicate emails preventing the unique index)
+    is logged and does not stop the others; an unreachable server stops the run.
+
+    :param database: The pymongo database
+    :return: The index names per collection that are now in place
+    """
+    created = {}
+    for collection_name, indexes in INDEXES.items():
+        try:
+            created[collection_name] = database[collection_name].create_indexes(indexes)
+        except ConnectionFailure as e:
+            # The server is unreachable; the remaining collections would only time out too
+            logger.error(f"Skipping index creation, MongoDB is unreachable: {str(e)}")
+            break
+        except PyMongoError as e:
+            logger.error(f"Failed to create indexes on {collection_name}: {str(e)}")
+    return created
+
+
+def plan_stages(explain: dict) -> List[str]:
+    """
+    Return every stage name of the winning plan in an explain() result.
+    """
+    planner = explain.get("queryPlanner", explain)
+    stages = []
+    pending = [planner.get("winningPlan", {})]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append(node["stage"])
+            pending.extend(node.values())
+        elif isinstance(node, list):
+            pending.extend(node)
+    return stages
+
+
+def audit_query_plans(database) -> List[str]:
+    """
+    Explain every hot query and report those that scan a whole collection.
+
+    :param database: The pymongo database
+    :return: One description per query whose winning plan contains a COLLSCAN
+    """
+    problems = []
+    for collection_name, query, sort in HOT_QUERIES:
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = plan_stages(cursor.explain())
+        if "COLLSCAN" in stages:
+            problems.append(f"{collection_name}.find({query}) scans the collection: {stages}")
+    return problems
@@ -1,15 +1,124 @@
-from pymongo import MongoClient
+import threading
+
+import pymongo
+from pymongo import AsyncMongoClient, MongoClient
+from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+# (environment variable, MongoClient option, type); unset variables keep the driver default
+CLIENT_OPTIONS = [
+    ("MONGO_MAX_POOL_SIZE", "maxPoolSize", int),
+    ("MONGO_MIN_POOL_SIZE", "minPoolSize", int),
+    ("MONGO_MAX_IDLE_TIME_MS", "maxIdleTimeMS", int),
+    ("MONGO_WAIT_QUEUE_TIMEOUT_MS", "waitQueueTimeoutMS", int),
+    ("MONGO_CONNECT_TIMEOUT_MS", "connectTimeoutMS", int),
+    ("MONGO_SERVER_SELECTION_TIMEOUT_MS", "serverSelectionTimeoutMS", int),
+    ("MONGO_SOCKET_TIMEOUT_MS", "socketTimeoutMS", int),
+    ("MONGO_COMPRESSORS", "compressors", str),  # e.g. "zstd,snappy,zlib"
+    ("MONGO_WRITE_CONCERN_W", "w", lambda value: int(value) if value.isdigit() else value),
+    ("MONGO_WRITE_CONCERN_JOURNAL", "journal", lambda value: value.lower() == "true"),
+    ("MONGO_APP_NAME", "appname", str),
+]
+
+READINESS_TIMEOUT_SECONDS = float(os.getenv("MONGO_READINESS_TIMEOUT_SECONDS", "2"))
+
+
+def client_options() -> dict:
+    """
+    Build the MongoClient keyword arguments from the MONGO_* environment variables.
+    """
+    options = {}
+    for variable, option, parse in CLIENT_OPTIONS:
+        value = os.getenv(variable)
+        if value:
+            options[option] = parse(value)
+    return options
+
+
 class Database:
+    """
+    Holds the MongoDB clients of the process.
+
+    Constructing a client starts its monitor threads and connections, so nothing is
+    created at import time: the clients are built on first use, or by `connect()` from
+    the application lifespan, which also closes them on shutdown.
+    """
+
     def __init__(self):
-        self.client = MongoClient(os.getenv("MONGO_URI"))
-        self.db = self.client.get_database(os.getenv("DB_NAME", "default"))
+        self._lock = threading.Lock()
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self) -> MongoClient:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = MongoClient(os.getenv("MONGO_URI"), **client_options())
+        return self._client
+
+    @property
+    def db(self):
+        return self.client.get_database(os.getenv("DB_NAME", "default"))
+
+    def connect(self):
+        """
+        Create the synchronous client ahead of the first request.
+        """
+        return self.client
 
     def get_collection(self, collection_name):
         return self.db[collection_name]
 
-db_instance = Database()
\ No newline at end of file
+    def get_async_collection(self, collection_name):
+        """
+        Return the collection from the asyncio client, for `async def` routes.
+        The client is created on first use, since only async callers need it.
+        """
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = AsyncMongoClient(os.getenv("MONGO_URI"), **client_options())
+        return self._async_client.get_database(os.getenv("DB_NAME", "default"))[collection_name]
+
+    def ping(self) -> bool:
+        """
+        Return True if the server answers a ping within READINESS_TIMEOUT_SECONDS.
+        """
+        try:
+            with pymongo.timeout(READINESS_TIMEOUT_SECONDS):
+                self.client.admin.command("ping")
+            return True
+        except PyMongoError:
+            return False
+
+    async def close(self):
+        """
+        Close both clients; they are created again if used afterwards.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.close()
+
+
+class LazyCollection:
+    """
+    Module-level stand-in for a collection, resolved through `db_instance` on each use
+    so that holding one does not create a client at import time.
+    """
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+
+    def __getattr__(self, name):
+        return getattr(db_instance.get_collection(self.collection_name), name)
+
+
+db_instance = Database()
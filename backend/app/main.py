@@ -1,21 +1,94 @@
-from fastapi import FastAPI
+import hmac
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Depends, Header, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from .api.endpoints.authentication_endpoints import router as authentication_router
 from .api.endpoints.rsa_endpoints import router as rsa_router
+from .api.endpoints.ecies_endpoints import router as ecies_router
 from .api.endpoints.block_cipher_endpoints import router as aes_router
 from .api.endpoints.email_endpoints import router as email_router
 from .api.endpoints.key_management_endpoints import router as key_router
 from .api.endpoints.hashing_endpoints import router as hashing_router
+from .core import metrics
+from .core.key_management import rsa_key_pool
+from .core.crypto_executor import crypto_executor, bcrypt_executor, key_validation_executor
+from .core.bcrypt_calibration import configure_from_env as configure_bcrypt
+from .core.token_revocation import token_denylist
+from .database.indexes import ensure_indexes
+from .database.session import db_instance
 from starlette.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick the bcrypt cost (BCRYPT_ROUNDS or calibrated to BCRYPT_TARGET_MS)
+    configure_bcrypt()
+    # The Mongo client is created here rather than at import; see database/session.py
+    db_instance.connect()
+    # Declared indexes (database/indexes.py); creating existing ones is a no-op
+    if os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true":
+        await run_in_threadpool(ensure_indexes, db_instance.db)
+    # Start filling the RSA key pool before the first /keys/gen request
+    rsa_key_pool.start()
+    crypto_executor.start()
+    # Spawning the validation workers takes a second; pay it before the first private key is loaded
+    key_validation_executor.start()
+    token_denylist.start()
+    yield
+    token_denylist.stop(timeout=5)
+    rsa_key_pool.stop(timeout=5)
+    crypto_executor.shutdown(wait=False)
+    key_validation_executor.shutdown(wait=False)
+    bcrypt_executor.shutdown(wait=False)
+    await db_instance.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(authentication_router, prefix="/auth", tags=["Authentication"])
 app.include_router(rsa_router, prefix="/rsa", tags=["RSA Operations"])
+app.include_router(ecies_router, prefix="/ecies", tags=["ECIES Operations"])
 app.include_router(aes_router, prefix="/aes", tags=["AES Operations"])
 app.include_router(email_router, prefix="/email", tags=["Email Operations"])
 app.include_router(key_router, prefix="/keys", tags=["Key Management"])
 app.include_router(hashing_router, prefix="/hash", tags=["Hashing Operations"])
 
+
+def require_metrics_token(authorization: Optional[str] = Header(None)):
+    """
+    Allow only callers presenting `Authorization: Bearer <METRICS_TOKEN>`.
+    Without METRICS_TOKEN the endpoint is disabled and answers 404.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, presented = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(presented.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.get("/metrics", tags=["Monitoring"], dependencies=[Depends(require_metrics_token)])
+def get_metrics():
+    """
+    Return runtime statistics of the in-process caches, pools and executors.
+    Requires the METRICS_TOKEN bearer token, since the counters describe internal state.
+    """
+    return metrics.snapshot()
+
+
+@app.get("/ready", tags=["Monitoring"])
+async def readiness():
+    """
+    Readiness probe: 200 once MongoDB answers a ping, 503 otherwise.
+    """
+    if await run_in_threadpool(db_instance.ping):
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "unavailable", "detail": "MongoDB is not reachable"})
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
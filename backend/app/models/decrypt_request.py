@@ -1,6 +1,8 @@
+from typing import Literal
 from pydantic import BaseModel
 
 
 class DecryptRequest(BaseModel):
     ciphertext: str
-    key: str
\ No newline at end of file
+    key: str
+    mode: Literal["oaep", "envelope"] = "oaep"
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
@@ -7,7 +8,7 @@ class Email(BaseModel):
     recipient_email: str
     subject: str
     body: str
-    hash: str
+    hash: Optional[str] = None  # Not needed when the body is encrypted with an authenticated AES mode
     encrypted_aes_key: str
     timestamp: datetime
 
@@ -18,3 +19,16 @@ class Email(BaseModel):
     class Config:
         from_attributes = True
 
+
+class EmailSummary(BaseModel):
+    """Header-only view of an email for list pages; the body is fetched through view-email."""
+    email_id: int
+    sender_email: str
+    recipient_email: str
+    subject: str
+    timestamp: datetime
+
+
+class EmailPage(BaseModel):
+    items: List[EmailSummary]
+    next_cursor: Optional[str] = None  # Opaque; pass it back to get the next page, None on the last one
@@ -3,5 +3,5 @@ from pydantic import BaseModel, EmailStr
 class Key(BaseModel):
     id: str
     user_email : EmailStr
-    key_type : str # Either 'RSA' or 'AES'
-    key_data : dict # For RSA: {public_key, private_key}, For AES: {key_value}
+    key_type : str # 'RSA', 'X25519' or 'AES'
+    key_data : dict # For RSA/X25519: {public_key, private_key}, For AES: {key_value}
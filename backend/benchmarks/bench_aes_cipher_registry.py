@@ -0,0 +1,45 @@
+"""
+Microbenchmark of the /aes/encrypt key path: unwrapping the KEK-wrapped key and building
+an AESCipher on every request (before) versus the per-key cipher registry (after).
+
+Run from the repository root:
+    KEK_HEX=<64 hex chars> python -m backend.benchmarks.bench_aes_cipher_registry
+"""
+import os
+import time
+from secrets import token_bytes
+
+os.environ.setdefault("KEK_HEX", "00" * 32)
+
+import backend.app.core.key_management as keyManagement
+from backend.app.core.block_cipher_module import AESCipher
+
+REQUESTS = 20000
+PLAINTEXT = "x" * 256
+
+
+def encrypt_without_registry(key: str) -> str:
+    return AESCipher(keyManagement.decrypt_aes_key(key, keyManagement.KEK)).encrypt(PLAINTEXT)
+
+
+def encrypt_with_registry(key: str) -> str:
+    return keyManagement.get_aes_cipher(key).encrypt(PLAINTEXT)
+
+
+def measure(label: str, fn, key: str):
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        fn(key)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<20} {REQUESTS / elapsed:>12,.0f} req/s")
+
+
+def main():
+    key = keyManagement.encrypt_aes_key(token_bytes(32), keyManagement.KEK)
+    measure("before (unwrap)", encrypt_without_registry, key)
+    measure("after (registry)", encrypt_with_registry, key)
+    print(keyManagement.aes_cipher_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Concurrency benchmark of inbox loads against a real MongoDB: the blocking pymongo
+path called from a coroutine (before) versus the paginated asyncio path used by
+/email/inbox (after). With the blocking path, in-flight requests serialize on the
+event loop, so throughput stays flat as concurrency grows.
+
+Run from the repository root with MONGO_URI (and optionally DB_NAME) pointing at a
+scratch database:
+    KEK_HEX=<64 hex chars> MONGO_URI=mongodb://localhost:27017 python -m backend.benchmarks.bench_email_inbox_async
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("KEK_HEX", "00" * 32)
+
+from backend.app.core.email_service import EmailService
+from backend.app.database.session import db_instance
+
+RECIPIENT = "bench-inbox@example.com"
+INBOX_SIZE = 50
+REQUESTS = 400
+CONCURRENCY = (1, 8, 32, 128)
+
+
+def seed():
+    collection = db_instance.get_collection("emails")
+    collection.delete_many({"recipient_email": RECIPIENT})
+    collection.insert_many([
+        {
+            "email_id": 10 ** 9 + i, "sender_email": "bench-sender@example.com", "recipient_email": RECIPIENT,
+            "subject": f"subject {i}", "body": "x" * 512, "encrypted_aes_key": "k" * 344,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        for i in range(INBOX_SIZE)
+    ])
+
+
+async def measure(label: str, load, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await load(RECIPIENT)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(REQUESTS)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<8} concurrency {concurrency:>4} {REQUESTS / elapsed:>10,.0f} inbox loads/s")
+
+
+async def run(service: EmailService):
+    async def blocking(recipient):
+        return service.get_emails(recipient)
+
+    for concurrency in CONCURRENCY:
+        await measure("before", blocking, concurrency)
+    for concurrency in CONCURRENCY:
+        await measure("after", service.get_inbox_page_async, concurrency)
+
+
+def main():
+    seed()
+    try:
+        asyncio.run(run(EmailService(db_instance)))
+    finally:
+        db_instance.get_collection("emails").delete_many({"recipient_email": RECIPIENT})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Throughput of the chunked ParallelAESGCM engine at 1, 2, 4 and 8 threads.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_parallel_aes [size_in_MiB] [segment_size_in_KiB]
+"""
+import os
+import sys
+import time
+
+from backend.app.core.block_cipher_module import ParallelAESGCM
+
+THREADS = (1, 2, 4, 8)
+
+
+def measure(data: bytes, key: bytes, segment_size: int, threads: int):
+    engine = ParallelAESGCM(key, segment_size=segment_size, max_workers=threads)
+    started = time.perf_counter()
+    sealed = engine.encrypt(data)
+    encrypt_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    engine.decrypt(sealed)
+    decrypt_seconds = time.perf_counter() - started
+    return len(data) / encrypt_seconds / 1e9, len(data) / decrypt_seconds / 1e9
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    segment_size = (int(sys.argv[2]) if len(sys.argv) > 2 else 1024) * 1024
+    data = os.urandom(size * 1024 * 1024)
+    key = os.urandom(32)
+
+    print(f"{size} MiB input, {segment_size // 1024} KiB segments, {os.cpu_count()} CPUs")
+    for threads in THREADS:
+        encrypt_rate, decrypt_rate = measure(data, key, segment_size, threads)
+        print(f"{threads} threads: encrypt {encrypt_rate:6.2f} GB/s, decrypt {decrypt_rate:6.2f} GB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import asyncio
+import os
+
+import httpx
+import pytest
+
+import backend.app.api.endpoints.block_cipher_endpoints as block_cipher_endpoints
+import backend.app.core.key_management as keyManagement
+from backend.app.core.block_cipher_module import STREAM_SEGMENT_SIZE, ParallelAESGCM
+from backend.app.core.crypto_executor import CryptoExecutor
+from backend.app.main import app
+
+
+def _chunks(data, size):
+    async def body():
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+    return body()
+
+
+def _post(path, data, key, chunk_size=100_000):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, content=_chunks(data, chunk_size), headers={"X-AES-Key": key})
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def wrapped_key(monkeypatch):
+    executor = CryptoExecutor("test", max_workers=2, kind="thread")
+    monkeypatch.setattr(block_cipher_endpoints, "crypto_executor", executor)
+    yield keyManagement.encrypt_aes_key(os.urandom(32), keyManagement.KEK)
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("size", [0, 17, 4 * STREAM_SEGMENT_SIZE, 4 * STREAM_SEGMENT_SIZE + 12345])
+def test_stream_round_trip(wrapped_key, size):
+    data = os.urandom(size)
+    encrypted = _post("/aes/encrypt-stream", data, wrapped_key)
+    assert encrypted.status_code == 200
+    segments = max(1, -(-size // STREAM_SEGMENT_SIZE))
+    assert len(encrypted.content) == ParallelAESGCM.HEADER.size + size + segments * ParallelAESGCM.TAG_LENGTH
+
+    decrypted = _post("/aes/decrypt-stream", encrypted.content, wrapped_key, chunk_size=70_001)
+    assert decrypted.status_code == 200
+    assert decrypted.content == data
+    if size > STREAM_SEGMENT_SIZE:
+        # Large chunks are processed on the executor, not on the event loop
+        assert "aes_stream_encrypt" in block_cipher_endpoints.crypto_executor.stats()["operations"]
+
+
+def test_bad_key_header_is_rejected(wrapped_key):
+    assert _post("/aes/encrypt-stream", b"data", "not-hex").status_code == 400
+    assert _post("/aes/decrypt-stream", b"data", "00" * 48).status_code == 400
+
+
+def test_corrupted_stream_never_releases_forged_plaintext(wrapped_key):
+    data = os.urandom(3 * STREAM_SEGMENT_SIZE)
+    sealed = bytearray(_post("/aes/encrypt-stream", data, wrapped_key).content)
+
+    # A bad header or first segment is reported before the response starts
+    first = bytearray(sealed)
+    first[ParallelAESGCM.HEADER.size + 10] ^= 1
+    response = _post("/aes/decrypt-stream", bytes(first), wrapped_key)
+    assert response.status_code == 400
+    assert "Segment 0 failed authentication" in response.text
+    assert _post("/aes/decrypt-stream", b"\x09" + bytes(sealed[1:]), wrapped_key).status_code == 400
+
+    # A later segment failing its tag aborts the stream
+    sealed[-5] ^= 1
+    with pytest.raises(ValueError, match="failed authentication"):
+        _post("/aes/decrypt-stream", bytes(sealed), wrapped_key)
+
+
+@pytest.mark.parametrize("spec_version", ["2.0", "2.4"])
+def test_streaming_response_stops_on_disconnect_once_body_is_read(spec_version):
+    scope = {"type": "http", "asgi": {"spec_version": spec_version}}
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def endless():
+        while True:
+            yield b"x"
+            await asyncio.sleep(0.01)
+
+    async def disconnect():
+        return {"type": "http.disconnect"}
+
+    async def untouched():
+        raise AssertionError("receive must not be read while the body iterator owns it")
+
+    async def scenario():
+        body_consumed = block_cipher_endpoints.anyio.Event()
+        # Before the body is consumed the listener leaves `receive` alone
+        finite = block_cipher_endpoints.RequestStreamingResponse(_chunks(b"abc", 1), body_consumed)
+        await finite(scope, untouched, send)
+
+        body_consumed.set()
+        response = block_cipher_endpoints.RequestStreamingResponse(endless(), body_consumed)
+        await asyncio.wait_for(response(scope, disconnect, send), timeout=2)
+
+    asyncio.run(scenario())
+    assert sent[-1]["type"] == "http.response.body"
+
+
+def test_streaming_response_stops_when_send_fails():
+    async def send(message):
+        if message["type"] == "http.response.body":
+            raise OSError("client went away")
+
+    async def endless():
+        while True:
+            yield b"x"
+
+    async def pending():
+        await asyncio.sleep(10)
+
+    async def scenario():
+        body_consumed = block_cipher_endpoints.anyio.Event()
+        body_consumed.set()
+        response = block_cipher_endpoints.RequestStreamingResponse(endless(), body_consumed)
+        await asyncio.wait_for(response({"type": "http"}, pending, send), timeout=2)
+
+    asyncio.run(scenario())
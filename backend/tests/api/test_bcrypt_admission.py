@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from passlib.hash import bcrypt
+
+import backend.app.api.endpoints.hashing_endpoints as hashing_endpoints
+from backend.app.core.crypto_executor import CryptoExecutor, ExecutorSaturated
+from backend.app.main import app
+
+
+def test_sync_call_shares_admission_control_and_metrics():
+    executor = CryptoExecutor("test-bcrypt", max_workers=1, max_queue=0, kind="thread")
+    release = threading.Event()
+    worker = threading.Thread(target=executor.call, args=("slow", release.wait))
+    worker.start()
+    try:
+        while executor.stats()["in_flight"] == 0:
+            pass
+        with pytest.raises(ExecutorSaturated):
+            executor.call("slow", release.wait)
+    finally:
+        release.set()
+        worker.join()
+
+    assert executor.call("fast", sum, [1, 2]) == 3
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["operations"]["slow"]["count"] == 1
+    assert "avg_wait_seconds" in stats["operations"]["fast"]
+    executor.shutdown()
+
+
+def test_saturated_bcrypt_pool_sheds_load_with_503(monkeypatch):
+    executor = CryptoExecutor("test-bcrypt", max_workers=1, max_queue=0, kind="thread")
+    monkeypatch.setattr(hashing_endpoints, "bcrypt_executor", executor)
+    release = threading.Event()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            blocker = asyncio.ensure_future(executor.run("block", release.wait))
+            await asyncio.sleep(0.05)
+            shed = await client.post("/hash/hash-password", json={"password": "secret"})
+            release.set()
+            await blocker
+            served = await client.post("/hash/verify-password", json={
+                "plain_password": "secret",
+                "hashed_password": bcrypt.using(rounds=4).hash("secret"),
+            })
+            return shed, served
+
+    shed, served = asyncio.run(scenario())
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "1"
+    assert served.json() == {"is_valid": True}
+    assert executor.stats()["operations"]["bcrypt_verify"]["count"] == 1
+    executor.shutdown()
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import backend.app.api.endpoints.block_cipher_endpoints as block_cipher_endpoints
+import backend.app.api.endpoints.rsa_endpoints as rsa_endpoints
+import backend.app.core.key_management as keyManagement
+from backend.app.api.wire import BINARY_MEDIA_TYPE, pack_fields, split_fields
+from backend.app.core.crypto_executor import CryptoExecutor
+from backend.app.main import app
+
+BINARY_HEADERS = {"Content-Type": BINARY_MEDIA_TYPE, "Accept": BINARY_MEDIA_TYPE}
+
+
+def _post_all(requests):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.post(path, **kwargs) for path, kwargs in requests]
+
+    return asyncio.run(scenario())
+
+
+def _thread_executor(monkeypatch):
+    executor = CryptoExecutor("test", max_workers=2, kind="thread")
+    monkeypatch.setattr(rsa_endpoints, "crypto_executor", executor)
+    monkeypatch.setattr(block_cipher_endpoints, "crypto_executor", executor)
+
+
+def test_split_fields_returns_views_and_rejects_bad_lengths():
+    body = pack_fields(b"payload", b"key")
+    payload, key, mode = split_fields(body, 3)
+    assert isinstance(payload, memoryview) and payload.obj is body
+    assert (bytes(payload), bytes(key), bytes(mode)) == (b"payload", b"key", b"")
+    for bad in (body[:-1], body + b"\x00", pack_fields(b"a", b"b", b"c")):
+        try:
+            split_fields(bad, 2)
+        except ValueError:
+            continue
+        raise AssertionError(f"accepted malformed body {bad!r}")
+
+
+def test_aes_binary_and_json_modes_interoperate(monkeypatch):
+    _thread_executor(monkeypatch)
+    wrapped = keyManagement.encrypt_aes_key(b"k" * 32, keyManagement.KEK)
+    plaintext = bytes(range(256)) * 4
+
+    encrypted, = _post_all([
+        ("/aes/encrypt", {"content": pack_fields(plaintext, wrapped.encode(), b"GCM"), "headers": BINARY_HEADERS}),
+    ])
+    assert encrypted.status_code == 200
+    assert encrypted.headers["content-type"] == BINARY_MEDIA_TYPE
+
+    decrypted, json_encrypted = _post_all([
+        ("/aes/decrypt", {"content": pack_fields(encrypted.content, wrapped.encode(), b"GCM"), "headers": BINARY_HEADERS}),
+        ("/aes/encrypt", {"json": {"plaintext": "hello", "key": wrapped}}),
+    ])
+    assert decrypted.content == plaintext
+
+    json_decrypted, = _post_all([
+        ("/aes/decrypt", {"json": {"encrypted_text": json_encrypted.json()["AES_encrypted_text"], "key": wrapped}}),
+    ])
+    assert json_decrypted.json() == {"AES_decrypted_text": "hello"}
+
+
+def test_rsa_binary_round_trip(monkeypatch):
+    _thread_executor(monkeypatch)
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    wrapped = keyManagement.encrypt_aes_key(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ),
+        keyManagement.KEK,
+    )
+    plaintext = b"\x00\xffbinary" * 1000
+
+    encrypted, = _post_all([
+        ("/rsa/encrypt", {"content": pack_fields(plaintext, public_pem, b"envelope"), "headers": BINARY_HEADERS}),
+    ])
+    decrypted, = _post_all([
+        ("/rsa/decrypt", {"content": pack_fields(encrypted.content, wrapped.encode(), b"envelope"), "headers": BINARY_HEADERS}),
+    ])
+    assert decrypted.content == plaintext
+
+
+def test_hash_negotiation_and_invalid_binary_body():
+    data = b"some \x00 bytes"
+    binary, as_json, verified, malformed = _post_all([
+        ("/hash/hash-text", {"content": pack_fields(data), "headers": BINARY_HEADERS}),
+        ("/hash/hash-text", {"json": {"text": "abc"}}),
+        ("/hash/verify-hash", {
+            "content": pack_fields(data, hashlib.sha256(data).hexdigest().encode()),
+            "headers": {"Content-Type": BINARY_MEDIA_TYPE},
+        }),
+        ("/hash/hash-text", {"content": b"\x00\x00\x00\x09short", "headers": BINARY_HEADERS}),
+    ])
+    assert binary.content == hashlib.sha256(data).digest()
+    assert as_json.json() == {"hash_value": hashlib.sha256(b"abc").hexdigest()}
+    assert verified.json() == {"is_valid": True}
+    assert malformed.status_code == 400
+
+
+def test_binary_and_json_verify_hash_agree():
+    digest = hashlib.sha256(b"abc").hexdigest()
+    cases = [(digest, True), (digest.upper(), True), ("00" * 32, False), ("not hex", False)]
+    requests = []
+    for hash_value, _ in cases:
+        requests.append(("/hash/verify-hash", {"json": {"text": "abc", "hash_value": hash_value}}))
+        requests.append(("/hash/verify-hash", {
+            "content": pack_fields(b"abc", hash_value.encode()),
+            "headers": {"Content-Type": BINARY_MEDIA_TYPE},
+        }))
+    responses = _post_all(requests)
+    expected = [is_valid for _, is_valid in cases for _ in range(2)]
+    assert [response.json()["is_valid"] for response in responses] == expected
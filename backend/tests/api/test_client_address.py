@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+from starlette.requests import Request
+
+import backend.app.api.client_address as client_address
+import backend.app.api.endpoints.authentication_endpoints as authentication_endpoints
+from backend.app.api.client_address import client_ip, parse_networks
+from backend.app.main import app
+
+PROXIES = parse_networks("10.0.0.0/8, 127.0.0.1")
+
+
+def _request(peer, *forwarded):
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded]
+    return Request({"type": "http", "client": (peer, 1234), "headers": headers})
+
+
+def test_direct_peer_is_used_without_trusted_proxies():
+    assert client_ip(_request("203.0.113.5", "198.51.100.1"), []) == "203.0.113.5"
+
+
+def test_forwarded_header_is_ignored_from_untrusted_peers():
+    assert client_ip(_request("203.0.113.5", "198.51.100.1"), PROXIES) == "203.0.113.5"
+
+
+def test_right_most_untrusted_hop_is_the_client():
+    # The client prepended a forged address; each trusted proxy appended its peer
+    request = _request("10.0.0.2", "192.0.2.66, 198.51.100.1", "10.0.0.1")
+    assert client_ip(request, PROXIES) == "198.51.100.1"
+
+
+def test_only_trusted_hops_or_garbage_fall_back_to_the_last_trusted_hop():
+    assert client_ip(_request("127.0.0.1"), PROXIES) == "127.0.0.1"
+    assert client_ip(_request("127.0.0.1", "10.0.0.7"), PROXIES) == "10.0.0.7"
+    assert client_ip(_request("127.0.0.1", "not-an-ip, 10.0.0.7"), PROXIES) == "10.0.0.7"
+
+
+def test_challenge_route_keys_the_limit_on_the_forwarded_client(monkeypatch):
+    seen = []
+
+    def request_login_challenge(email, ip=None):
+        seen.append(ip)
+        return {"challenge": "c", "salt": "s"}
+
+    monkeypatch.setattr(authentication_endpoints, "request_login_challenge", request_login_challenge)
+    monkeypatch.setattr(client_address, "TRUSTED_PROXIES", parse_networks("127.0.0.1"))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 1234))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for forwarded in ("198.51.100.1", "198.51.100.2"):
+                response = await client.post(
+                    "/auth/challenge", json={"email": "user@example.com"}, headers={"X-Forwarded-For": forwarded}
+                )
+                assert response.status_code == 200
+
+    asyncio.run(scenario())
+    assert seen == ["198.51.100.1", "198.51.100.2"]
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import backend.app.api.endpoints.block_cipher_endpoints as block_cipher_endpoints
+import backend.app.api.endpoints.rsa_endpoints as rsa_endpoints
+import backend.app.core.key_management as keyManagement
+from backend.app.core.crypto_executor import CryptoExecutor, crypto_executor, key_validation_executor
+from backend.app.core.rsa_service import RSACipher
+from backend.app.main import app
+
+
+def _p99(samples):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+async def _ping_latencies(client, count, until=None, interval=0.005):
+    """
+    Issue requests to an unrelated route at a fixed interval and return each one's latency,
+    measured from the moment it was due so that event loop stalls are included.
+    """
+    latencies = []
+    while len(latencies) < count or (until is not None and not until.done()):
+        due = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        response = await client.post("/auth/logout")
+        latencies.append(time.perf_counter() - due)
+        assert response.status_code == 200
+    return latencies
+
+
+@pytest.mark.parametrize("kind", sorted({crypto_executor.kind, "thread", "process"}))
+def test_unrelated_route_latency_stays_flat_under_rsa_load(monkeypatch, kind):
+    # Expire cached key objects immediately so every decryption re-parses the PEM
+    monkeypatch.setenv("PRIVATE_KEY_CACHE_TTL_SECONDS", "0")
+    monkeypatch.setattr(keyManagement.private_key_cache, "ttl_seconds", 0)
+    executor = CryptoExecutor("test", max_workers=1, max_queue=64, kind=kind)
+    monkeypatch.setattr(rsa_endpoints, "crypto_executor", executor)
+    executor.start()
+    key_validation_executor.start()
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    wrapped = keyManagement.encrypt_aes_key(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ),
+        keyManagement.KEK,
+    )
+    ciphertext = RSACipher(public_pem).encrypt("hello")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            baseline = await _ping_latencies(client, 50)
+
+            async def decrypt():
+                response = await client.post("/rsa/decrypt", json={"ciphertext": ciphertext, "key": wrapped})
+                assert response.status_code == 200
+                assert response.json() == {"plaintext": "hello"}
+
+            started = time.perf_counter()
+            load = asyncio.ensure_future(asyncio.gather(*(decrypt() for _ in range(30))))
+            under_load = await _ping_latencies(client, 20, until=load)
+            await load
+            load_seconds = time.perf_counter() - started
+        return baseline, under_load, load_seconds
+
+    try:
+        baseline, under_load, load_seconds = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    operation = executor.stats()["operations"]["rsa_decrypt"]
+    assert operation["count"] == 30
+    # Run on the loop, or validated under this process's GIL, a single key parse would stall every ping behind it
+    assert _p99(under_load) < 0.070
+    assert _p99(under_load) < max(5 * _p99(baseline), operation["avg_seconds"] / 2)
+    assert load_seconds > 10 * _p99(under_load)
+
+
+def test_default_executor_fills_the_caches_of_this_process(monkeypatch):
+    # The shared instance defaults to threads; checked in a fresh interpreter without the override
+    env = {k: v for k, v in os.environ.items() if k != "CRYPTO_EXECUTOR_KIND"}
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    check = "from backend.app.core.crypto_executor import crypto_executor; assert crypto_executor.kind == 'thread'"
+    assert subprocess.run([sys.executable, "-c", check], cwd=root, env=env).returncode == 0
+
+    executor = CryptoExecutor("test", max_workers=1, kind="thread")
+    wrapped = keyManagement.encrypt_aes_key(os.urandom(32), keyManagement.KEK)
+    misses = keyManagement.aes_cipher_cache.stats()["misses"]
+    asyncio.run(executor.run("aes_encrypt", block_cipher_endpoints._encrypt, wrapped, "hello"))
+    assert keyManagement.aes_cipher_cache.stats()["misses"] == misses + 1
+    assert keyManagement.aes_cipher_cache.get(keyManagement._wrapped_key_digest(wrapped)) is not None
+    executor.shutdown()
@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import backend.app.api.endpoints.ecies_endpoints as ecies_endpoints
+import backend.app.core.key_management as keyManagement
+from backend.app.core.crypto_executor import CryptoExecutor
+from backend.app.main import app
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+
+    def find_one(self, query):
+        for document in self.documents:
+            if all(document.get(k) == v for k, v in query.items()):
+                return document
+        return None
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+        class Result:
+            inserted_id = len(self.documents)
+        return Result()
+
+
+def _post(path, payload):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, json=payload)
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def stored_key(monkeypatch):
+    executor = CryptoExecutor("test", max_workers=2, kind="thread")
+    monkeypatch.setattr(ecies_endpoints, "crypto_executor", executor)
+    collection = FakeCollection()
+    monkeypatch.setattr(keyManagement, "keys_collection", collection)
+    generated = keyManagement.generate_x25519_key("user@example.com")
+    yield generated["public_key"], collection.documents[0]["key_data"]["private_key"]
+    executor.shutdown()
+
+
+def test_ecies_endpoints_round_trip(stored_key):
+    public_pem, wrapped = stored_key
+
+    encrypted = _post("/ecies/encrypt", {"plaintext": "hello", "key": public_pem})
+    assert encrypted.status_code == 200
+
+    decrypted = _post("/ecies/decrypt", {"ciphertext": encrypted.json()["ciphertext"], "key": wrapped})
+    assert decrypted.status_code == 200
+    assert decrypted.json() == {"plaintext": "hello"}
+
+
+def test_ecies_encrypt_rejects_a_non_x25519_key_with_400(stored_key):
+    rsa_public_pem = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+
+    response = _post("/ecies/encrypt", {"plaintext": "hello", "key": rsa_public_pem})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Key is not an X25519 public key"}
+
+
+def test_ecies_decrypt_rejects_a_tampered_ciphertext(stored_key):
+    public_pem, wrapped = stored_key
+    ciphertext = bytearray.fromhex(_post("/ecies/encrypt", {"plaintext": "hello", "key": public_pem}).json()["ciphertext"])
+    ciphertext[-1] ^= 1  # inside the GCM tag
+
+    response = _post("/ecies/decrypt", {"ciphertext": ciphertext.hex(), "key": wrapped})
+
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Decryption failed")
+    assert "hello" not in response.text
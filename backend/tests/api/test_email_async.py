@@ -0,0 +1,173 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from bson import ObjectId
+
+import backend.app.api.endpoints.email_endpoints as email_endpoints
+from backend.app.core.auth import get_current_user
+from backend.app.core.email_service import decode_cursor, encode_cursor
+from backend.app.main import app
+
+ROUND_TRIP = 0.1
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _email(email_id, sender="b@example.com", recipient="a@example.com", minute=None):
+    return {
+        "_id": ObjectId(), "email_id": email_id, "sender_email": sender, "recipient_email": recipient,
+        "subject": f"s{email_id}", "body": "b", "encrypted_aes_key": "k",
+        "timestamp": EPOCH + timedelta(minutes=email_id if minute is None else minute),
+    }
+
+
+def _matches(document, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not document[field] < condition["$lt"]:
+                return False
+        elif document[field] != condition:
+            return False
+    return True
+
+
+class FakeAsyncCursor:
+    def __init__(self, documents, projection):
+        self.documents = documents
+        self.projection = projection
+        self.count = None
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda document: document[field], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.count = count
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(ROUND_TRIP)
+        documents = self.documents[:self.count] if self.count else self.documents
+        if self.projection:
+            documents = [{k: v for k, v in document.items() if k == "_id" or k in self.projection} for document in documents]
+        return [dict(document) for document in documents]
+
+
+class FakeAsyncEmails:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection=None):
+        return FakeAsyncCursor([document for document in self.documents if _matches(document, query)], projection)
+
+    async def find_one(self, query):
+        await asyncio.sleep(ROUND_TRIP)
+        for document in self.documents:
+            if _matches(document, query):
+                return dict(document)
+        return None
+
+
+def _install(monkeypatch, documents):
+    collection = FakeAsyncEmails(documents)
+    monkeypatch.setattr(email_endpoints.email_service, "_get_async_collection", lambda: collection)
+    monkeypatch.setattr(email_endpoints.email_service, "_get_collection", lambda: (_ for _ in ()).throw(
+        AssertionError("async routes must not use the blocking client")))
+    app.dependency_overrides[get_current_user] = lambda: "a@example.com"
+
+
+def _run(scenario):
+    async def with_client():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client)
+
+    try:
+        return asyncio.run(with_client())
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_inbox_requests_overlap_instead_of_serializing(monkeypatch):
+    _install(monkeypatch, [_email(1), _email(2), _email(3, sender="a@example.com", recipient="c@example.com")])
+
+    async def scenario(client):
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.get("/email/inbox") for _ in range(20)))
+        return responses, time.perf_counter() - started
+
+    responses, elapsed = _run(scenario)
+    assert all(response.status_code == 200 for response in responses)
+    assert [email["email_id"] for email in responses[0].json()["items"]] == [2, 1]
+    # 20 sequential round-trips would take 2s
+    assert elapsed < 20 * ROUND_TRIP / 2
+
+
+def test_inbox_pages_follow_the_cursor_without_bodies(monkeypatch):
+    # Emails 4 to 6 share a timestamp, so the page boundary has to fall back on _id
+    _install(monkeypatch, [_email(i, minute=4 if 4 <= i <= 6 else None) for i in range(1, 10)])
+
+    async def scenario(client):
+        pages, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = (await client.get("/email/inbox", params=params)).json()
+            pages.append(page)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return pages, await client.get("/email/inbox", params={"cursor": "not-a-cursor"})
+
+    pages, invalid = _run(scenario)
+    assert [len(page["items"]) for page in pages] == [2, 2, 2, 2, 1]
+    assert [email["email_id"] for page in pages for email in page["items"]] == [9, 8, 7, 6, 5, 4, 3, 2, 1]
+    assert set(pages[0]["items"][0]) == {"email_id", "sender_email", "recipient_email", "subject", "timestamp"}
+    assert invalid.status_code == 400
+
+
+def test_sent_and_view_email_use_the_async_client(monkeypatch):
+    _install(monkeypatch, [_email(1), _email(3, sender="a@example.com", recipient="c@example.com")])
+
+    async def scenario(client):
+        return (
+            await client.get("/email/sent"),
+            await client.get("/email/inbox/view-email", params={"email_id": 1}),
+            await client.get("/email/inbox/view-email", params={"email_id": 9}),
+        )
+
+    sent, found, missing = _run(scenario)
+    assert [email["email_id"] for email in sent.json()["items"]] == [3]
+    assert sent.json()["next_cursor"] is None
+    assert found.json()["body"] == "b"
+    assert missing.status_code == 404
+
+
+def test_cursor_keeps_the_bson_type_of_the_id():
+    timestamp = datetime(2024, 1, 1, 12, 30, 15, 123000, tzinfo=timezone.utc)
+    for document_id in (ObjectId(), 42, 2 ** 40, "custom-id"):
+        decoded_timestamp, decoded_id = decode_cursor(encode_cursor(timestamp, document_id))
+        assert decoded_timestamp == timestamp
+        # Large ints come back as bson.Int64, an int subclass
+        assert decoded_id == document_id and isinstance(decoded_id, type(document_id))
+    for invalid in ("not-a-cursor", encode_cursor(timestamp, 1)[:-4]):
+        with pytest.raises(ValueError):
+            decode_cursor(invalid)
+
+
+def test_pagination_with_integer_ids(monkeypatch):
+    emails = [dict(_email(i, minute=1), _id=i) for i in range(1, 6)]
+    _install(monkeypatch, emails)
+
+    async def scenario(client):
+        first = (await client.get("/email/inbox", params={"limit": 3})).json()
+        second = (await client.get("/email/inbox", params={"limit": 3, "cursor": first["next_cursor"]})).json()
+        return first, second
+
+    first, second = _run(scenario)
+    assert [email["email_id"] for email in first["items"] + second["items"]] == [5, 4, 3, 2, 1]
+    assert second["next_cursor"] is None
@@ -0,0 +1,121 @@
+import asyncio
+import base64
+import hashlib
+import os
+
+import httpx
+
+import backend.app.api.endpoints.hashing_endpoints as hashing_endpoints
+from backend.app.main import app
+
+
+def _post(path, **kwargs):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+
+    return asyncio.run(scenario())
+
+
+def test_stream_hash_computes_all_digests_in_one_pass():
+    chunks = [bytes([i]) * 65536 for i in range(16)]
+
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    response = _post("/hash/stream", content=body(), headers={"Content-Type": "application/octet-stream"})
+    data = b"".join(chunks)
+    assert response.status_code == 200
+    assert response.json() == {
+        "size": len(data),
+        "digests": {name: hashlib.new(name, data).hexdigest() for name in ("sha256", "sha512", "blake2b", "sha3_256")},
+    }
+
+
+def test_stream_hash_offloads_only_large_chunks(monkeypatch):
+    offloaded = []
+    run_in_threadpool = hashing_endpoints.run_in_threadpool
+
+    async def counting_run_in_threadpool(fn, chunk):
+        offloaded.append(len(chunk))
+        return await run_in_threadpool(fn, chunk)
+
+    monkeypatch.setattr(hashing_endpoints, "run_in_threadpool", counting_run_in_threadpool)
+    chunks = [b"a" * 100, b"b" * hashing_endpoints.STREAM_OFFLOAD_BYTES, b"c" * 100]
+
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    response = _post("/hash/stream?algorithms=sha256", content=body())
+    assert response.json()["digests"] == {"sha256": hashlib.sha256(b"".join(chunks)).hexdigest()}
+    assert offloaded == [hashing_endpoints.STREAM_OFFLOAD_BYTES]
+
+
+def test_stream_hash_selected_and_unknown_algorithms():
+    selected = _post("/hash/stream?algorithms=sha3_256&algorithms=sha256", content=b"abc")
+    assert selected.json()["digests"] == {
+        "sha3_256": hashlib.sha3_256(b"abc").hexdigest(),
+        "sha256": hashlib.sha256(b"abc").hexdigest(),
+    }
+    assert _post("/hash/stream?algorithms=md5", content=b"abc").status_code == 400
+
+
+def test_merkle_build_verify_and_update():
+    data = bytes(range(256)) * 40
+    built = _post("/hash/merkle?chunk_size=1024&proof=3", content=data).json()
+    assert built["size"] == len(data) and len(built["leaves"]) == 10
+
+    chunk = data[3 * 1024:4 * 1024]
+    verified = _post("/hash/merkle/verify-chunk", json={
+        "chunk": base64.b64encode(chunk).decode(),
+        "index": 3,
+        "leaf_count": 10,
+        "proof": built["proofs"]["3"],
+        "root": built["root"],
+    })
+    assert verified.json() == {"is_valid": True}
+
+    edited = data[:3 * 1024] + b"\x00" * 1024 + data[4 * 1024:]
+    updated = _post("/hash/merkle/update", json={
+        "leaves": built["leaves"],
+        "changes": [{"index": 3, "chunk": base64.b64encode(b"\x00" * 1024).decode()}],
+    }).json()
+    assert updated["root"] == _post("/hash/merkle?chunk_size=1024", content=edited).json()["root"]
+
+
+def test_merkle_hashes_a_streamed_body_and_rejects_unknown_update_indexes():
+    data = os.urandom(5 * 1024 + 7)
+
+    async def body():
+        for offset in range(0, len(data), 1000):
+            yield data[offset:offset + 1000]
+
+    streamed = _post("/hash/merkle?chunk_size=1024", content=body()).json()
+    assert streamed == _post("/hash/merkle?chunk_size=1024", content=data).json()
+    assert streamed["size"] == len(data) and len(streamed["leaves"]) == 6
+
+    change = {"index": 0, "chunk": base64.b64encode(b"x").decode()}
+    assert _post("/hash/merkle/update", json={"leaves": [], "changes": [change]}).status_code == 400
+    out_of_range = {**change, "index": 6}
+    assert _post("/hash/merkle/update", json={"leaves": streamed["leaves"], "changes": [out_of_range]}).status_code == 400
+
+
+def test_batch_hash_and_verify_keep_order(monkeypatch):
+    import backend.app.api.endpoints.hashing_endpoints as hashing_endpoints
+
+    texts = [f"email body {i}" for i in range(1000)]
+    hashed = _post("/hash/hash-batch", json={"texts": texts}).json()["hash_values"]
+    assert hashed == [hashlib.sha256(text.encode()).hexdigest() for text in texts]
+
+    items = [{"text": text, "hash_value": value} for text, value in zip(texts, hashed)]
+    items[10]["hash_value"] = "0" * 64
+    items[20]["text"] = "tampered"
+    verified = _post("/hash/verify-batch", json={"items": items}).json()
+    assert verified["valid_count"] == 998
+    assert [i for i, ok in enumerate(verified["results"]) if not ok] == [10, 20]
+
+    monkeypatch.setattr(hashing_endpoints, "HASH_BATCH_MAX_ITEMS", 10)
+    assert _post("/hash/hash-batch", json={"texts": texts}).status_code == 413
@@ -0,0 +1,28 @@
+import asyncio
+
+import httpx
+
+from backend.app.main import app
+
+
+def _get_metrics(headers=None):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/metrics", headers=headers or {})
+
+    return asyncio.run(scenario())
+
+
+def test_metrics_are_disabled_without_a_token(monkeypatch):
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    assert _get_metrics({"Authorization": "Bearer anything"}).status_code == 404
+
+
+def test_metrics_require_the_bearer_token(monkeypatch):
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    assert _get_metrics().status_code == 401
+    assert _get_metrics({"Authorization": "Bearer wrong"}).status_code == 401
+    response = _get_metrics({"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "crypto_executor" in response.json()
@@ -0,0 +1,113 @@
+import base64
+import hashlib
+
+import bcrypt
+from fastapi import BackgroundTasks
+from passlib.context import CryptContext
+
+import backend.app.core.auth as auth
+import backend.app.core.hashing as hashing
+from backend.app.core.bcrypt_calibration import calibrate_bcrypt_rounds
+from backend.app.core.challenge_auth.challenge_manager import ChallengeManager
+from backend.app.core.challenge_auth.challenge_store import LocalChallengeStore
+from backend.app.core.challenge_auth.encryption_manager import encryption_manager
+
+
+class FakeUsers:
+    def __init__(self, *users):
+        self.users = {user["email"]: dict(user) for user in users}
+
+    def find_one(self, query, projection=None):
+        user = self.users.get(query["email"])
+        return dict(user) if user else None
+
+    def update_one(self, query, update):
+        user = self.users.get(query["email"])
+        matched = user is not None and user["hashed_password"] == query["hashed_password"]
+        if matched:
+            user.update(update["$set"])
+        return type("UpdateResult", (), {"modified_count": int(matched)})()
+
+
+def _setup(monkeypatch, stored_rounds=4, current_rounds=5):
+    monkeypatch.setattr(hashing, "pwd_context", CryptContext(schemes=["bcrypt"], deprecated="auto"))
+    hashing.configure_bcrypt_rounds(current_rounds)
+    stored = bcrypt.hashpw(b"secret", bcrypt.gensalt(stored_rounds)).decode()
+    users = FakeUsers({"email": "a@example.com", "hashed_password": stored})
+    monkeypatch.setattr(auth.db_instance, "get_collection", lambda name: users)
+    return users, stored
+
+
+def _client_login(challenge_response, password=b"secret"):
+    hashed = bcrypt.hashpw(password, challenge_response["salt"].encode()).decode()
+    key = hashlib.sha256(hashed.encode()).digest()
+    encrypted_challenge = encryption_manager.encrypt(key, challenge_response["challenge"])
+    encrypted_rehash = None
+    if "rehash_salt" in challenge_response:
+        rehashed = bcrypt.hashpw(password, challenge_response["rehash_salt"].encode())
+        encrypted_rehash = encryption_manager.encrypt(key, base64.b64encode(rehashed).decode())
+    return encrypted_challenge, encrypted_rehash
+
+
+def test_calibration_picks_cost_within_budget():
+    assert calibrate_bcrypt_rounds(0, min_rounds=4, max_rounds=8) == 4
+    assert calibrate_bcrypt_rounds(10 ** 9, min_rounds=4, max_rounds=8) == 8
+
+
+def test_challenge_login_migrates_stale_hash_in_background(monkeypatch):
+    users, stored = _setup(monkeypatch)
+
+    challenge = auth.request_login_challenge("a@example.com")
+    assert challenge["rehash_salt"].startswith("$2b$05$")
+    background_tasks = BackgroundTasks()
+    token = auth.validate_login_challenge("a@example.com", *_client_login(challenge), background_tasks)
+    assert token
+    # Nothing changes until the response has been sent
+    assert users.users["a@example.com"]["hashed_password"] == stored
+
+    for task in background_tasks.tasks:
+        task.func(*task.args, **task.kwargs)
+    migrated = users.users["a@example.com"]["hashed_password"]
+    assert migrated.startswith(challenge["rehash_salt"])
+    assert bcrypt.checkpw(b"secret", migrated.encode())
+    assert "rehash_salt" not in auth.request_login_challenge("a@example.com")
+
+
+def test_rehash_with_foreign_salt_is_ignored(monkeypatch):
+    users, stored = _setup(monkeypatch)
+
+    challenge = auth.request_login_challenge("a@example.com")
+    challenge["rehash_salt"] = bcrypt.gensalt(5).decode()
+    auth.validate_login_challenge("a@example.com", *_client_login(challenge))
+    assert users.users["a@example.com"]["hashed_password"] == stored
+
+
+def test_password_login_rehashes_inline(monkeypatch):
+    users, stored = _setup(monkeypatch)
+
+    assert auth.authenticate_user("a@example.com", "wrong") is None
+    assert users.users["a@example.com"]["hashed_password"] == stored
+    user = auth.authenticate_user("a@example.com", "secret")
+    assert user["hashed_password"].startswith("$2b$05$")
+    assert users.users["a@example.com"]["hashed_password"] == user["hashed_password"]
+
+
+def test_login_reads_the_user_once_and_rehashes_on_another_worker(monkeypatch):
+    users, stored = _setup(monkeypatch)
+    queries = []
+    find_one = users.find_one
+    monkeypatch.setattr(users, "find_one", lambda query, projection=None: queries.append(projection) or find_one(query))
+    # Two workers sharing a challenge store and nothing else
+    store = LocalChallengeStore()
+    worker_a = ChallengeManager(store=store, start_cleanup=False)
+    worker_b = ChallengeManager(store=store, start_cleanup=False)
+
+    monkeypatch.setattr(auth, "challenge_manager", worker_a)
+    challenge = auth.request_login_challenge("a@example.com")
+    monkeypatch.setattr(auth, "challenge_manager", worker_b)
+    assert auth.validate_login_challenge("a@example.com", *_client_login(challenge))
+
+    # The hash and the rehash salt travelled with the challenge
+    assert queries == [{"hashed_password": 1, "_id": 0}]
+    migrated = users.users["a@example.com"]["hashed_password"]
+    assert migrated != stored and migrated.startswith(challenge["rehash_salt"])
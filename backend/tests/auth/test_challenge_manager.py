@@ -0,0 +1,241 @@
+import base64
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.app.core.challenge_auth.challenge_manager import ChallengeManager
+from backend.app.core.challenge_auth.challenge_store import (
+    ChallengeLimitExceeded, ChallengeStore, InMemoryChallengeStore, LocalChallengeStore, MongoChallengeStore,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCollection:
+    """
+    Just enough of a pymongo collection for MongoChallengeStore, atomic per operation.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.indexes = []
+        self._lock = threading.Lock()
+
+    def create_index(self, key, **kwargs):
+        self.indexes.append((key, kwargs))
+
+    def estimated_document_count(self):
+        return len(self.documents)
+
+    def count_documents(self, query):
+        with self._lock:
+            return sum(1 for document in self.documents.values() if self._matches(document, query))
+
+    def find_one(self, query, projection=None):
+        with self._lock:
+            document = self.documents.get(query["_id"])
+            return dict(document) if document and self._matches(document, query) else None
+
+    def find_one_and_replace(self, query, document, projection=None, upsert=False):
+        with self._lock:
+            previous = self.documents.get(query["_id"])
+            if previous is not None or upsert:
+                self.documents[query["_id"]] = {"_id": query["_id"], **document}
+            return previous
+
+    def update_one(self, query, update, upsert=False):
+        with self._lock:
+            document = self.documents.get(query["_id"])
+            if document is None or not self._matches(document, query):
+                if not upsert:
+                    return
+                if document is not None:
+                    # Like Mongo: the upsert inserts, and the _id is taken
+                    raise DuplicateKeyError("duplicate key")
+                document = self.documents[query["_id"]] = {"_id": query["_id"]}
+            document.update(update.get("$set", {}))
+            for field, amount in update.get("$inc", {}).items():
+                document[field] = document.get(field, 0) + amount
+            for field, value in update.get("$max", {}).items():
+                if field not in document or value > document[field]:
+                    document[field] = value
+
+    def find_one_and_delete(self, query):
+        with self._lock:
+            return self.documents.pop(query["_id"], None)
+
+    @staticmethod
+    def _matches(document, query):
+        for field, condition in query.items():
+            value = document.get(field)
+            if isinstance(condition, dict):
+                if "$gt" in condition and not value > condition["$gt"]:
+                    return False
+                if "$lt" in condition and not value < condition["$lt"]:
+                    return False
+                if "$lte" in condition and not value <= condition["$lte"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+
+def _mongo_store(challenges, counters, **kwargs):
+    return MongoChallengeStore(lambda: challenges, lambda: counters, **kwargs)
+
+
+def _manager(store):
+    return ChallengeManager(challenge_timeout_seconds=10, store=store, start_cleanup=False)
+
+
+def test_challenges_are_single_use_and_expire():
+    clock = FakeClock()
+    manager = _manager(InMemoryChallengeStore(clock=clock))
+    challenge = manager.generate_challenge("a@example.com")
+    assert len(base64.b64decode(challenge)) == 32
+    assert manager.validate_challenge("a@example.com", challenge)
+    assert not manager.validate_challenge("a@example.com", challenge)
+
+    manager.validate_challenge("b@example.com", "not base64!")
+    stale = manager.generate_challenge("b@example.com")
+    clock.now += 11
+    assert not manager.validate_challenge("b@example.com", stale)
+    assert manager.stats()["expired"] == 1
+
+
+def test_purge_only_touches_expired_entries_and_heap_stays_bounded():
+    clock = FakeClock()
+    manager = _manager(InMemoryChallengeStore(clock=clock))
+    for i in range(100):
+        manager.generate_challenge(f"early{i}@example.com")
+    clock.now += 5
+    for i in range(100):
+        manager.generate_challenge(f"late{i}@example.com")
+    clock.now += 6
+    assert manager.purge_expired() == 100
+    assert len(manager) == 100
+
+    # Repeated requests for one email replace the challenge without growing the heap unboundedly
+    for _ in range(1000):
+        manager.generate_challenge("late0@example.com")
+    assert manager.stats()["heap_size"] < 400
+    assert manager.stats()["replaced"] == 1000
+
+
+def test_global_and_per_ip_caps():
+    clock = FakeClock()
+    manager = _manager(InMemoryChallengeStore(max_outstanding=3, max_per_ip=2, clock=clock))
+    manager.generate_challenge("a@example.com", "10.0.0.1")
+    manager.generate_challenge("b@example.com", "10.0.0.1")
+    # Replacing a client's own challenge does not count twice
+    manager.generate_challenge("b@example.com", "10.0.0.1")
+    with pytest.raises(ChallengeLimitExceeded):
+        manager.generate_challenge("c@example.com", "10.0.0.1")
+
+    manager.generate_challenge("c@example.com", "10.0.0.2")
+    with pytest.raises(ChallengeLimitExceeded):
+        manager.generate_challenge("d@example.com", "10.0.0.3")
+
+    # Expired challenges free their slots
+    clock.now += 11
+    manager.generate_challenge("d@example.com", "10.0.0.1")
+    stats = manager.stats()
+    assert (stats["rejected_per_ip"], stats["rejected_capacity"], stats["outstanding"]) == (1, 1, 1)
+
+
+def test_mongo_store_lets_another_worker_validate_exactly_once():
+    challenges, counters = FakeCollection(), FakeCollection()
+    worker_a = _manager(_mongo_store(challenges, counters, max_per_ip=1))
+    worker_b = _manager(_mongo_store(challenges, counters, max_per_ip=1))
+
+    challenge = worker_a.generate_challenge("a@example.com", "10.0.0.1", {"hashed_password": "hash"})
+    assert ("expires_at", {"expireAfterSeconds": 0}) in challenges.indexes
+    stored, context = worker_b.take_challenge("a@example.com")
+    assert base64.b64encode(stored).decode() == challenge and context == {"hashed_password": "hash"}
+    assert worker_a.take_challenge("a@example.com") is None
+    assert counters.documents["10.0.0.1"]["count"] == 0
+
+    worker_a.generate_challenge("a@example.com", "10.0.0.1")
+    # Replacing a client's own challenge keeps its count
+    worker_b.generate_challenge("a@example.com", "10.0.0.1")
+    assert counters.documents["10.0.0.1"]["count"] == 1
+    with pytest.raises(ChallengeLimitExceeded):
+        worker_b.generate_challenge("b@example.com", "10.0.0.1")
+
+    # Documents the TTL monitor has not deleted yet are still treated as expired,
+    # and a counter whose challenges have all expired starts over
+    past = datetime.now(timezone.utc) - timedelta(seconds=1)
+    stale = worker_a.generate_challenge("c@example.com")
+    challenges.documents["c@example.com"]["expires_at"] = past
+    assert not worker_b.validate_challenge("c@example.com", stale)
+    challenges.documents["a@example.com"]["expires_at"] = past
+    counters.documents["10.0.0.1"]["expires_at"] = past
+    worker_b.generate_challenge("b@example.com", "10.0.0.1")
+    assert counters.documents["10.0.0.1"]["count"] == 1
+    # The expired challenge of "a" gave up its count with the reset; taking it changes nothing
+    assert worker_a.take_challenge("a@example.com") is None
+    assert counters.documents["10.0.0.1"]["count"] == 1
+
+
+def test_mongo_per_ip_cap_holds_under_concurrent_workers():
+    challenges, counters = FakeCollection(), FakeCollection()
+    workers = [_manager(_mongo_store(challenges, counters, max_per_ip=3)) for _ in range(4)]
+    start = threading.Barrier(20)
+    results = []
+
+    def request(i):
+        start.wait()
+        try:
+            workers[i % 4].generate_challenge(f"user{i}@example.com", "10.0.0.1")
+            results.append(True)
+        except ChallengeLimitExceeded:
+            results.append(False)
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 3
+    assert counters.documents["10.0.0.1"]["count"] == 3
+
+
+def test_mongo_store_needs_no_cleanup_thread():
+    manager = ChallengeManager(store=_mongo_store(FakeCollection(), FakeCollection()))
+    assert not hasattr(manager, "_cleanup_thread")
+
+
+@pytest.mark.parametrize("store", [InMemoryChallengeStore, LocalChallengeStore])
+def test_context_is_returned_with_the_challenge(store):
+    manager = _manager(store())
+    challenge = manager.generate_challenge("a@example.com", "10.0.0.1", {"rehash_salt": "salt"})
+    stored, context = manager.take_challenge("a@example.com")
+    assert base64.b64encode(stored).decode() == challenge and context == {"rehash_salt": "salt"}
+    assert manager.take_challenge("a@example.com") is None
+
+
+def test_store_interface_is_abstract():
+    class Incomplete(ChallengeStore):
+        def put(self, email, value, ttl_seconds, client_ip=None):
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_local_store_stand_in():
+    clock = FakeClock()
+    manager = _manager(LocalChallengeStore(clock=clock))
+    challenge = manager.generate_challenge("a@example.com")
+    manager.generate_challenge("b@example.com")
+    assert manager.validate_challenge("a@example.com", challenge)
+    clock.now += 11
+    assert manager.purge_expired() == 1
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+import backend.app.core.auth as auth
+
+
+class FakeRequest:
+    def __init__(self, token):
+        self.cookies = {"access_token": token}
+
+
+def test_decoded_token_is_cached_until_exp(monkeypatch):
+    auth.token_cache.clear()
+    token = auth.create_access_token({"sub": "a@example.com"}, timedelta(minutes=5))
+    decodes = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(auth.jwt, "decode", lambda *a, **k: decodes.append(1) or real_decode(*a, **k))
+
+    assert auth.get_current_user(FakeRequest(token)) == "a@example.com"
+    assert auth.get_current_user(FakeRequest(token)) == "a@example.com"
+    assert len(decodes) == 1
+    # The entry expires with the token, not with the cache-wide TTL
+    (_, expires_at), = auth.token_cache._entries.values()
+    assert expires_at - auth.token_cache._clock() <= 5 * 60
+
+    auth.evict_token(token)
+    auth.get_current_user(FakeRequest(token))
+    assert len(decodes) == 2
+
+
+def test_invalid_tokens_are_not_cached_and_revocation_applies_to_hits(monkeypatch):
+    auth.token_cache.clear()
+    with pytest.raises(HTTPException):
+        auth.get_current_user(FakeRequest("not-a-token"))
+    expired = auth.create_access_token({"sub": "a@example.com"}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        auth.get_current_user(FakeRequest(expired))
+    assert len(auth.token_cache) == 0
+
+    token = auth.create_access_token({"sub": "b@example.com"})
+    assert auth.get_current_user(FakeRequest(token)) == "b@example.com"
+    revoked = set()
+    monkeypatch.setattr(auth, "_revocation_checks", [lambda payload: payload["sub"] in revoked])
+    revoked.add("b@example.com")
+    with pytest.raises(HTTPException) as error:
+        auth.get_current_user(FakeRequest(token))
+    assert error.value.status_code == 401
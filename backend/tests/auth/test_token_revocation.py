@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+
+import backend.app.core.auth as auth
+import backend.app.core.token_revocation as token_revocation
+from backend.app.core.token_revocation import TokenDenylist
+
+
+class FakeRevokedTokens:
+    def __init__(self):
+        self.documents = {}
+
+    def update_one(self, query, update, upsert=False):
+        self.documents.setdefault(query["_id"], {"_id": query["_id"]}).update(update["$set"])
+
+    def find(self, query, projection=None):
+        since = query.get("revoked_at", {}).get("$gte")
+        return [dict(d) for d in self.documents.values() if since is None or d["revoked_at"] >= since]
+
+
+class FakeRequest:
+    def __init__(self, token):
+        self.cookies = {"access_token": token}
+
+
+@pytest.fixture
+def shared_collection(monkeypatch):
+    collection = FakeRevokedTokens()
+    monkeypatch.setattr(token_revocation.db_instance, "get_collection", lambda name: collection)
+    return collection
+
+
+def test_revocations_propagate_between_workers_and_expire(shared_collection):
+    worker_a, worker_b = TokenDenylist(), TokenDenylist()
+    worker_a.revoke("live", time.time() + 60)
+    worker_a.revoke("stale", time.time() - 1)
+    assert worker_a.is_revoked("live")
+    assert not worker_b.is_revoked("live")
+
+    worker_b.sync()
+    assert worker_b.is_revoked("live")
+    assert not worker_b.is_revoked("stale")
+    assert worker_b.stats()["size"] == 1
+
+    worker_a.revoke("later", time.time() + 60)
+    worker_b.sync()
+    assert worker_b.is_revoked("later")
+
+
+def test_logout_revokes_cached_token(shared_collection, monkeypatch):
+    monkeypatch.setattr(auth, "token_denylist", TokenDenylist())
+    monkeypatch.setattr(
+        auth, "_revocation_checks", [lambda payload: auth.token_denylist.is_revoked(payload.get("jti"))]
+    )
+    token = auth.create_access_token({"sub": "a@example.com"}, timedelta(minutes=5))
+    other = auth.create_access_token({"sub": "a@example.com"}, timedelta(minutes=5))
+    assert jwt.get_unverified_claims(token)["jti"] != jwt.get_unverified_claims(other)["jti"]
+    assert auth.get_current_user(FakeRequest(token)) == "a@example.com"
+
+    assert auth.revoke_token(token)
+    assert jwt.get_unverified_claims(token)["jti"] in shared_collection.documents
+    with pytest.raises(HTTPException):
+        auth.get_current_user(FakeRequest(token))
+    assert auth.get_current_user(FakeRequest(other)) == "a@example.com"
+    assert not auth.revoke_token("garbage")
@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from backend.app.core.cache import TTLCache
+import backend.app.core.key_management as keyManagement
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """
+    Swap in a small cache on a fake clock and count the KEK unwraps done on misses.
+    """
+    clock = FakeClock()
+    cache = TTLCache("aes_cipher_cache", maxsize=2, ttl_seconds=10, clock=clock)
+    monkeypatch.setattr(keyManagement, "aes_cipher_cache", cache)
+    unwraps = []
+    decrypt_aes_key = keyManagement.decrypt_aes_key
+
+    def counting_decrypt(encrypted_key_hex, kek):
+        unwraps.append(encrypted_key_hex)
+        return decrypt_aes_key(encrypted_key_hex, kek)
+
+    monkeypatch.setattr(keyManagement, "decrypt_aes_key", counting_decrypt)
+    return cache, clock, unwraps
+
+
+def _wrapped():
+    return keyManagement.encrypt_aes_key(os.urandom(32), keyManagement.KEK)
+
+
+def test_hit_after_miss_reuses_the_cipher(registry):
+    cache, _, unwraps = registry
+    wrapped = _wrapped()
+
+    first = keyManagement.get_aes_cipher(wrapped)
+    second = keyManagement.get_aes_cipher(wrapped)
+
+    assert first is second
+    assert unwraps == [wrapped]
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_cipher_is_unwrapped_again(registry):
+    cache, clock, unwraps = registry
+    wrapped = _wrapped()
+    first = keyManagement.get_aes_cipher(wrapped)
+
+    clock.now = 11
+    second = keyManagement.get_aes_cipher(wrapped)
+
+    assert second is not first
+    assert unwraps == [wrapped, wrapped]
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_cipher_is_evicted(registry):
+    cache, _, unwraps = registry
+    a, b, c = _wrapped(), _wrapped(), _wrapped()
+    keyManagement.get_aes_cipher(a)
+    keyManagement.get_aes_cipher(b)
+    keyManagement.get_aes_cipher(a)  # "b" is now least recently used
+
+    keyManagement.get_aes_cipher(c)
+    keyManagement.get_aes_cipher(a)
+    keyManagement.get_aes_cipher(b)
+
+    assert unwraps == [a, b, c, b]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_delete_key_evicts_the_cipher(registry, monkeypatch):
+    cache, _, unwraps = registry
+    wrapped = _wrapped()
+    keyManagement.get_aes_cipher(wrapped)
+
+    class FakeCollection:
+        def find_one_and_delete(self, _filter):
+            return {"key_type": "AES", "key_data": {"key_value": wrapped}}
+
+    monkeypatch.setattr(keyManagement, "keys_collection", FakeCollection())
+    keyManagement.delete_key("0" * 24, "user@example.com")
+
+    assert len(cache) == 0
+    keyManagement.get_aes_cipher(wrapped)
+    assert unwraps == [wrapped, wrapped]
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from backend.app.core.block_cipher_module import AESCipher, ParallelAESGCM
+
+
+def _feed(processor, data, chunk_size):
+    output = b"".join(processor.update(data[i:i + chunk_size]) for i in range(0, len(data), chunk_size))
+    return output + processor.finalize()
+
+
+@pytest.mark.parametrize("size", [0, 1, 15, 1024, 1024 * 3, 1024 * 3 + 17])
+@pytest.mark.parametrize("chunk_size", [1, 100, 5000])
+def test_stream_round_trip_and_parallel_compatibility(size, chunk_size):
+    key = os.urandom(32)
+    cipher = AESCipher(key)
+    data = os.urandom(size)
+
+    sealed = _feed(cipher.stream_encryptor(segment_size=1024), data, chunk_size)
+    assert _feed(cipher.stream_decryptor(), sealed, chunk_size) == data
+    # Same layout as the parallel engine, in both directions
+    engine = ParallelAESGCM(key, segment_size=1024, max_workers=2)
+    assert engine.decrypt(sealed) == data
+    assert _feed(cipher.stream_decryptor(), bytes(engine.encrypt(data)), chunk_size) == data
+
+
+def test_decryptor_releases_only_authenticated_segments():
+    cipher = AESCipher(os.urandom(32))
+    data = os.urandom(1024 * 3)
+    sealed = bytearray(_feed(cipher.stream_encryptor(segment_size=1024), data, 4096))
+    stride = 1024 + ParallelAESGCM.TAG_LENGTH
+    sealed[ParallelAESGCM.HEADER.size + stride + 5] ^= 1
+
+    decryptor = cipher.stream_decryptor()
+    released = decryptor.update(bytes(sealed[:ParallelAESGCM.HEADER.size + stride + 1]))
+    assert released == data[:1024]
+    with pytest.raises(ValueError, match="Segment 1 failed authentication"):
+        decryptor.update(bytes(sealed[ParallelAESGCM.HEADER.size + stride + 1:]))
+
+
+def test_truncated_streams_are_rejected():
+    cipher = AESCipher(os.urandom(32))
+    sealed = _feed(cipher.stream_encryptor(segment_size=1024), os.urandom(1024 * 2 + 1), 4096)
+    header, stride = ParallelAESGCM.HEADER.size, 1024 + ParallelAESGCM.TAG_LENGTH
+
+    for truncated in (sealed[:header + stride], sealed[:header + 2 * stride], sealed[:header - 1]):
+        decryptor = cipher.stream_decryptor()
+        with pytest.raises(ValueError):
+            _feed(decryptor, truncated, 4096)
+
+
+def test_oversized_segment_header_is_rejected():
+    header = ParallelAESGCM.HEADER.pack(ParallelAESGCM.VERSION, 2 ** 31, os.urandom(8))
+    with pytest.raises(ValueError, match="segment size"):
+        AESCipher(os.urandom(32)).stream_decryptor().update(header)
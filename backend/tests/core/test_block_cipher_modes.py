@@ -0,0 +1,35 @@
+import base64
+import os
+
+import pytest
+
+from backend.app.core.block_cipher_module import AESCipher
+
+
+@pytest.mark.parametrize("mode", ["GCM", "CHACHA20-POLY1305"])
+def test_authenticated_modes_round_trip_with_versioned_header(mode):
+    cipher = AESCipher(os.urandom(32))
+
+    encrypted = cipher.encrypt("hello world", mode)
+
+    assert encrypted.startswith("$") and encrypted.count("$") == 3
+    assert cipher.decrypt(encrypted) == "hello world"
+
+
+def test_authenticated_mode_detects_tampering():
+    cipher = AESCipher(os.urandom(32))
+    header, payload = cipher.encrypt("hello world", "GCM").rsplit("$", 1)
+    data = bytearray(base64.b64decode(payload))
+    data[-1] ^= 1
+
+    with pytest.raises(ValueError):
+        cipher.decrypt(header + "$" + base64.b64encode(bytes(data)).decode())
+
+
+def test_legacy_cbc_blobs_still_decrypt():
+    cipher = AESCipher(os.urandom(32))
+
+    encrypted = cipher.encrypt("hello world")
+
+    assert not encrypted.startswith("$")
+    assert cipher.decrypt(encrypted) == "hello world"
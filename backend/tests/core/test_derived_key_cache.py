@@ -0,0 +1,38 @@
+import time
+
+import backend.app.core.hashing as hashing
+
+
+def test_repeated_derivation_is_served_from_cache():
+    hashing.derived_key_cache.clear()
+    started = time.perf_counter()
+    first = hashing.derive_key("$2b$12$hash-one", b"salt-1")
+    cold = time.perf_counter() - started
+
+    started = time.perf_counter()
+    second = hashing.derive_key("$2b$12$hash-one", b"salt-1")
+    warm = time.perf_counter() - started
+
+    assert first == second == hashing._pbkdf2("$2b$12$hash-one", b"salt-1")
+    assert hashing.derive_key("$2b$12$hash-one", b"salt-2") != first
+    assert warm < cold / 10
+    # Cache keys are keyed digests, never the inputs themselves
+    assert all(b"hash-one" not in part and part != b"salt-1" for key in hashing.derived_key_cache._entries for part in key)
+
+
+def test_invalidation_and_eviction_zero_key_material():
+    hashing.derived_key_cache.clear()
+    hashing.derive_key("$2b$12$old-hash", b"salt-1")
+    hashing.derive_key("$2b$12$old-hash", b"salt-2")
+    hashing.derive_key("$2b$12$other", b"salt-1")
+    entries = [value for value, _ in hashing.derived_key_cache._entries.values()]
+
+    assert hashing.invalidate_derived_keys("$2b$12$old-hash") == 2
+    assert len(hashing.derived_key_cache) == 1
+    wiped = [entry for entry in entries if entry.wiped]
+    assert len(wiped) == 2 and all(entry.key == bytearray(32) for entry in wiped)
+
+    # A caller's copy is unaffected by the wipe
+    key = hashing.derive_key("$2b$12$other", b"salt-1")
+    hashing.derived_key_cache.clear()
+    assert key == hashing._pbkdf2("$2b$12$other", b"salt-1")
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import HTTPException
+
+import backend.app.core.key_management as keyManagement
+from backend.app.core.ecies_service import ECIESCipher
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+
+    def find_one(self, query):
+        for document in self.documents:
+            if all(document.get(k) == v for k, v in query.items()):
+                return document
+        return None
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+        class Result:
+            inserted_id = len(self.documents)
+        return Result()
+
+
+@pytest.fixture
+def stored_key(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(keyManagement, "keys_collection", collection)
+    generated = keyManagement.generate_x25519_key("user@example.com")
+    return generated["public_key"], collection.documents[0]["key_data"]["private_key"]
+
+
+def test_ecies_round_trip(stored_key):
+    public_pem, wrapped = stored_key
+    plaintext = "hello " * 10000
+
+    ciphertext = ECIESCipher(public_pem).encrypt(plaintext)
+
+    assert ECIESCipher(wrapped).decrypt(ciphertext) == plaintext
+    assert keyManagement.fetch_public_key("user@example.com", "X25519") == public_pem
+    with pytest.raises(ValueError):
+        keyManagement.generate_x25519_key("user@example.com")
+
+
+def test_ecies_rejects_tampered_ciphertext(stored_key):
+    public_pem, wrapped = stored_key
+    ciphertext = bytearray.fromhex(ECIESCipher(public_pem).encrypt("hello"))
+    ciphertext[5] ^= 1  # inside the ephemeral public key
+
+    with pytest.raises(HTTPException):
+        ECIESCipher(wrapped).decrypt(ciphertext.hex())
@@ -0,0 +1,27 @@
+import time
+
+from backend.app.core.key_pool import RSAKeyPool
+
+
+def test_pool_refills_to_high_watermark_and_serves_keys():
+    pool = RSAKeyPool(low_watermark=1, high_watermark=2, key_size=1024)
+    pool.start()
+    try:
+        deadline = time.monotonic() + 30
+        while pool.depth < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.depth == 2
+
+        assert pool.take() is not None
+        stats = pool.stats()
+        assert stats["taken"] == 1
+        assert stats["generated"] >= 2
+        assert stats["refill_rate_per_second"] > 0
+    finally:
+        pool.stop(timeout=30)
+
+
+def test_disabled_pool_falls_back_to_inline_generation():
+    pool = RSAKeyPool(enabled=False)
+    assert pool.take() is None
+    assert pool.stats()["generated"] == 0
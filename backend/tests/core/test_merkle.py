@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from backend.app.core.hashing import MerkleLeafHasher, MerkleTree, verify_merkle_proof
+
+
+@pytest.mark.parametrize("leaf_count", [1, 2, 3, 5, 8, 13])
+def test_proofs_verify_every_chunk_and_reject_tampering(leaf_count):
+    data = os.urandom(leaf_count * 10 - 3)
+    tree = MerkleTree.from_data(data, chunk_size=10, max_workers=3)
+    assert tree.root == MerkleTree.from_data(data, chunk_size=10, max_workers=1).root
+
+    for index in range(leaf_count):
+        chunk = data[index * 10:index * 10 + 10]
+        proof = tree.proof(index)
+        assert verify_merkle_proof(chunk, index, leaf_count, proof, tree.root)
+        assert not verify_merkle_proof(chunk + b"x", index, leaf_count, proof, tree.root)
+        assert not verify_merkle_proof(chunk, index, leaf_count, proof + [tree.root], tree.root)
+
+
+def test_update_leaf_matches_full_rebuild():
+    data = bytearray(os.urandom(95))
+    tree = MerkleTree.from_data(bytes(data), chunk_size=10)
+    data[40:50] = b"y" * 10
+    data[90:] = b"z" * 5
+
+    tree.update_leaf(4, bytes(data[40:50]))
+    root = tree.update_leaf(9, bytes(data[90:]))
+    assert root == MerkleTree.from_data(bytes(data), chunk_size=10).root
+
+
+def test_leaf_cannot_pose_as_inner_node():
+    tree = MerkleTree.from_data(os.urandom(40), chunk_size=10)
+    inner = tree.levels[1][0]
+    # A forged "chunk" made of two leaf hashes must not hash to the parent node
+    assert MerkleTree([tree.leaves[0], tree.leaves[1]]).root == inner
+    assert not verify_merkle_proof(tree.leaves[0] + tree.leaves[1], 0, 2, [tree.levels[1][1]], tree.root)
+
+
+@pytest.mark.parametrize("size", [0, 1, 10, 95, 1000])
+def test_leaf_hasher_matches_from_data_for_any_piece_sizes(size):
+    data = os.urandom(size)
+    hasher = MerkleLeafHasher(chunk_size=10)
+    offset = 0
+    for piece in [3, 10, 17, 1, 64] * 20:
+        hasher.update(data[offset:offset + piece])
+        offset += piece
+
+    expected = MerkleTree.from_data(data, chunk_size=10)
+    assert hasher.size == size
+    assert hasher.tree().leaves == expected.leaves
+    assert hasher.tree().root == expected.root
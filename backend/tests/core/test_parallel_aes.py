@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+from backend.app.core.block_cipher_module import ParallelAESGCM
+
+
+@pytest.mark.parametrize("size", [0, 1, 4096, 4096 * 3, 4096 * 3 + 17])
+def test_parallel_round_trip(size):
+    engine = ParallelAESGCM(os.urandom(32), segment_size=4096, max_workers=4)
+    data = os.urandom(size)
+
+    assert engine.decrypt(engine.encrypt(data)) == data
+
+
+def test_truncated_and_reordered_segments_are_rejected():
+    engine = ParallelAESGCM(os.urandom(32), segment_size=1024, max_workers=2)
+    sealed = engine.encrypt(os.urandom(1024 * 3))
+    header, stride = ParallelAESGCM.HEADER.size, 1024 + ParallelAESGCM.TAG_LENGTH
+    segments = [sealed[header + i * stride:header + (i + 1) * stride] for i in range(3)]
+
+    with pytest.raises(ValueError):
+        engine.decrypt(sealed[:header] + segments[0] + segments[1])
+    with pytest.raises(ValueError):
+        engine.decrypt(sealed[:header] + segments[1] + segments[0] + segments[2])
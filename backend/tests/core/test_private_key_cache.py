@@ -0,0 +1,79 @@
+import pytest
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from backend.app.core.cache import TTLCache
+import backend.app.core.key_management as keyManagement
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    clock = FakeClock()
+    evicted = []
+    cache = TTLCache("test", maxsize=2, ttl_seconds=10, on_evict=lambda k, v: evicted.append(k), clock=clock)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert evicted == ["b"]
+
+    clock.now = 11
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+
+
+def test_private_key_is_parsed_once_and_evicted_on_delete(monkeypatch):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    wrapped = keyManagement.encrypt_aes_key(pem, keyManagement.KEK)
+    keyManagement.private_key_cache.clear()
+
+    first = keyManagement.decrypt_rsa_private_key(wrapped)
+    second = keyManagement.decrypt_rsa_private_key(wrapped)
+    assert first is second
+
+    class FakeCollection:
+        def find_one_and_delete(self, _filter):
+            return {"key_type": "RSA", "key_data": {"private_key": wrapped}}
+
+    monkeypatch.setattr(keyManagement, "keys_collection", FakeCollection())
+    keyManagement.delete_key("0" * 24, "user@example.com")
+    assert len(keyManagement.private_key_cache) == 0
+
+
+def test_inconsistent_rsa_key_is_rejected_by_the_validation_workers():
+    numbers = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_numbers()
+    broken = rsa.RSAPrivateNumbers(
+        p=numbers.p, q=numbers.q, d=numbers.d + 2, dmp1=numbers.dmp1, dmq1=numbers.dmq1,
+        iqmp=numbers.iqmp, public_numbers=numbers.public_numbers,
+    ).private_key(unsafe_skip_rsa_key_validation=True)
+    pem = broken.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    wrapped = keyManagement.encrypt_aes_key(pem, keyManagement.KEK)
+    keyManagement.private_key_cache.clear()
+    calls = keyManagement.key_validation_executor.stats()["operations"].get("rsa_key_validation", {}).get("count", 0)
+
+    with pytest.raises(ValueError):
+        keyManagement.decrypt_rsa_private_key(wrapped)
+    assert keyManagement.key_validation_executor.stats()["operations"]["rsa_key_validation"]["count"] == calls + 1
+    assert len(keyManagement.private_key_cache) == 0
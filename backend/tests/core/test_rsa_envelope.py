@@ -0,0 +1,46 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+
+import backend.app.core.key_management as keyManagement
+from backend.app.core.rsa_service import RSACipher
+
+
+@pytest.fixture(scope="module")
+def key_pair():
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    wrapped = keyManagement.encrypt_aes_key(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        ),
+        keyManagement.KEK,
+    )
+    return public_pem, wrapped
+
+
+def test_envelope_round_trips_payloads_beyond_oaep_limit(key_pair):
+    public_pem, wrapped = key_pair
+    plaintext = "secret message " * 70000  # ~1 MB
+
+    envelope = RSACipher(public_pem).encrypt_envelope(plaintext)
+
+    assert envelope[:2] == "01"
+    assert RSACipher(wrapped).decrypt_envelope(envelope) == plaintext
+    with pytest.raises(HTTPException):
+        RSACipher(public_pem).encrypt(plaintext)
+
+
+def test_tampered_envelope_is_rejected(key_pair):
+    public_pem, wrapped = key_pair
+    envelope = bytearray.fromhex(RSACipher(public_pem).encrypt_envelope("hello"))
+    envelope[-1] ^= 1
+
+    with pytest.raises(HTTPException):
+        RSACipher(wrapped).decrypt_envelope(envelope.hex())
@@ -0,0 +1,75 @@
+import os
+import uuid
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import OperationFailure, PyMongoError, ServerSelectionTimeoutError
+
+from backend.app.database.indexes import INDEXES, audit_query_plans, ensure_indexes, plan_stages
+
+
+class FakeCollection:
+    def __init__(self, name, calls, failures):
+        self.name = name
+        self.calls = calls
+        self.failures = failures
+
+    def create_indexes(self, indexes):
+        self.calls.append(self.name)
+        if self.name in self.failures:
+            raise self.failures[self.name]
+        return [index.document["name"] for index in indexes]
+
+
+class FakeDatabase:
+    def __init__(self, **failures):
+        self.calls = []
+        self.failures = failures
+
+    def __getitem__(self, name):
+        return FakeCollection(name, self.calls, self.failures)
+
+
+def test_one_failing_collection_does_not_block_the_others():
+    database = FakeDatabase(users=OperationFailure("E11000 duplicate key"))
+    created = ensure_indexes(database)
+    assert database.calls == list(INDEXES)
+    assert "users" not in created
+    assert created["emails"] == ["recipient_email_1_timestamp_-1__id_-1", "sender_email_1_timestamp_-1__id_-1", "email_id_1"]
+
+
+def test_unreachable_server_stops_after_the_first_timeout():
+    database = FakeDatabase(users=ServerSelectionTimeoutError("no servers"))
+    assert ensure_indexes(database) == {}
+    assert database.calls == ["users"]
+
+
+def test_plan_stages_walks_nested_plans():
+    explain = {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH",
+        "inputStage": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]},
+    }}}
+    assert sorted(plan_stages(explain)) == ["COLLSCAN", "FETCH", "IXSCAN", "OR"]
+
+
+@pytest.fixture
+def mongo_database():
+    uri = os.getenv("MONGO_URI")
+    if not uri:
+        pytest.skip("MONGO_URI is not set")
+    client = MongoClient(uri, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB is not reachable")
+    name = f"index_audit_{uuid.uuid4().hex[:8]}"
+    yield client[name]
+    client.drop_database(name)
+    client.close()
+
+
+def test_hot_queries_use_indexes(mongo_database):
+    ensure_indexes(mongo_database)
+    # Idempotent on an already indexed database
+    ensure_indexes(mongo_database)
+    assert audit_query_plans(mongo_database) == []
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import httpx
+
+import backend.app.main as main
+from backend.app.core import key_management
+from backend.app.database.session import Database, client_options, db_instance
+
+
+def test_importing_the_app_creates_no_client():
+    # In a fresh interpreter, since other tests may have used the shared instance
+    check = (
+        "import backend.app.main; from backend.app.database.session import db_instance; "
+        "assert db_instance._client is None and db_instance._async_client is None"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    result = subprocess.run([sys.executable, "-c", check], cwd=root, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_client_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "200")
+    monkeypatch.setenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000")
+    monkeypatch.setenv("MONGO_COMPRESSORS", "zlib")
+    monkeypatch.setenv("MONGO_WRITE_CONCERN_W", "majority")
+    monkeypatch.setenv("MONGO_WRITE_CONCERN_JOURNAL", "true")
+    assert client_options() == {
+        "maxPoolSize": 200, "serverSelectionTimeoutMS": 3000, "compressors": "zlib", "w": "majority", "journal": True,
+    }
+
+    database = Database()
+    client = database.connect()
+    assert client.options.pool_options.max_pool_size == 200
+    assert client.options.write_concern.document == {"w": "majority", "j": True}
+    asyncio.run(database.close())
+    assert database._client is None
+
+
+def test_module_level_collections_resolve_on_use(monkeypatch):
+    class Keys:
+        def find_one(self, query):
+            return {"query": query}
+
+    monkeypatch.setattr(db_instance, "get_collection", lambda name: Keys() if name == "keys" else None)
+    assert key_management.keys_collection.find_one({"user_email": "a"}) == {"query": {"user_email": "a"}}
+
+
+def test_readiness_probe_reflects_mongo(monkeypatch):
+    async def probe():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/ready")
+
+    monkeypatch.setattr(db_instance, "ping", lambda: False)
+    assert asyncio.run(probe()).status_code == 503
+    monkeypatch.setattr(db_instance, "ping", lambda: True)
+    response = asyncio.run(probe())
+    assert response.status_code == 200 and response.json() == {"status": "ready"}
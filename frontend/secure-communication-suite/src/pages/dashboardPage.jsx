@@ -8,6 +8,8 @@ const DashboardPage = () => {
   const [selectedSection, setSelectedSection] = useState("inbox");
   const [emails, setEmails] = useState([]);
   const [sentEmails, setSentEmails] = useState([]);
+  const [inboxCursor, setInboxCursor] = useState(null);
+  const [sentCursor, setSentCursor] = useState(null);
   const [keys, setKeys] = useState([]);
   const [loadingEmails, setLoadingEmails] = useState(true);
   const [loadingSentEmails, setLoadingSentEmails] = useState(true);
@@ -30,12 +32,14 @@ const DashboardPage = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const inboxData = await getInboxEmails();
-        setEmails(inboxData);
+        const inboxPage = await getInboxEmails();
+        setEmails(inboxPage.items);
+        setInboxCursor(inboxPage.next_cursor);
         setLoadingEmails(false);
 
-        const sentData = await getSentEmails();
-        setSentEmails(sentData);
+        const sentPage = await getSentEmails();
+        setSentEmails(sentPage.items);
+        setSentCursor(sentPage.next_cursor);
         setLoadingSentEmails(false);
 
         const keysData = await getKeys();
@@ -54,6 +58,26 @@ const DashboardPage = () => {
     }
   }, [userEmail]);
 
+  const loadMoreInbox = async () => {
+    try {
+      const page = await getInboxEmails(inboxCursor);
+      setEmails((previous) => [...previous, ...page.items]);
+      setInboxCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching inbox emails:", error);
+    }
+  };
+
+  const loadMoreSent = async () => {
+    try {
+      const page = await getSentEmails(sentCursor);
+      setSentEmails((previous) => [...previous, ...page.items]);
+      setSentCursor(page.next_cursor);
+    } catch (error) {
+      console.error("Error fetching sent emails:", error);
+    }
+  };
+
   const handleEmailClick = (emailId) => {
     navigate(`/view-email/${emailId}`);
   };
@@ -130,6 +154,9 @@ const DashboardPage = () => {
                 ))}
               </ul>
             )}
+            {!loadingEmails && inboxCursor && (
+              <button className="action-button" onClick={loadMoreInbox}>Load more</button>
+            )}
           </div>
         )}
 
@@ -160,6 +187,9 @@ const DashboardPage = () => {
                 ))}
               </div>
             )}
+            {!loadingSentEmails && sentCursor && (
+              <button className="action-button" onClick={loadMoreSent}>Load more</button>
+            )}
           </div>
         )}
 
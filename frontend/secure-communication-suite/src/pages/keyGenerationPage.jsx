@@ -47,6 +47,7 @@ const GenerateKeyPage = () => {
               Select key type
             </option>
             <option value="RSA">RSA</option>
+            <option value="X25519">X25519</option>
             <option value="AES">AES</option>
           </select>
         </div>
@@ -1,6 +1,7 @@
 import axios from "axios";
 import { cryptoManager } from './cryptoUtils';
 import { createHash } from 'crypto-browserify';
+import { Buffer } from 'buffer';
 
 const axiosInstance = axios.create({
   baseURL: "http://localhost:8000",
@@ -32,7 +33,15 @@ export const login = async(email, password) =>{
       // Step 4: Encrypt challenge
       const encryptedChallenge = cryptoManager.encryptChallenge(key, challenge);
 
-      const validationResponse = await axiosInstance.post('/auth/validate-challenge', { email: email, encrypted_challenge: encryptedChallenge});
+      // Step 5: If the stored hash uses a stale bcrypt cost, send a rehash along with the response
+      const rehashSalt = challengeResponse.data.rehash_salt;
+      let encryptedRehash = null;
+      if (rehashSalt) {
+        const rehashedPassword = await cryptoManager.hashPasswordWithSalt(password, rehashSalt);
+        encryptedRehash = cryptoManager.encryptChallenge(key, Buffer.from(rehashedPassword).toString('base64'));
+      }
+
+      const validationResponse = await axiosInstance.post('/auth/validate-challenge', { email: email, encrypted_challenge: encryptedChallenge, encrypted_rehash: encryptedRehash});
 
       if (!validationResponse.status === 200) {
         const errorData = await validationResponse.data;
@@ -57,18 +66,24 @@ export const signup = async (email, password) => {
   }
 };
 
-export const getInboxEmails = async () => {
+// Returns one page: { items, next_cursor }; pass next_cursor back to load the following page
+export const getInboxEmails = async (cursor = null, limit = 50) => {
   try {
-    const response = await axiosInstance.get("/email/inbox");
+    const response = await axiosInstance.get("/email/inbox", {
+      params: cursor ? { cursor, limit } : { limit },
+    });
     return response.data;
   } catch (error) {
     throw new Error(error.response?.data?.message || "Error fetching inbox emails");
   }
 };
 
-export const getSentEmails = async () => {
+// Returns one page: { items, next_cursor }; pass next_cursor back to load the following page
+export const getSentEmails = async (cursor = null, limit = 50) => {
   try {
-    const response = await axiosInstance.get("/email/sent");
+    const response = await axiosInstance.get("/email/sent", {
+      params: cursor ? { cursor, limit } : { limit },
+    });
     return response.data;
   } catch (error) {
     throw new Error(error.response?.data?.message || "Error fetching sent emails");